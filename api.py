@@ -1,10 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import base64
+import gzip
+import hashlib
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from database import get_db
-from models import Product, Contact
+from models import Product, ProductSize, ProductImage, ProductCounters, ProductArchive, split_sizes, split_file_ids
+from catalog import catalog_cache
+from contact import contact_provider
+from events import event_broker, TooManySubscribers
+import config
+import repository
+from repository import product_search_query, product_totals_query, after_position, COUNTERS_ID, NOT_DELETED
 
 router = APIRouter()
 
@@ -37,6 +51,168 @@ class ContactResponse(BaseModel):
         from_attributes = True
 
 
+# Conditional request helpers (ETag / Last-Modified)
+def _rows_etag(rows):
+    """Strong ETag from row ids and update times"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.id}:{row.updated_at.isoformat() if row.updated_at else ''};".encode())
+    return digest.hexdigest()[:20]
+
+
+def _validator_headers(etag, last_modified=None):
+    """Build ETag / Last-Modified response headers"""
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if last_modified:
+        # Stored timestamps are naive UTC
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def _is_not_modified(request: Request, etag, last_modified=None):
+    """Check If-None-Match first, then If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return f'"{etag}"' in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+    return False
+
+
+def _conditional(request: Request, response: Response, etag, last_modified=None):
+    """Set validators on the response, return a 304 if the client copy is current
+
+    Clients that accept gzip may get a compressed body (GZipMiddleware, or
+    the snapshot route itself), and each encoding is its own representation,
+    so their ETags carry a -gz suffix. main.GZipMiddleware adds the matching
+    Vary header to every response.
+    """
+    if _accepts_gzip(request):
+        etag = f"{etag}-gz"
+    headers = _validator_headers(etag, last_modified)
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# Product list fast path: only the columns ProductResponse needs, encoded
+# straight to bytes (legacy sizes/file_ids columns are kept in sync with the
+# child tables, so no extra selectin loads)
+PRODUCT_COLUMNS = (
+    Product.id, Product.title, Product.description, Product.sizes, Product.telegram_file_ids,
+    Product.is_active, Product.created_at, Product.updated_at
+)
+
+
+def _product_payload(product, sizes, file_ids):
+    """Dict in ProductResponse field order"""
+    return {
+        "id": product.id,
+        "title": product.title,
+        "description": product.description,
+        "sizes": sizes,
+        "telegram_file_ids": file_ids,
+        "is_active": product.is_active,
+        "created_at": product.created_at,
+        "updated_at": product.updated_at
+    }
+
+
+def _encode_cached_products(products):
+    """JSON array bytes for catalogue-cache products"""
+    return orjson.dumps([_product_payload(p, p.sizes, p.file_ids) for p in products])
+
+
+def _row_payload(row):
+    """Payload for a PRODUCT_COLUMNS row (sizes ascending, like size_rows)"""
+    return _product_payload(row, sorted(set(split_sizes(row.sizes))), split_file_ids(row.telegram_file_ids))
+
+
+def _encode_product_rows(rows):
+    """JSON array bytes for PRODUCT_COLUMNS rows"""
+    return orjson.dumps([_row_payload(row) for row in rows])
+
+
+def _encode_catalogue_snapshot(snapshot):
+    """Whole active catalogue as one JSON document"""
+    return orjson.dumps({
+        "etag": snapshot.etag,
+        "token": _encode_change_token(snapshot.last_change),
+        "count": len(snapshot.products),
+        "products": [_product_payload(p, p.sizes, p.file_ids) for p in snapshot.products]
+    })
+
+
+def _accepts_gzip(request: Request):
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def _json_bytes(body, response: Response):
+    """Send pre-encoded JSON as is, keeping the headers set on ``response``"""
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+# Keyset pagination cursors: opaque base64 of "created_at|id"
+MAX_PRODUCT_ID = 2**31 - 1  # products.id is a 32-bit INTEGER on PostgreSQL
+
+
+def _b64decode(value):
+    """Strict urlsafe base64 (padding optional); stray characters raise ValueError"""
+    padded = value + "=" * (-len(value) % 4)
+    return base64.b64decode(padded, altchars=b"-_", validate=True).decode()
+
+
+def _naive_isoformat(value):
+    """Parse a timestamp we issued; stored timestamps are naive UTC"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        raise ValueError("timezone-aware timestamp")
+    return moment
+
+
+def _encode_cursor(product):
+    raw = f"{product.created_at.isoformat()}|{product.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        created_at, product_id = _b64decode(cursor).split("|")
+        created_at, product_id = _naive_isoformat(created_at), int(product_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not 0 < product_id <= MAX_PRODUCT_ID:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, product_id
+
+
+# Change feed tokens: opaque base64 of the newest updated_at the client has seen
+def _encode_change_token(moment):
+    if moment is None:
+        return None
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip("=")
+
+
+def _decode_change_token(token):
+    try:
+        return _naive_isoformat(_b64decode(token))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid token")
+
+
 # Health check
 @router.get("/health")
 async def health_check():
@@ -46,47 +222,218 @@ async def health_check():
 # Products
 @router.get("/products", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    response: Response,
     active_only: bool = True,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    size: Optional[float] = None,
+    size_min: Optional[float] = None,
+    size_max: Optional[float] = None,
+    q: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get products from database"""
+    """Get products from database
+
+    Pass ``cursor`` (from the ``X-Next-Cursor`` header of the previous page)
+    for keyset pagination; ``offset`` is ignored in that mode.
+    Filter by an exact ``size``, a ``size_min``/``size_max`` range, or
+    ``q`` (text in title or description).
+    """
     # Sanitize pagination
     limit = max(1, min(limit, 100))
     offset = max(0, offset)
+    after = _decode_cursor(cursor) if cursor else None
+    # Built from the decoded cursor: ETags and the page cache only ever see
+    # our own canonical form, one entry per real position
+    page_key = f"c{after[0].isoformat()}|{after[1]}" if after else f"{offset}"
+
+    q = q.strip() if q else None
+    filters = {"size": size, "size_min": size_min, "size_max": size_max, "text": q}
+    filtered = any(value is not None for value in filters.values())
+
+    if active_only and not filtered:
+        # Active catalogue is served from memory (newest first)
+        snapshot = await catalog_cache.get_snapshot()
+        if after:
+            products = snapshot.page_after(after[0], after[1], limit + 1)
+        else:
+            products = snapshot.products[offset:offset + limit + 1]
+        etag = f"{snapshot.etag}-{page_key}-{limit}"
+        last_modified = snapshot.last_modified
+        # Same page of the same version is encoded once
+        encode = lambda: _encode_cached_products(products[:limit])
+        encode_page = lambda: snapshot.encoded((page_key, limit), encode)
+    else:
+        # Load real products from database, newest first with id as tie-breaker
+        query = product_search_query(active_only=active_only, **filters).with_only_columns(*PRODUCT_COLUMNS)
+        if after:
+            query = query.where(after_position(*after))
+        else:
+            query = query.offset(offset)
+        products = (await db.execute(query.limit(limit + 1))).all()
+        etag = f"{_rows_etag(products)}-{page_key}-{limit}-{'f' if filtered else 'all'}"
+        # Not the page's own rows: one leaving the page (deleted, edited out
+        # of the filter) must move Last-Modified forward, never back
+        last_modified = await repository.get_last_change()
+        encode_page = lambda: _encode_product_rows(products[:limit])
 
-    # Load real products from database with simple pagination and ordering
-    query = db.query(Product)
-    if active_only:
-        query = query.filter(Product.is_active == True)
-    products = query.order_by(Product.created_at.desc()).offset(offset).limit(limit).all()
-
-    # Format response with real data
-    result = []
-    for product in products:
-        result.append(ProductResponse(
-            id=product.id,
-            title=product.title,
-            description=product.description,
-            sizes=product.get_sizes_list(),  # Real sizes from database
-            telegram_file_ids=product.get_file_ids_list(),  # Real file IDs
-            is_active=product.is_active,
-            created_at=product.created_at,
-            updated_at=product.updated_at
-        ))
-
-    return result
+    # One extra row tells us whether there is a next page
+    has_more = len(products) > limit
+    next_cursor = _encode_cursor(products[limit - 1]) if has_more else None
+
+    not_modified = _conditional(request, response, etag, last_modified)
+    if next_cursor:
+        (not_modified or response).headers["X-Next-Cursor"] = next_cursor
+    if not_modified:
+        return not_modified
+
+    # Already-encoded bytes; response_model only documents the shape
+    return _json_bytes(encode_page(), response)
+
+
+# Whole catalogue in one pre-compressed response (storefront cold start)
+# Declared before /products/{product_id} so "snapshot" isn't parsed as an id
+@router.get("/products/snapshot")
+async def get_products_snapshot(request: Request, response: Response):
+    """Every active product, newest first, as one document
+
+    Built and gzipped once per catalogue version (the first request after an
+    admin write); later requests send the stored bytes.
+    """
+    snapshot = await catalog_cache.get_snapshot()
+    not_modified = _conditional(request, response, f"{snapshot.etag}-snapshot", snapshot.last_modified)
+    if not_modified:
+        return not_modified
+
+    body = snapshot.encoded("snapshot", lambda: _encode_catalogue_snapshot(snapshot))
+    if _accepts_gzip(request):
+        # mtime=0 keeps the bytes identical across workers
+        body = snapshot.encoded("snapshot.gz", lambda: gzip.compress(body, compresslevel=9, mtime=0))
+        response.headers["Content-Encoding"] = "gzip"
+    return _json_bytes(body, response)
+
+
+# Incremental sync for clients that keep a local catalogue
+@router.get("/products/changes")
+async def get_product_changes(response: Response, since: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Active catalogue changes since ``since``
+
+    Start from the ``token`` of /products/snapshot, then pass the ``token`` of
+    each answer to the next call. ``upserted`` holds full products, ``deleted``
+    the ids that left the active catalogue (deleted, archived or deactivated).
+    Changes from the last few seconds before the token are sent again, so
+    apply them idempotently. ``reset`` means there is no usable token or too
+    much changed: reload /products/snapshot instead.
+    """
+    reset = {"token": None, "reset": True, "upserted": [], "deleted": []}
+    if not since:
+        return _json_bytes(orjson.dumps(reset), response)
+
+    since_time = _decode_change_token(since)
+    # Soft deletes and deactivations bump updated_at too; archived rows keep theirs
+    try:
+        window_start = since_time - timedelta(seconds=config.CHANGES_OVERLAP)
+    except OverflowError:
+        # Only a crafted token lands within the overlap of datetime.min
+        raise HTTPException(status_code=400, detail="Invalid token")
+    rows = (await db.execute(
+        select(*PRODUCT_COLUMNS, Product.deleted_at)
+        .where(Product.updated_at >= window_start)
+        .order_by(Product.updated_at, Product.id)
+        .limit(config.CHANGES_MAX + 1)
+    )).all()
+    archived = (await db.execute(
+        select(ProductArchive.id, ProductArchive.updated_at)
+        .where(ProductArchive.updated_at >= window_start)
+        .limit(config.CHANGES_MAX + 1)
+    )).all()
+    if len(rows) + len(archived) > config.CHANGES_MAX:
+        return _json_bytes(orjson.dumps(reset), response)
+
+    upserted = [row for row in rows if row.is_active and row.deleted_at is None]
+    deleted = [row.id for row in rows if not (row.is_active and row.deleted_at is None)]
+    deleted += [row.id for row in archived]
+    token = max([since_time] + [row.updated_at for row in rows] + [row.updated_at for row in archived])
+
+    return _json_bytes(orjson.dumps({
+        "token": _encode_change_token(token),
+        "reset": False,
+        "upserted": [_row_payload(row) for row in upserted],
+        "deleted": deleted
+    }), response)
+
+
+# Product statistics (bonus endpoint)
+# Declared before /products/{product_id} so "stats" isn't parsed as an id
+@router.get("/products/stats")
+async def get_product_stats(days: int = 30, db: AsyncSession = Depends(get_db)):
+    """Get product statistics"""
+    # Totals come from the counters row the admin write paths maintain
+    counters = await db.get(ProductCounters, COUNTERS_ID)
+    if counters:
+        total_products, active_products, products_with_images = counters.total, counters.active, counters.with_images
+    else:
+        totals = (await db.execute(product_totals_query())).one()
+        total_products, active_products, products_with_images = totals.total, totals.active, totals.with_images
+
+    # Images per product (including products without any)
+    image_counts = (
+        select(func.count(ProductImage.id).label("images"))
+        .select_from(Product)
+        .outerjoin(ProductImage, ProductImage.product_id == Product.id)
+        .where(NOT_DELETED)
+        .group_by(Product.id)
+        .subquery()
+    )
+    image_histogram = await db.execute(
+        select(image_counts.c.images, func.count()).group_by(image_counts.c.images).order_by(image_counts.c.images)
+    )
+
+    # Active products per size
+    size_distribution = await db.execute(
+        select(ProductSize.size, func.count())
+        .join(Product, Product.id == ProductSize.product_id)
+        .where(Product.is_active == True, NOT_DELETED)
+        .group_by(ProductSize.size)
+        .order_by(ProductSize.size)
+    )
+
+    # Products created per day over the last ``days`` days
+    days = max(1, min(days, 365))
+    created_day = func.date(Product.created_at)
+    created_per_day = await db.execute(
+        select(created_day, func.count())
+        .where(Product.created_at >= datetime.utcnow() - timedelta(days=days), NOT_DELETED)
+        .group_by(created_day)
+        .order_by(created_day)
+    )
+
+    return {
+        "total_products": total_products,
+        "active_products": active_products,
+        "inactive_products": total_products - active_products,
+        "products_with_images": products_with_images,
+        "products_without_images": total_products - products_with_images,
+        "image_count_histogram": {str(images): count for images, count in image_histogram},
+        "size_distribution": {f"{size:g}": count for size, count in size_distribution},
+        "created_per_day": {str(day): count for day, count in created_per_day}
+    }
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Get single product by ID"""
     # Load real product from database
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    product = await db.get(Product, product_id)
+    if not product or product.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Product not found")
 
+    not_modified = _conditional(request, response, _rows_etag([product]), product.updated_at)
+    if not_modified:
+        return not_modified
+
     # Return real product data
     return ProductResponse(
         id=product.id,
@@ -102,50 +449,96 @@ async def get_product(product_id: int, db: Session = Depends(get_db)):
 
 # Contact (single record)
 @router.get("/contact", response_model=ContactResponse)
-async def get_contact(db: Session = Depends(get_db)):
-    """Get the contact information"""
-    # Load real contact from database
-    contact = db.query(Contact).filter(Contact.is_active == True).order_by(Contact.updated_at.desc()).first()
+async def get_contact(request: Request, response: Response):
+    """Get the contact information (same record the bot shows)"""
+    contact = await contact_provider.get()
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    # Format URLs for web applications
-    telegram_url = None
-    if contact.telegram_username:
-        telegram_url = f"https://t.me/{contact.telegram_username}"
-
-    instagram_url = None
-    if contact.instagram_username:
-        instagram_url = f"https://instagram.com/{contact.instagram_username}"
-
-    # Return real contact data with both raw usernames and web URLs
-    return ContactResponse(
-        id=contact.id,
-        telegram_username=contact.telegram_username,  # Raw username
-        telegram_url=telegram_url,  # Web URL
-        phone_numbers=contact.get_phone_numbers_list(),  # Real phone numbers
-        instagram_username=contact.instagram_username,  # Raw username
-        instagram_url=instagram_url,  # Web URL
-        is_active=contact.is_active
-    )
+    not_modified = _conditional(request, response, _rows_etag([contact]), contact.updated_at)
+    if not_modified:
+        return not_modified
 
+    # Raw usernames plus web URLs, encoded once per contact version
+    return _json_bytes(contact.json(), response)
 
-# Product statistics (bonus endpoint)
-@router.get("/products/stats")
-async def get_product_stats(db: Session = Depends(get_db)):
-    """Get product statistics"""
-    total_products = db.query(Product).count()
-    active_products = db.query(Product).filter(Product.is_active == True).count()
-    inactive_products = total_products - active_products
 
-    # Get products with images
-    products_with_images = db.query(Product).filter(Product.telegram_file_ids.isnot(None)).filter(
-        Product.telegram_file_ids != "").count()
+# Change events pushed as admins edit the catalogue in the bot
+@router.get("/events")
+async def stream_events():
+    """Server-Sent Events: product.created / updated / deleted, contact.updated
 
-    return {
-        "total_products": total_products,
-        "active_products": active_products,
-        "inactive_products": inactive_products,
-        "products_with_images": products_with_images,
-        "products_without_images": total_products - products_with_images
-    }
\ No newline at end of file
+    Events carry ids only; fetch the data with /products/changes. A
+    ``resync`` event means this client fell behind and missed events.
+    """
+    try:
+        event_broker.check_capacity()
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many event subscribers")
+
+    async def stream():
+        # Subscribed only once streaming starts: a client that leaves before
+        # then never runs this body, so there is nothing to unsubscribe
+        try:
+            subscription = event_broker.subscribe()
+        except TooManySubscribers:
+            return  # Filled up since the check
+        try:
+            yield f"retry: {config.EVENTS_KEEPALIVE * 1000}\n\n"
+            while True:
+                event = await subscription.next_event(config.EVENTS_KEEPALIVE)
+                if event is None:
+                    # Idle: a comment keeps proxies from timing out
+                    if subscription.closed:
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield event.sse()
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        # Keeps GZipMiddleware from buffering the stream
+        "Content-Encoding": "identity"
+    })
+
+
+async def _wait_disconnect(websocket: WebSocket):
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/events/ws")
+async def websocket_events(websocket: WebSocket):
+    """Same events as /events, one JSON text message each"""
+    try:
+        event_broker.check_capacity()
+    except TooManySubscribers:
+        await websocket.close(code=1013)  # Try again later
+        return
+
+    await websocket.accept()
+    try:
+        subscription = event_broker.subscribe()
+    except TooManySubscribers:
+        await websocket.close(code=1013)
+        return
+    # Clients only listen, so watch for them leaving while idle
+    disconnected = asyncio.create_task(_wait_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.next_event(None))
+            await asyncio.wait((next_event, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                return
+            event = next_event.result()
+            if event is None:
+                break  # Shutting down
+            await websocket.send_text(f'{{"id":{event.id},"type":"{event.type}","data":{event.data}}}')
+    finally:
+        disconnected.cancel()
+        event_broker.unsubscribe(subscription)
+    await websocket.close(code=1001)  # Going away
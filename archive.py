@@ -0,0 +1,66 @@
+"""
+Archive job for soft-deleted products.
+
+Moves products deleted more than ARCHIVE_AFTER_DAYS ago from `products` to
+`products_archive` in batches, so the hot table and its indexes only hold
+live rows. The API process runs it every ARCHIVE_INTERVAL seconds (see
+main.lifespan), then recounts the product counters row to repair any drift;
+both can also be run once by hand.
+
+Usage:
+  - Archive with the configured age:
+      ./.venv/bin/python archive.py
+
+  - Archive everything deleted more than a day ago:
+      ./.venv/bin/python archive.py --older-than-days 1
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import config
+import repository
+
+
+async def archive_once(older_than_days=None, batch_size=None):
+    """Archive products deleted before the cutoff, return how many moved"""
+    days = config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return await repository.archive_deleted_products(cutoff, batch_size or config.ARCHIVE_BATCH_SIZE)
+
+
+async def archive_worker():
+    """Run archive_once and a counters recount forever, every ARCHIVE_INTERVAL seconds"""
+    while True:
+        try:
+            archived = await archive_once()
+            if archived:
+                print(f"🗄️ Archived {archived} deleted products")
+            await repository.refresh_product_counters()
+        except Exception as e:
+            print(f"⚠️ Archive job failed: {e}")
+        await asyncio.sleep(config.ARCHIVE_INTERVAL)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Move old soft-deleted products to products_archive")
+    parser.add_argument("--older-than-days", type=int, help=f"Default {config.ARCHIVE_AFTER_DAYS}")
+    parser.add_argument("--batch-size", type=int, help=f"Default {config.ARCHIVE_BATCH_SIZE}")
+    args = parser.parse_args(argv)
+
+    from database import create_tables
+    create_tables()
+
+    async def run():
+        archived = await archive_once(args.older_than_days, args.batch_size)
+        await repository.refresh_product_counters()
+        return archived
+
+    archived = asyncio.run(run())
+    print(f"✅ Archived {archived} products, counters recounted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput benchmark for GET /api/products.
+
+Seeds a scratch database (same generator as explain_queries.py), then hammers
+the endpoint in-process and prints requests per second at 50 and 100 items
+per page for:
+
+  - the cached active catalogue (pre-encoded bytes per catalogue version),
+  - the database path (``active_only=false``, column-only select).
+
+It also times encoding one page the old way (ProductResponse models validated
+against List[ProductResponse], then the stdlib JSON encoder) against orjson.
+
+Usage:
+  - Default run (5000 products, 500 requests per case):
+      ./.venv/bin/python bench_api.py --database-url sqlite:////tmp/bench_api.db
+
+  - Against PostgreSQL with more requests:
+      ./.venv/bin/python bench_api.py --database-url postgresql://... --requests 2000
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional
+
+PAGE_SIZES = (50, 100)
+
+
+def run_case(client, params, count):
+    """Request ``count`` pages (following X-Next-Cursor); return req/s"""
+    # Untimed first request loads the catalogue cache / warms the pool
+    client.get("/api/products", params=params).raise_for_status()
+    cursor = None
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get("/api/products", params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        # Wrap around at the end of the catalogue
+        cursor = response.headers.get("X-Next-Cursor")
+    return count / (time.perf_counter() - start)
+
+
+def time_encoders(products, repeat):
+    """(pydantic µs, orjson µs) to encode one page of CachedProducts"""
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from api import ProductResponse, _encode_cached_products
+
+    adapter = TypeAdapter(List[ProductResponse])
+
+    def legacy():
+        models = [ProductResponse(
+            id=p.id, title=p.title, description=p.description, sizes=p.get_sizes_list(),
+            telegram_file_ids=p.get_file_ids_list(), is_active=p.is_active,
+            created_at=p.created_at, updated_at=p.updated_at
+        ) for p in products]
+        return json.dumps(jsonable_encoder(adapter.validate_python(models))).encode()
+
+    timings = []
+    for encode in (legacy, lambda: _encode_cached_products(products)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode()
+        timings.append((time.perf_counter() - start) / repeat * 1e6)
+    return timings
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Benchmark /api/products throughput")
+    parser.add_argument("--database-url", help="Database to seed and query (default: configured DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=5000, help="Make sure at least this many products exist")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per case")
+    args = parser.parse_args(argv)
+
+    # The app's engines read DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api import router
+    from catalog import catalog_cache
+    from database import engine, create_tables
+    from explain_queries import seed_products
+
+    create_tables()
+    seed_products(engine, args.seed)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    with TestClient(app) as client:
+        for limit in PAGE_SIZES:
+            cached = run_case(client, {"limit": limit}, args.requests)
+            database = run_case(client, {"limit": limit, "active_only": "false"}, args.requests)
+            print(f"limit={limit:<3}  cached catalogue {cached:8.0f} req/s   database {database:8.0f} req/s")
+
+        snapshot = client.portal.call(catalog_cache.get_snapshot)
+        for limit in PAGE_SIZES:
+            legacy, fast = time_encoders(snapshot.products[:limit], 200)
+            print(f"encode {limit:<3}  pydantic + json {legacy:8.0f} µs   orjson {fast:6.0f} µs   {legacy / fast:5.1f}x")
+
+    print(f"📦 {catalog_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks for callback_data dispatch.
+
+Times CallbackRouter.resolve for every button the bot draws, then again with
+thousands of extra routes registered to show the lookup cost does not grow
+with the number of routes.
+
+Usage:
+  - Default run:
+      ./.venv/bin/python bench_callbacks.py
+
+  - More iterations / extra routes:
+      ./.venv/bin/python bench_callbacks.py --number 200000 --extra-routes 10000
+"""
+
+import argparse
+import timeit
+from typing import Optional
+
+from bot.handlers.callbacks import router
+from bot.router import CallbackRouter, b36, encode_b36
+
+SAMPLE_CALLBACKS = [
+    "view_products",
+    "contact",
+    "back_to_main",
+    "order_1234",
+    "car_1234_2",
+    "products_page_1234",
+    "size_17.5",
+    "view_product_1234",
+    "edit_1234",
+    "edit_contact_phones",
+    "delete_1234",
+    "confirm_delete_1234",
+    "cancel_delete",
+    "no_such_button_1",
+]
+
+
+def time_resolve(target, callbacks, number):
+    """Nanoseconds per resolve() for each callback"""
+    return {
+        data: timeit.timeit(lambda: target.resolve(data), number=number) / number * 1e9
+        for data in callbacks
+    }
+
+
+def padded_router(extra_routes):
+    """The bot's routes plus ``extra_routes`` unrelated exact and prefix routes"""
+    padded = CallbackRouter()
+    padded._exact = dict(router._exact)
+    padded._prefixes = dict(router._prefixes)
+
+    async def noop(update, context, *args):
+        pass
+
+    for i in range(extra_routes // 2):
+        padded.exact(f"button_{i}", noop)
+        padded.prefix(f"action{i}_", noop, params=(b36,))
+    return padded
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Benchmark callback_data dispatch")
+    parser.add_argument("--number", type=int, default=100000, help="Resolves per callback")
+    parser.add_argument("--extra-routes", type=int, default=5000, help="Unrelated routes for the scaling run")
+    args = parser.parse_args(argv)
+
+    callbacks = SAMPLE_CALLBACKS + [f"action7_{encode_b36(1234567)}"]
+    padded = padded_router(args.extra_routes)
+
+    base = time_resolve(router, SAMPLE_CALLBACKS, args.number)
+    scaled = time_resolve(padded, callbacks, args.number)
+
+    print(f"{'callback_data':<24}{'bot routes':>14}{f'+{args.extra_routes} routes':>18}")
+    for data in callbacks:
+        base_ns = f"{base[data]:.0f} ns" if data in base else "-"
+        print(f"{data:<24}{base_ns:>14}{scaled[data]:>15.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Concurrent request latency with blocking vs async database access.
+
+Mounts two copies of the product-by-id route on one app, each running the
+same query with a fixed --db-latency added inside the database (an SQLite
+``sleep()`` function, or ``pg_sleep`` on PostgreSQL):
+
+  - before: ``async def`` route on the sync session, like the API before the
+    async data-access layer - every query blocks the event loop;
+  - after:  the same route on ``database.get_db`` (AsyncSession).
+
+--concurrency requests are fired at once in-process, alongside probes of
+/api/health. The script prints the wall time, p50/p95 request latency and the
+health-check latency for each. On the blocking route the health check waits
+behind every query; on the async route it does not.
+
+Usage:
+  - Default run (50 concurrent requests, 20 ms per query):
+      ./.venv/bin/python bench_db_latency.py --database-url sqlite:////tmp/bench_db_latency.db
+
+  - Against PostgreSQL:
+      ./.venv/bin/python bench_db_latency.py --database-url postgresql://... --concurrency 100
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def install_sleep(engine):
+    """Give SQLite connections a sleep(seconds) SQL function (PostgreSQL has pg_sleep)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep", 1, lambda seconds: time.sleep(seconds) or 0)
+
+    # Pooled connections opened before the listener lack the function
+    engine.dispose()
+
+
+def build_app(latency):
+    from fastapi import Depends, FastAPI, HTTPException
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from api import router
+    from database import SessionLocal, async_engine, engine, get_db
+    from models import Product
+
+    if engine.dialect.name == "sqlite":
+        install_sleep(engine)
+        install_sleep(async_engine.sync_engine)
+        delay = func.sleep(latency)
+    else:
+        delay = func.pg_sleep(latency)
+
+    def product_query(product_id):
+        # The sleep runs in the database, like a slow round trip
+        return select(Product.id, Product.title, delay).where(Product.id == product_id)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    @app.get("/before/products/{product_id}")
+    async def product_before(product_id: int):
+        db = SessionLocal()
+        try:
+            row = db.execute(product_query(product_id)).first()
+        finally:
+            db.close()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return {"id": row.id, "title": row.title}
+
+    @app.get("/after/products/{product_id}")
+    async def product_after(product_id: int, db: AsyncSession = Depends(get_db)):
+        row = (await db.execute(product_query(product_id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return {"id": row.id, "title": row.title}
+
+    return app
+
+
+async def run_case(app, path, concurrency, product_ids):
+    """(wall s, request latencies, health-check latencies) for one burst"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the pools outside the timing
+        (await client.get(f"{path}/{product_ids[0]}")).raise_for_status()
+
+        async def finished(url):
+            response = await client.get(url)
+            response.raise_for_status()
+            return time.perf_counter()
+
+        async def probe_health(done):
+            # Each probe is due 5 ms after the previous one; a blocked loop delays it
+            timings = []
+            while not done.is_set():
+                due = time.perf_counter() + 0.005
+                await asyncio.sleep(0.005)
+                timings.append(await finished("/api/health") - due)
+            return timings
+
+        done = asyncio.Event()
+        probes = asyncio.create_task(probe_health(done))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        # Latency counts from the burst, so time spent queued behind the loop shows
+        latencies = [end - start for end in await asyncio.gather(*(
+            finished(f"{path}/{product_ids[i % len(product_ids)]}") for i in range(concurrency)
+        ))]
+        wall = time.perf_counter() - start
+        done.set()
+        return wall, latencies, await probes
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Compare concurrent latency of blocking and async database access")
+    parser.add_argument("--database-url", help="Database to seed and query (default: configured DATABASE_URL)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests fired at once per case")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Seconds each query spends in the database")
+    args = parser.parse_args(argv)
+
+    # The app's engines read DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from database import create_tables, engine
+    from explain_queries import seed_products
+    from sqlalchemy import select
+    from models import Product
+
+    create_tables()
+    seed_products(engine, 100)
+    with engine.connect() as conn:
+        product_ids = conn.execute(select(Product.id).limit(100)).scalars().all()
+
+    app = build_app(args.db_latency)
+    print(f"{args.concurrency} concurrent requests, {args.db_latency * 1000:.0f} ms per query")
+    results = {}
+    for name in ("before", "after"):
+        wall, latencies, health = asyncio.run(run_case(app, f"/{name}/products", args.concurrency, product_ids))
+        results[name] = wall
+        print(
+            f"{name:<6}  wall {wall:6.2f}s   p50 {percentile(latencies, 0.5) * 1000:7.0f} ms"
+            f"   p95 {percentile(latencies, 0.95) * 1000:7.0f} ms"
+            f"   /health max {max(health) * 1000:6.0f} ms ({len(health)} probes)"
+        )
+    print(f"⚡ async access finished the burst {results['before'] / results['after']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
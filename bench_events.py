@@ -0,0 +1,166 @@
+"""
+Change event check and fan-out benchmark.
+
+First drives the admin handlers (create, edit, bulk deactivate, bulk and
+single delete, contact create and edit) through a fake bot against a scratch
+database and checks that a subscriber receives exactly the expected event
+types (product.created, product.updated, ...). Then publishes to
+--subscribers idle subscriptions and prints the time per publish. Exits with
+code 1 if any event type is wrong.
+
+Usage:
+  - Default run (10000 subscribers):
+      ./.venv/bin/python bench_events.py --database-url sqlite:////tmp/bench_events.db
+
+  - Bigger fan-out:
+      ./.venv/bin/python bench_events.py --database-url sqlite:////tmp/bench_events.db --subscribers 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Optional
+
+ADMIN_ID = 424242
+
+
+async def drain(subscription):
+    """Event types queued on ``subscription`` so far"""
+    types = []
+    while not subscription.queue.empty():
+        types.append(subscription.queue.get_nowait().type)
+    return types
+
+
+async def check_handler_events():
+    """Run every publishing handler; return [(step, expected, received)]"""
+    import config
+    import events
+    from contact import contact_provider
+    from bot.handlers import callbacks, messages
+    from bot.router import encode_b36
+    from fake_telegram import FakeBot, FakeContext, callback_update, message_update
+
+    config.ADMIN_CHAT_IDS.append(ADMIN_ID)
+    bot = FakeBot()
+    context = FakeContext(bot)
+    subscription = events.event_broker.subscribe()
+    results = []
+
+    async def press(data):
+        await callbacks.handle_callback_query(callback_update(bot, ADMIN_ID, data), context)
+
+    async def step(name, expected, action):
+        await action()
+        results.append((name, expected, await drain(subscription)))
+
+    async def send(text):
+        await messages.handle_text_message(message_update(bot, ADMIN_ID, text), context)
+
+    async def fill(*texts):
+        for text in texts:
+            await send(text)
+
+    created = []
+
+    async def create():
+        await press("admin_add")
+        await fill("Check ring", "Event check", "17", "done")
+        reply = bot.sends(ADMIN_ID)[-1][3]["text"]
+        created.append(int(reply.rsplit(" ", 1)[-1]))
+
+    async def edit():
+        await press(f"edit_{created[0]}")
+        await fill("Check ring 2", "Event check", "17.5", "done")
+
+    async def bulk_deactivate():
+        await press("bulk_select")
+        await press(f"sel_{encode_b36(created[0])}")
+        await press("bulk_deactivate")
+
+    async def bulk_delete():
+        # The selection survives bulk_deactivate
+        await press("bulk_delete")
+        await press("bulk_delete_confirm")
+
+    async def edit_contact():
+        await press("edit_contact_telegram")
+        await send("checkshop")
+
+    # Opening the contact screen creates the default contact on a fresh database
+    had_contact = await contact_provider.get() is not None
+
+    await step("create", [events.PRODUCT_CREATED], create)
+    await step("edit", [events.PRODUCT_UPDATED], edit)
+    await step("bulk deactivate", [events.PRODUCT_UPDATED], bulk_deactivate)
+    await step("bulk delete", [events.PRODUCT_DELETED], bulk_delete)
+    await step("create", [events.PRODUCT_CREATED], create)
+    await step("delete", [events.PRODUCT_DELETED], lambda: press(f"confirm_delete_{created[1]}"))
+    await step("contact open", [] if had_contact else [events.CONTACT_UPDATED], lambda: press("contact"))
+    await step("contact edit", [events.CONTACT_UPDATED], edit_contact)
+
+    events.event_broker.unsubscribe(subscription)
+    return results
+
+
+async def time_fan_out(count, publishes):
+    """Seconds per publish to ``count`` idle subscribers that keep reading"""
+    from events import EventBroker, PRODUCT_UPDATED
+
+    broker = EventBroker(max_subscribers=count)
+    subscriptions = [broker.subscribe() for _ in range(count)]
+
+    async def consume(subscription):
+        while await subscription.next_event(None) is not None:
+            pass
+
+    consumers = [asyncio.create_task(consume(s)) for s in subscriptions]
+    await asyncio.sleep(0)
+
+    elapsed = 0.0
+    for n in range(publishes):
+        start = time.perf_counter()
+        broker.publish(PRODUCT_UPDATED, ids=[n])
+        elapsed += time.perf_counter() - start
+        # Let the consumers drain before the next publish
+        await asyncio.sleep(0)
+
+    broker.close()
+    await asyncio.gather(*consumers)
+    return elapsed / publishes, broker.stats()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Check published event types and time the fan-out")
+    parser.add_argument("--database-url", help="Scratch database for the handler check (default: configured DATABASE_URL)")
+    parser.add_argument("--subscribers", type=int, default=10000, help="Idle subscribers for the fan-out timing")
+    parser.add_argument("--publishes", type=int, default=20, help="Events published in the fan-out timing")
+    args = parser.parse_args(argv)
+
+    # The app's engines read DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from database import create_tables
+    create_tables()
+
+    failed = False
+    for name, expected, received in asyncio.run(check_handler_events()):
+        if received == expected:
+            print(f"✅ {name}: {', '.join(received)}")
+        else:
+            print(f"❌ {name}: expected {expected}, got {received}")
+            failed = True
+
+    per_publish, stats = asyncio.run(time_fan_out(args.subscribers, args.publishes))
+    print(f"📣 Publish to {args.subscribers} subscribers: {per_publish * 1000:.1f} ms ({stats})")
+
+    if failed:
+        sys.exit(1)
+    print("✅ Every handler published the expected event types")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Mixed load test: Telegram updates and API requests on one event loop.
+
+Seeds a scratch database, then runs three phases of --seconds each:
+
+  - bot only:  --chats simulated clients tap through the real handlers
+    (catalogue pages, size filter, /search) via ChatOrderedUpdateProcessor
+    and an offline fake bot;
+  - API only:  --api-clients in-process clients request /api/products
+    (cached and database paths) and /api/products/{id};
+  - both at once, as when the bot and FastAPI share the process.
+
+It prints operations per second and p50/p95 latency for each side, and the
+slowdown (alone / mixed throughput) each suffers while the other runs.
+Telegram send limits are lifted so only the server's own work is measured.
+
+Usage:
+  - Default run (2000 products, 20 chats, 20 API clients, 3 s per phase):
+      ./.venv/bin/python bench_load.py --database-url sqlite:////tmp/bench_load.db
+
+  - Against PostgreSQL with more chats:
+      ./.venv/bin/python bench_load.py --database-url postgresql://... --chats 100 --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+
+def summary(latencies, seconds):
+    """(ops/s, p50 ms, p95 ms)"""
+    if not latencies:
+        return 0.0, 0.0, 0.0
+    latencies = sorted(latencies)
+    pick = lambda fraction: latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+    return len(latencies) / seconds, pick(0.5), pick(0.95)
+
+
+async def bot_load(chats, stop):
+    """Closed loop of client taps per chat; return per-update latencies"""
+    from bot.handlers import callbacks, client
+    from bot.updates import ChatOrderedUpdateProcessor
+    from catalog import catalog_cache
+    from fake_telegram import FakeBot, FakeContext, callback_update, message_update
+
+    bot = FakeBot()
+    processor = ChatOrderedUpdateProcessor(32)
+    snapshot = await catalog_cache.get_snapshot()
+    sizes = sorted({size for product in snapshot.products for size in product.sizes})
+    page_ids = [product.id for product in snapshot.products[::50]]
+    latencies = []
+
+    def next_update(chat_id):
+        """A random client action as (update, handler coroutine factory)"""
+        action = random.random()
+        if action < 0.2:
+            update = message_update(bot, chat_id, "/search Ring 1")
+            return update, lambda: client.search_command(update, FakeContext(bot, ["Ring", "1"]))
+        if action < 0.5:
+            data = f"size_{random.choice(sizes):g}"
+        elif action < 0.8:
+            data = f"products_page_{random.choice(page_ids)}"
+        else:
+            data = "view_products"
+        update = callback_update(bot, chat_id, data)
+        return update, lambda: callbacks.handle_callback_query(update, FakeContext(bot))
+
+    async def user(chat_id):
+        while not stop.is_set():
+            update, handle = next_update(chat_id)
+            start = time.perf_counter()
+            await processor.process_update(update, handle())
+            latencies.append(time.perf_counter() - start)
+
+    async with processor:
+        await asyncio.gather(*(user(chat_id) for chat_id in range(1, chats + 1)))
+    return latencies
+
+
+async def api_load(app, clients, stop, product_ids):
+    """Closed loop of API requests per client; return per-request latencies"""
+    import httpx
+
+    requests = [
+        lambda: "/api/products?limit=50",
+        lambda: "/api/products?limit=50&active_only=false",
+        lambda: f"/api/products/{random.choice(product_ids)}",
+        lambda: f"/api/products?limit=20&size={random.choice((16, 17, 17.5, 18))}",
+    ]
+    latencies = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def client():
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = await http.get(random.choice(requests)())
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies
+
+
+async def phase(app, seconds, chats, api_clients, product_ids):
+    """Run the selected workloads together for ``seconds``"""
+    stop = asyncio.Event()
+    tasks = []
+    if chats:
+        tasks.append(asyncio.create_task(bot_load(chats, stop)))
+    if api_clients:
+        tasks.append(asyncio.create_task(api_load(app, api_clients, stop, product_ids)))
+    await asyncio.sleep(seconds)
+    stop.set()
+    results = await asyncio.gather(*tasks)
+    bot = results.pop(0) if chats else None
+    api = results.pop(0) if api_clients else None
+    return bot, api
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Measure how bot updates and API requests slow each other down")
+    parser.add_argument("--database-url", help="Database to seed and query (default: configured DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=2000, help="Make sure at least this many products exist")
+    parser.add_argument("--chats", type=int, default=20, help="Simulated Telegram clients")
+    parser.add_argument("--api-clients", type=int, default=20, help="Concurrent API clients")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Length of each phase")
+    args = parser.parse_args(argv)
+
+    # The app's engines and send limits are read at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ["TELEGRAM_GLOBAL_RATE"] = "1000000"
+    os.environ["TELEGRAM_CHAT_RATE"] = "1000000"
+    os.environ["TELEGRAM_CHAT_BURST"] = "1000000"
+
+    from fastapi import FastAPI
+    from sqlalchemy import select
+
+    from api import router
+    from database import create_tables, engine
+    from explain_queries import seed_products
+    from models import Product
+
+    create_tables()
+    seed_products(engine, args.seed)
+    with engine.connect() as conn:
+        product_ids = conn.execute(select(Product.id).limit(1000)).scalars().all()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    async def run():
+        # Untimed warm-up: catalogue cache, connection pools, first-call imports
+        await phase(app, 0.5, args.chats, args.api_clients, product_ids)
+        bot_alone, _ = await phase(app, args.seconds, args.chats, 0, product_ids)
+        _, api_alone = await phase(app, args.seconds, 0, args.api_clients, product_ids)
+        bot_mixed, api_mixed = await phase(app, args.seconds, args.chats, args.api_clients, product_ids)
+        return bot_alone, api_alone, bot_mixed, api_mixed
+
+    bot_alone, api_alone, bot_mixed, api_mixed = asyncio.run(run())
+
+    rows = [
+        ("bot updates", summary(bot_alone, args.seconds), summary(bot_mixed, args.seconds)),
+        ("API requests", summary(api_alone, args.seconds), summary(api_mixed, args.seconds)),
+    ]
+    print(f"{args.chats} chats, {args.api_clients} API clients, {args.seconds:g}s per phase")
+    for name, alone, mixed in rows:
+        print(f"{name:<12}  alone {alone[0]:7.0f}/s  p50 {alone[1]:6.1f} ms  p95 {alone[2]:6.1f} ms   "
+              f"mixed {mixed[0]:7.0f}/s  p50 {mixed[1]:6.1f} ms  p95 {mixed[2]:6.1f} ms   "
+              f"slowdown {alone[0] / mixed[0] if mixed[0] else float('inf'):.1f}x")
+
+    if not (bot_mixed and api_mixed):
+        print("❌ One side made no progress while the other was running")
+        sys.exit(1)
+    print("✅ Both sides kept serving under mixed load")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Database-path latency of /api/products: deep pages and filters.
+
+Seeds a scratch database (same generator as explain_queries.py) up to each
+--products count in turn, and at each size prints the median latency of:
+
+  - one page at increasing depths through the database path
+    (``active_only=false``), once with ``offset=N`` and once with the
+    cursor of row N;
+  - the size filters (exact ``size`` and a ``size_min``/``size_max`` range)
+    and ``q`` text search, including a term that matches nothing (the
+    worst case without trigram indexes).
+
+Usage:
+  - Default run (10000 then 100000 products):
+      ./.venv/bin/python bench_queries.py --database-url sqlite:////tmp/bench_queries.db
+
+  - Only the 100k catalogue:
+      ./.venv/bin/python bench_queries.py --database-url sqlite:////tmp/bench_queries.db --products 100000
+
+  - Against PostgreSQL:
+      ./.venv/bin/python bench_queries.py --database-url postgresql://... --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Optional
+
+DEPTHS = (0, 1000, 10000, 50000, 99000)
+FILTERS = (
+    ("size=17", {"size": 17}),
+    ("size 16.5-17.5", {"size_min": 16.5, "size_max": 17.5}),
+    ("size=17, page 2", {"size": 17, "offset": 50}),
+    ("size=21 (none)", {"size": 21}),
+    ("q=Ring 4242", {"q": "Ring 4242"}),
+    ("q=Generated", {"q": "Generated"}),
+    ("q=no match", {"q": "sapphire"}),
+)
+
+
+def median_ms(client, url, params, repeat):
+    """Median latency of ``repeat`` GETs in milliseconds"""
+    client.get(url, params=params).raise_for_status()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(url, params=params).raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def row_at(engine, depth):
+    """The product at ``depth`` in newest-first order (what a cursor points past)"""
+    from sqlalchemy import select
+    from models import Product
+
+    with engine.connect() as conn:
+        return conn.execute(
+            select(Product.id, Product.created_at)
+            .order_by(Product.created_at.desc(), Product.id.desc())
+            .offset(depth)
+            .limit(1)
+        ).first()
+
+
+def deep_pages(client, engine, total, limit, repeat):
+    print(f"Deep pages ({total} products, limit={limit}, median of {repeat}):")
+    from api import _encode_cursor
+
+    for depth in DEPTHS:
+        if depth >= total:
+            continue
+        params = {"limit": limit, "active_only": "false"}
+        offset = median_ms(client, "/api/products", {**params, "offset": depth}, repeat)
+        if depth:
+            # The cursor of the row just before the page
+            cursor = _encode_cursor(row_at(engine, depth - 1))
+            keyset = median_ms(client, "/api/products", {**params, "cursor": cursor}, repeat)
+        else:
+            keyset = offset
+        print(f"  depth {depth:>6}   offset {offset:8.1f} ms   cursor {keyset:8.1f} ms   {offset / keyset:5.1f}x")
+
+
+def filters(client, total, limit, repeat):
+    print(f"Filters ({total} products, limit={limit}, median of {repeat}):")
+    for name, params in FILTERS:
+        params = {"limit": limit, **params}
+        found = len(client.get("/api/products", params=params).json())
+        print(f"  {name:<16} {median_ms(client, '/api/products', params, repeat):8.1f} ms   {found:>3} rows")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Compare offset and cursor pagination at depth")
+    parser.add_argument("--database-url", help="Database to seed and query (default: configured DATABASE_URL)")
+    parser.add_argument(
+        "--products", type=int, nargs="+", default=[10000, 100000],
+        help="Catalogue sizes to measure at, seeded in ascending order"
+    )
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per measurement")
+    args = parser.parse_args(argv)
+
+    # The app's engines read DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+
+    from api import router
+    from database import create_tables, engine
+    from explain_queries import seed_products
+    from models import Product
+
+    create_tables()
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    with TestClient(app) as client:
+        for count in sorted(args.products):
+            seed_products(engine, count)
+            with engine.connect() as conn:
+                total = conn.execute(select(func.count()).select_from(Product)).scalar()
+            deep_pages(client, engine, total, args.limit, args.repeat)
+            filters(client, total, args.limit, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for product message rendering.
+
+Renders a generated catalogue for clients and admins twice: cold (empty
+render cache, every caption formatted and escaped) and warm (served from the
+cache), and prints the time per product for each.
+
+Usage:
+  - Default run (1000 products):
+      ./.venv/bin/python bench_render.py
+
+  - Bigger catalogue:
+      ./.venv/bin/python bench_render.py --products 5000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from catalog import CachedProduct
+from models import Product
+from bot.render import render_cache, render_product, CLIENT, ADMIN
+
+SAMPLE_SIZES = [15.5, 16, 16.5, 17, 17.5, 18, 18.5, 19, 19.5, 20]
+
+
+def generated_catalogue(count):
+    """CachedProducts like the catalogue cache hands to the bot"""
+    start = datetime.utcnow() - timedelta(days=30)
+    products = []
+    for n in range(count):
+        product = Product(
+            id=n + 1,
+            title=f"Ring #{n} (gold_{n % 7})",
+            description=f"Hand-made ring {n}. 585 gold, stones: *topaz* & [zircon]!",
+            sizes=", ".join(str(s) for s in random.sample(SAMPLE_SIZES, 4)),
+            telegram_file_ids=",".join(f"file-{n}-{i}" for i in range(n % 3)),
+            is_active=True,
+            created_at=start + timedelta(minutes=n),
+            updated_at=start + timedelta(minutes=n)
+        )
+        products.append(CachedProduct(product))
+    return products
+
+
+def time_pass(products, audience):
+    start = time.perf_counter()
+    for product in products:
+        render_product(product, audience)
+    return time.perf_counter() - start
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm product rendering")
+    parser.add_argument("--products", type=int, default=1000, help="Catalogue size")
+    args = parser.parse_args(argv)
+
+    products = generated_catalogue(args.products)
+    render_cache.max_entries = max(render_cache.max_entries, args.products * 2)
+
+    for audience in (CLIENT, ADMIN):
+        render_cache.invalidate()
+        cold = time_pass(products, audience)
+        warm = time_pass(products, audience)
+        print(f"{audience:<7} cold {cold * 1000:8.1f} ms ({cold / args.products * 1e6:6.1f} µs/product)   "
+              f"warm {warm * 1000:7.1f} ms ({warm / args.products * 1e6:5.1f} µs/product)   "
+              f"{cold / warm:5.0f}x")
+    print(f"📦 {render_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Send-rate simulation for the client product lists.
+
+Seeds a scratch database with text-only products, then has --clients chats
+at once open the size filter and /search through the real handlers, with an
+offline fake bot that records when each message would go out. One chat
+also pages through the whole size list with the next buttons. Fails
+(exit code 1) if:
+  - a tap sends more than one page of cards plus a header and footer;
+  - paging misses, repeats or reorders a product;
+  - any chat, or the bot as a whole, sends faster than the
+    TELEGRAM_CHAT_RATE / TELEGRAM_GLOBAL_RATE buckets allow.
+
+Usage:
+  - Default run (20 chats, 12 products):
+      ./.venv/bin/python bench_sends.py --database-url sqlite:////tmp/bench_sends.db
+
+  - More chats against a 2 msg/s chat limit:
+      ./.venv/bin/python bench_sends.py --database-url sqlite:////tmp/bench_sends.db --clients 100 --chat-rate 2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Optional
+
+SIZE = 17.0
+OTHER_SIZE = 18.0
+# Scheduler timing slack: sleeps wake up a little late, never early
+EPSILON = 0.05
+
+
+def max_in_window(times, window):
+    """Most timestamps that fall in any ``window``-second span"""
+    times = sorted(times)
+    most = 0
+    low = 0
+    for high, moment in enumerate(times):
+        while moment - times[low] > window:
+            low += 1
+        most = max(most, high - low + 1)
+    return most
+
+
+def check_rate(times, rate, burst, label):
+    """Errors where ``times`` exceed a token bucket of ``rate``/s and ``burst``"""
+    errors = []
+    for window in (1.0, 5.0):
+        allowed = burst + rate * (window + EPSILON)
+        seen = max_in_window(times, window)
+        if seen > allowed:
+            errors.append(f"{label}: {seen} sends in {window:g}s (bucket allows {allowed:.0f})")
+    return errors
+
+
+async def seed(count):
+    """Create ``count`` text-only products; every third one is OTHER_SIZE"""
+    import repository
+    from catalog import catalog_cache
+
+    for n in range(count):
+        await repository.create_product(
+            title=f"Ring {n}",
+            description=f"Simulated product {n}",
+            sizes=[OTHER_SIZE if n % 3 == 0 else SIZE],
+            file_ids=[]
+        )
+    catalog_cache.invalidate()
+
+
+def buttons(call):
+    """callback_data of every inline button on a recorded call"""
+    markup = call[3].get("reply_markup")
+    if markup is None:
+        return []
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def card_id(call):
+    """Product id of a product card (it carries the order button), else None"""
+    for data in buttons(call):
+        if data.startswith("order_"):
+            return int(data[len("order_"):])
+    return None
+
+
+def next_page(call):
+    """callback_data of the footer's next-page button, if there is one"""
+    from bot.constants import BTN_NEXT_PAGE
+
+    markup = call[3].get("reply_markup")
+    if markup is None:
+        return None
+    for row in markup.inline_keyboard:
+        for button in row:
+            if button.text == BTN_NEXT_PAGE:
+                return button.callback_data
+    return None
+
+
+async def simulate(clients, latency):
+    """Run the taps; return (bot, errors, per-tap seconds)"""
+    import config
+    from catalog import catalog_cache
+    from bot.handlers import callbacks, client
+    from fake_telegram import FakeBot, FakeContext, callback_update, message_update
+
+    bot = FakeBot(latency=latency)
+    page_size = max(1, config.CATALOG_PAGE_SIZE)
+    errors = []
+    durations = []
+
+    async def tap(chat_id, action):
+        before = len(bot.sends(chat_id))
+        start = time.monotonic()
+        await action()
+        durations.append(time.monotonic() - start)
+        sent = bot.sends(chat_id)[before:]
+        # Every card is one send_message (no images), plus a header and footer
+        if len(sent) > page_size + 2:
+            errors.append(f"chat {chat_id}: one tap sent {len(sent)} messages (page size {page_size})")
+        return sent
+
+    async def press(chat_id, data):
+        update = callback_update(bot, chat_id, data)
+        return await tap(chat_id, lambda: callbacks.handle_callback_query(update, FakeContext(bot)))
+
+    async def search(chat_id):
+        update = message_update(bot, chat_id, "/search Ring")
+        return await tap(chat_id, lambda: client.search_command(update, FakeContext(bot, ["Ring"])))
+
+    async def browse(chat_id):
+        await press(chat_id, f"size_{SIZE:g}")
+        await search(chat_id)
+
+    async def walk(chat_id):
+        """Follow the next buttons through every page of SIZE; return the card ids"""
+        seen = []
+        data = f"size_{SIZE:g}"
+        while data:
+            sent = await press(chat_id, data)
+            seen += [card_id(call) for call in sent if card_id(call) is not None]
+            data = next_page(sent[-1]) if sent else None
+        return seen
+
+    expected = [
+        product.id for product in (await catalog_cache.get_snapshot()).products
+        if SIZE in product.sizes
+    ]
+    results = await asyncio.gather(walk(1), *(browse(chat_id) for chat_id in range(2, clients + 2)))
+    if results[0] != expected:
+        errors.append(f"paging size {SIZE:g} showed {results[0]}, expected {expected}")
+    return bot, errors, durations
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Simulate paged product lists against the send rate limits")
+    parser.add_argument("--database-url", help="Scratch database (default: configured DATABASE_URL)")
+    parser.add_argument("--clients", type=int, default=20, help="Chats tapping at the same time")
+    parser.add_argument("--products", type=int, default=12, help="Products to seed")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per simulated Bot API call")
+    parser.add_argument("--chat-rate", type=float, help="Override TELEGRAM_CHAT_RATE (messages/s per chat)")
+    parser.add_argument("--global-rate", type=float, help="Override TELEGRAM_GLOBAL_RATE (messages/s)")
+    args = parser.parse_args(argv)
+
+    # The app's engines and limits are read at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if args.chat_rate:
+        os.environ["TELEGRAM_CHAT_RATE"] = str(args.chat_rate)
+    if args.global_rate:
+        os.environ["TELEGRAM_GLOBAL_RATE"] = str(args.global_rate)
+
+    import config
+    from database import create_tables
+    create_tables()
+
+    async def run():
+        await seed(args.products)
+        return await simulate(args.clients, args.latency)
+
+    start = time.perf_counter()
+    bot, errors, durations = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    sends = bot.sends()
+    by_chat = {}
+    for call in sends:
+        by_chat.setdefault(call[1], []).append(call[2])
+    for chat_id, times in by_chat.items():
+        errors += check_rate(times, config.TELEGRAM_CHAT_RATE, config.TELEGRAM_CHAT_BURST, f"chat {chat_id}")
+    errors += check_rate([call[2] for call in sends], config.TELEGRAM_GLOBAL_RATE, config.TELEGRAM_GLOBAL_RATE, "bot")
+
+    durations.sort()
+    print(f"📨 {len(sends)} messages to {len(by_chat)} chats in {elapsed:.1f}s")
+    print(f"   Busiest second: {max_in_window([call[2] for call in sends], 1.0)} messages "
+          f"(limit {config.TELEGRAM_GLOBAL_RATE:g}/s, {config.TELEGRAM_CHAT_RATE:g}/s per chat, burst {config.TELEGRAM_CHAT_BURST:g})")
+    print(f"   Tap to last message: median {durations[len(durations) // 2]:.2f}s, max {durations[-1]:.2f}s")
+
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        sys.exit(1)
+    print("✅ Pages bounded, complete and within the send limits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Throughput and ordering check for the bot's update processor.
+
+Pushes synthetic updates from many chats through ChatOrderedUpdateProcessor
+the same way Application's update fetcher does (one task per update, in
+arrival order) with a handler that simulates I/O latency. Fails (exit code 1)
+if any chat sees its updates out of order or the concurrency limit is
+exceeded, and prints the speedup over sequential processing.
+
+Usage:
+  - Default run (1000 updates, 50 chats, 10 ms per update):
+      ./.venv/bin/python bench_updates.py
+
+  - Heavier chats and a smaller concurrency limit:
+      ./.venv/bin/python bench_updates.py --updates 1000 --chats 5 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+from telegram import Chat, Message, Update, User
+
+from bot.updates import ChatOrderedUpdateProcessor
+
+
+def synthetic_updates(count, chats):
+    """``count`` text message updates spread randomly over ``chats`` chats"""
+    updates = []
+    for update_id in range(1, count + 1):
+        chat_id = random.randint(1, chats)
+        message = Message(
+            message_id=update_id,
+            date=datetime.utcnow(),
+            chat=Chat(chat_id, Chat.PRIVATE),
+            from_user=User(chat_id, f"user{chat_id}", False),
+            text=f"step {update_id}"
+        )
+        updates.append(Update(update_id, message=message))
+    return updates
+
+
+async def run(updates, concurrency, latency):
+    """Process ``updates``; return (seconds, max in flight, per-chat handled order)"""
+    processor = ChatOrderedUpdateProcessor(concurrency)
+    handled = {}
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handle(update):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Jittered latency so later updates would overtake earlier ones if allowed
+        await asyncio.sleep(latency * random.uniform(0.5, 1.5))
+        handled.setdefault(update.effective_chat.id, []).append(update.update_id)
+        in_flight -= 1
+
+    start = time.perf_counter()
+    async with processor:
+        tasks = [
+            asyncio.create_task(processor.process_update(update, handle(update)))
+            for update in updates
+        ]
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    if processor.active_chats:
+        raise RuntimeError(f"{processor.active_chats} chat locks were not released")
+    return elapsed, max_in_flight, handled
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Check update throughput and per-chat ordering")
+    parser.add_argument("--updates", type=int, default=1000, help="Number of synthetic updates")
+    parser.add_argument("--chats", type=int, default=50, help="Number of distinct chats")
+    parser.add_argument("--concurrency", type=int, default=32, help="Max updates processed at once")
+    parser.add_argument("--latency", type=float, default=0.01, help="Average handler time in seconds")
+    args = parser.parse_args(argv)
+
+    updates = synthetic_updates(args.updates, args.chats)
+    elapsed, max_in_flight, handled = asyncio.run(run(updates, args.concurrency, args.latency))
+
+    expected = {}
+    for update in updates:
+        expected.setdefault(update.effective_chat.id, []).append(update.update_id)
+    out_of_order = [chat_id for chat_id, ids in expected.items() if handled.get(chat_id) != ids]
+
+    sequential = args.updates * args.latency
+    print(f"⏱️  {args.updates} updates from {len(expected)} chats in {elapsed:.2f}s "
+          f"({args.updates / elapsed:.0f} updates/s, ~{sequential / elapsed:.1f}x sequential)")
+    print(f"🔀 Max updates in flight: {max_in_flight} (limit {args.concurrency})")
+
+    failed = False
+    if out_of_order:
+        print(f"❌ {len(out_of_order)} chats saw updates out of order: {out_of_order[:10]}")
+        failed = True
+    if max_in_flight > args.concurrency:
+        print("❌ Concurrency limit exceeded")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Every chat processed its updates in order")
+
+
+if __name__ == "__main__":
+    main()
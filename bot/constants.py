@@ -11,13 +11,24 @@ ADMIN_HELP = (
     "• /edit_contact - Kontakt tahrirlash"
 )
 
-CLIENT_HELP = "💍 *Dunya Jewellery*\n\n• /start - Asosiy menyu\n• Mahsulotlarni ko'rish uchun tugmalardan foydalaning"
+CLIENT_HELP = "💍 *Dunya Jewellery*\n\n• /start - Asosiy menyu\n• /search - Mahsulot qidirish\n• Mahsulotlarni ko'rish uchun tugmalardan foydalaning"
 
 # Product messages
 NO_PRODUCTS_ADMIN = "📦 Mahsulotlar yo'q. Yangi qo'shing."
 NO_PRODUCTS_CLIENT = "🔍 Hozircha mahsulotlar mavjud emas."
 ALL_PRODUCTS_HEADER = "📦 *Barcha mahsulotlar*"
 CLIENT_PRODUCTS_HEADER = "🛍️ *Bizning mahsulotlar*"
+CLIENT_PRODUCTS_PAGE_HEADER = "🛍️ *Bizning mahsulotlar* · {} / {}"
+PRODUCTS_PAGE_FOOTER = "📄 Sahifa {} / {}\n\nQuyidagi tugmalardan foydalaning:"
+
+# Product filters
+SIZE_FILTER_PROMPT = "📏 O'lchamni tanlang:"
+SIZE_FILTER_HEADER = "📏 *{} o'lchamdagi mahsulotlar*"
+NO_PRODUCTS_FOR_SIZE = "🔍 {} o'lchamdagi mahsulotlar topilmadi."
+SEARCH_USAGE = "🔎 Qidirish uchun: /search uzuk"
+SEARCH_HEADER = "🔎 *Qidiruv natijalari*"
+NO_SEARCH_RESULTS = "🔍 Hech narsa topilmadi."
+SEARCH_TRUNCATED = "🔎 Birinchi {} ta natija ko'rsatildi. Aniqroq so'z bilan qidiring."
 
 # Product creation (NO SKIP)
 ADD_PRODUCT_START = "✏️ *Yangi mahsulot qo'shamiz!*\n\nMahsulot nomini yuboring:"
@@ -35,6 +46,9 @@ EDIT_IMAGES_PROMPT = "📸 Yangi rasmlarni yuboring yoki *tayyor* yozing\n\n💡
 PRODUCT_CREATED = "✅ *{}* yaratildi! ID: {}"
 PRODUCT_UPDATED = "✅ *{}* yangilandi!"
 PRODUCT_DELETED = "✅ *{}* o'chirildi!"
+BULK_ACTIVATED = "✅ {} ta mahsulot faollashtirildi"
+BULK_DEACTIVATED = "🚫 {} ta mahsulot nofaol qilindi"
+BULK_DELETED = "🗑️ {} ta mahsulot o'chirildi"
 IMAGE_ADDED = "📸 {}-rasm qo'shildi! Yana yuboring yoki *tayyor* yozing."
 IMAGES_REPLACED = "📸 Eski rasmlar o'chirildi! Yangi rasmlar qo'shilmoqda..."
 
@@ -48,6 +62,9 @@ INVALID_IMAGES_ERROR = "⚠️ Rasmlar buzilgan - qayta yuklang"
 INVALID_FILE_ID_ERROR = "⚠️ Rasmlar noto'g'ri - qayta yuklang"
 
 # Confirmation
+BULK_SELECTED = "☑️ Tanlangan: {} ta"
+BULK_NOTHING_SELECTED = "⚠️ Hech narsa tanlanmagan"
+BULK_DELETE_CONFIRMATION = "⚠️ *{} ta* mahsulotni o'chirasizmi?"
 DELETE_CONFIRMATION = "🗑️ *O'chirishni tasdiqlang*\n\nMahsulot: *{}*\n\nRostdan o'chirasizmi?"
 DELETE_CANCELLED = "❌ Bekor qilindi"
 
@@ -81,7 +98,7 @@ CONTACT_TEMPLATE_ADMIN = (
     "📷 Instagram: {}"
 )
 
-CONTACT_TEMPLATE_CLIENT = "📱 {}\n📞 {}\n📷 {}"
+CONTACT_HEADER_CLIENT = "📞 Bog'lanish ma'lumotlari"
 
 # Default values
 DEFAULT_DESCRIPTION = "Tavsif yo'q"
@@ -102,6 +119,16 @@ BTN_CONFIRM_DELETE = "✅ Ha"
 BTN_CANCEL = "❌ Yo'q"
 BTN_BACK_MAIN = "🔙 Asosiy"
 BTN_BACK_TO_LIST = "🔙 Ro'yxat"
+BTN_FILTER_SIZE = "📏 O'lcham bo'yicha"
+BTN_PREV_PAGE = "⬅️ Oldingi"
+BTN_NEXT_PAGE = "Keyingi ➡️"
+BTN_NEXT_IMAGE = "🖼️ Rasm {} / {}"
+BTN_BULK_SELECT = "☑️ Tanlash"
+BTN_BULK_ALL = "☑️ Hammasi"
+BTN_BULK_ACTIVATE = "✅ Faollashtirish"
+BTN_BULK_DEACTIVATE = "🚫 Nofaol qilish"
+BTN_BULK_DELETE = "🗑️ O'chirish"
+BTN_BULK_DONE = "🔙 Tayyor"
 
 # Contact edit options
 BTN_EDIT_TELEGRAM = "📱 Telegram"
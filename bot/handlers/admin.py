@@ -1,14 +1,22 @@
 """Simple admin handlers - INLINE KEYBOARD ONLY"""
 
-from telegram import Update, InputMediaPhoto, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InputMediaPhoto
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
 
-from database import get_db_session
-from models import Product
-from ..utils import admin_required, format_product_for_admin, set_user_state
+import broadcast
+import events
+import repository
+from ..utils import admin_required, get_user_state, set_user_state, clear_user_state
+from ..render import render_product, ADMIN
 from ..constants import *
-from ..keyboards import get_products_list_keyboard, get_delete_confirmation_keyboard, get_admin_nav_keyboard
+from ..keyboards import (
+    get_products_list_keyboard,
+    get_delete_confirmation_keyboard,
+    get_bulk_delete_confirmation_keyboard,
+    get_admin_nav_keyboard
+)
 
 @admin_required
 async def show_admin_products(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -22,10 +30,17 @@ async def show_admin_products(update: Update, context: ContextTypes.DEFAULT_TYPE
         chat_id = update.effective_chat.id
         edit_message = lambda text, **kwargs: context.bot.send_message(chat_id, text, **kwargs)
 
+    # Leaving multi-select mode (its "done" button leads here)
+    state = await get_user_state(update.effective_user.id)
+    if state and state.get('action') == 'bulk_select':
+        await clear_user_state(update.effective_user.id)
+
+    await send_products_list(edit_message)
+
+async def send_products_list(edit_message, selected=None):
+    """Render the admin product list; ``selected`` (set of ids) switches to multi-select"""
     # Load real products from database
-    db = get_db_session()
-    products = db.query(Product).all()
-    db.close()
+    products = await repository.get_all_products()
 
     if not products:
         await edit_message(NO_PRODUCTS_ADMIN, parse_mode='MarkdownV2')
@@ -36,40 +51,128 @@ async def show_admin_products(update: Update, context: ContextTypes.DEFAULT_TYPE
     for product in products:
         status = "✅" if product.is_active else "❌"
         title = product.title[:25] + "..." if len(product.title) > 25 else product.title
-        product_list += f"{status} {product.id} - {title}\n"
+        product_list += escape_markdown(f"{status} {product.id} - {title}", version=2) + "\n"
 
-    product_list += f"\n📋 Jami: {len(products)} ta\n\n👆 Mahsulotni tanlang:"
+    if selected is None:
+        product_list += f"\n📋 Jami: {len(products)} ta\n\n👆 Mahsulotni tanlang:"
+    else:
+        product_list += "\n" + BULK_SELECTED.format(len(selected))
 
-    reply_markup = get_products_list_keyboard(products)
+    reply_markup = get_products_list_keyboard(products, selected)
     await edit_message(product_list, reply_markup=reply_markup, parse_mode='MarkdownV2')
 
+async def _bulk_selection(user_id):
+    """Selected product ids while in multi-select mode, else None"""
+    state = await get_user_state(user_id)
+    if not state or state.get('action') != 'bulk_select':
+        return None
+    return state['selected']
+
 @admin_required
-async def show_single_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show single product details"""
+async def start_bulk_select(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Switch the product list to multi-select mode"""
     query = update.callback_query
     await query.answer()
 
-    product_id = int(query.data.split("_")[2])
+    selected = await _bulk_selection(query.from_user.id) or []
+    await set_user_state(query.from_user.id, {'action': 'bulk_select', 'selected': selected})
+    await send_products_list(query.edit_message_text, set(selected))
+
+@admin_required
+async def toggle_bulk_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
+    """Select / unselect one product in multi-select mode"""
+    query = update.callback_query
+    await query.answer()
 
-    db = get_db_session()
-    product = db.query(Product).filter(Product.id == product_id).first()
-    db.close()
+    selected = set(await _bulk_selection(query.from_user.id) or [])
+    selected ^= {product_id}
+    await set_user_state(query.from_user.id, {'action': 'bulk_select', 'selected': sorted(selected)})
+    await send_products_list(query.edit_message_text, selected)
+
+@admin_required
+async def toggle_bulk_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Select every product, or clear the selection if all are selected"""
+    query = update.callback_query
+    await query.answer()
+
+    all_ids = {product.id for product in await repository.get_all_products()}
+    selected = set(await _bulk_selection(query.from_user.id) or [])
+    selected = set() if all_ids <= selected else all_ids
+    await set_user_state(query.from_user.id, {'action': 'bulk_select', 'selected': sorted(selected)})
+    await send_products_list(query.edit_message_text, selected)
+
+async def apply_bulk_active(update: Update, context: ContextTypes.DEFAULT_TYPE, is_active):
+    """Activate / deactivate the selection with one UPDATE"""
+    query = update.callback_query
+    selected = await _bulk_selection(query.from_user.id)
+    if not selected:
+        await query.answer(BULK_NOTHING_SELECTED)
+        return
+
+    changed = await repository.set_products_active(selected, is_active)
+    if changed:
+        await broadcast.announce(events.PRODUCT_UPDATED, ids=selected)
+    await query.answer((BULK_ACTIVATED if is_active else BULK_DEACTIVATED).format(changed))
+    await send_products_list(query.edit_message_text, set(selected))
+
+@admin_required
+async def bulk_activate(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await apply_bulk_active(update, context, True)
+
+@admin_required
+async def bulk_deactivate(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await apply_bulk_active(update, context, False)
+
+@admin_required
+async def confirm_bulk_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Ask before deleting the selection"""
+    query = update.callback_query
+    selected = await _bulk_selection(query.from_user.id)
+    if not selected:
+        await query.answer(BULK_NOTHING_SELECTED)
+        return
+
+    await query.answer()
+    await query.edit_message_text(
+        BULK_DELETE_CONFIRMATION.format(len(selected)),
+        reply_markup=get_bulk_delete_confirmation_keyboard(),
+        parse_mode='MarkdownV2'
+    )
+
+@admin_required
+async def bulk_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Delete the selection with single IN statements"""
+    query = update.callback_query
+    selected = await _bulk_selection(query.from_user.id)
+    if not selected:
+        await query.answer(BULK_NOTHING_SELECTED)
+        return
+
+    deleted = await repository.delete_products(selected)
+    if deleted:
+        await broadcast.announce(events.PRODUCT_DELETED, ids=selected)
+    await clear_user_state(query.from_user.id)
+
+    await query.answer(BULK_DELETED.format(deleted))
+    await send_products_list(query.edit_message_text)
+
+@admin_required
+async def show_single_product(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
+    """Show single product details"""
+    query = update.callback_query
+    await query.answer()
+
+    product = await repository.get_product(product_id)
 
     if not product:
         await query.edit_message_text(PRODUCT_NOT_FOUND, parse_mode='MarkdownV2')
         return
 
-    message = format_product_for_admin(product)
+    rendered = render_product(product, ADMIN)
+    message = rendered.text
+    reply_markup = rendered.reply_markup
     file_ids = product.get_file_ids_list()
 
-    # Create action buttons
-    back_keyboard = [
-        [InlineKeyboardButton(BTN_BACK_TO_LIST, callback_data="admin_products")],
-        [InlineKeyboardButton(BTN_EDIT, callback_data=f"edit_{product.id}")],
-        [InlineKeyboardButton(BTN_DELETE, callback_data=f"delete_{product.id}")]
-    ]
-    reply_markup = InlineKeyboardMarkup(back_keyboard)
-
     if file_ids:
         try:
             if len(file_ids) == 1:
@@ -124,7 +227,7 @@ async def start_add_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
         send_message = update.message.reply_text
 
-    set_user_state(user_id, {
+    await set_user_state(user_id, {
         'action': 'add',
         'step': 'title'
     })
@@ -132,17 +235,14 @@ async def start_add_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await send_message(ADD_PRODUCT_START, parse_mode='Markdown')
 
 @admin_required
-async def start_edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def start_edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
     """Start product editing"""
     query = update.callback_query
     await query.answer()
 
-    product_id = int(query.data.split("_")[1])
     user_id = query.from_user.id
 
-    db = get_db_session()
-    product = db.query(Product).filter(Product.id == product_id).first()
-    db.close()
+    product = await repository.get_product(product_id)
 
     if not product:
         await context.bot.send_message(
@@ -152,11 +252,16 @@ async def start_edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return
 
-    set_user_state(user_id, {
+    await set_user_state(user_id, {
         'action': 'edit',
         'step': 'title',
         'product_id': product_id,
-        'current_product': product
+        # Plain snapshot for the "current value" prompts
+        'current': {
+            'description': product.description,
+            'sizes': product.get_sizes_list(),
+            'image_count': len(product.get_file_ids_list())
+        }
     })
 
     await context.bot.send_message(
@@ -166,16 +271,12 @@ async def start_edit_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
     )
 
 @admin_required
-async def confirm_delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def confirm_delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
     """Ask for deletion confirmation"""
     query = update.callback_query
     await query.answer()
 
-    product_id = int(query.data.split("_")[1])
-
-    db = get_db_session()
-    product = db.query(Product).filter(Product.id == product_id).first()
-    db.close()
+    product = await repository.get_product(product_id)
 
     if not product:
         await context.bot.send_message(
@@ -194,18 +295,14 @@ async def confirm_delete_product(update: Update, context: ContextTypes.DEFAULT_T
     )
 
 @admin_required
-async def delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
     """Delete product after confirmation"""
     query = update.callback_query
     await query.answer()
 
-    product_id = int(query.data.split("_")[2])
-
-    db = get_db_session()
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await repository.delete_product(product_id)
 
     if not product:
-        db.close()
         await context.bot.send_message(
             chat_id=query.message.chat.id,
             text=PRODUCT_NOT_FOUND,
@@ -213,10 +310,8 @@ async def delete_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
+    await broadcast.announce(events.PRODUCT_DELETED, ids=[product_id])
     product_title = product.title
-    db.delete(product)
-    db.commit()
-    db.close()
 
     await context.bot.send_message(
         chat_id=query.message.chat_id,
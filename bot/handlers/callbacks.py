@@ -3,8 +3,17 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from ..utils import is_admin
-from .client import view_products_client, handle_order_request, back_to_main_menu, show_contact_info_client
+from ..router import CallbackRouter, choice, b36
+from .client import (
+    view_products_client,
+    handle_order_request,
+    back_to_main_menu,
+    show_contact_info_client,
+    show_size_filter,
+    view_products_by_size,
+    view_products_page
+)
+from .carousel import show_carousel_item
 from .admin import (
     show_admin_products,
     start_add_product,
@@ -12,81 +21,66 @@ from .admin import (
     confirm_delete_product,
     delete_product,
     cancel_delete,
-    show_single_product
+    show_single_product,
+    start_bulk_select,
+    toggle_bulk_selection,
+    toggle_bulk_all,
+    bulk_activate,
+    bulk_deactivate,
+    confirm_bulk_delete,
+    bulk_delete
 )
 from .contacts import (
     show_admin_contact,
     start_edit_contact_field
 )
 
-async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Route callback queries - UNIFIED INTERFACE"""
-    query = update.callback_query
-    data = query.data
-    user_id = query.from_user.id
+router = CallbackRouter()
 
-    try:
-        # UNIFIED BUTTONS - Same interface, different functionality based on user type
-        if data == "view_products":
-            if is_admin(user_id):
-                # Admin clicks "💍 Mahsulotlar" → sees admin products management
-                await show_admin_products(update, context)
-            else:
-                # Client clicks "💍 Mahsulotlar" → sees client products view
-                await view_products_client(update, context)
+# UNIFIED BUTTONS - Same interface, different functionality based on user type
+router.exact("view_products", view_products_client, admin_handler=show_admin_products)
+router.exact("contact", show_contact_info_client, admin_handler=show_admin_contact)
 
-        elif data == "contact":
-            if is_admin(user_id):
-                # Admin clicks "📞 Bog'lanish" → sees admin contact management
-                await show_admin_contact(update, context)
-            else:
-                # Client clicks "📞 Bog'lanish" → sees client contact info
-                await show_contact_info_client(update, context)
+# CLIENT-SPECIFIC CALLBACKS
+router.exact("back_to_main", back_to_main_menu)
+router.exact("filter_sizes", show_size_filter)
+router.prefix("order_", handle_order_request, params=(int,))
+router.prefix("car_", show_carousel_item, params=(int, int), optional=1)
+router.prefix("products_page_", view_products_page, params=(int,))
+router.prefix("size_", view_products_by_size, params=(float, int), optional=1)
 
-        # CLIENT-SPECIFIC CALLBACKS
-        elif data.startswith("order_"):
-            await handle_order_request(update, context)
-        elif data == "back_to_main":
-            await back_to_main_menu(update, context)
+# ADMIN-SPECIFIC CALLBACKS (only admins can trigger these)
+router.exact("admin_products", show_admin_products, admin_only=True)
+router.exact("admin_add", start_add_product, admin_only=True)
+router.prefix("view_product_", show_single_product, admin_only=True, params=(int,))
+router.prefix("edit_", start_edit_product, admin_only=True, params=(int,))
+router.prefix("edit_contact_", start_edit_contact_field, admin_only=True, params=(choice("telegram", "phones", "instagram"),))
+router.prefix("delete_", confirm_delete_product, admin_only=True, params=(int,))
+router.prefix("confirm_delete_", delete_product, admin_only=True, params=(int,))
 
-        # ADMIN-SPECIFIC CALLBACKS (only admins can trigger these)
-        elif data == "admin_products":
-            if is_admin(user_id):
-                await show_admin_products(update, context)
-        elif data == "admin_add":
-            if is_admin(user_id):
-                await start_add_product(update, context)
-        elif data.startswith("view_product_"):
-            if is_admin(user_id):
-                await show_single_product(update, context)
-            else:
-                await query.answer("❌ Noma'lum buyruq")
-                return
-        elif data.startswith("edit_contact_"):
-            if is_admin(user_id):
-                await start_edit_contact_field(update, context)
-            else:
-                await query.answer("❌ Sizga ruxsat yo'q")
-                return
-        elif data.startswith("edit_"):
-            if is_admin(user_id):
-                await start_edit_product(update, context)
-        elif data.startswith("delete_"):
-            if is_admin(user_id):
-                await confirm_delete_product(update, context)
-        elif data.startswith("confirm_delete_"):
-            if is_admin(user_id):
-                await delete_product(update, context)
+# Multi-select on the admin product list
+router.exact("bulk_select", start_bulk_select, admin_only=True)
+router.exact("bulk_select_back", start_bulk_select, admin_only=True)
+router.prefix("sel_", toggle_bulk_selection, admin_only=True, params=(b36,))
+router.exact("bulk_all", toggle_bulk_all, admin_only=True)
+router.exact("bulk_activate", bulk_activate, admin_only=True)
+router.exact("bulk_deactivate", bulk_deactivate, admin_only=True)
+router.exact("bulk_delete", confirm_bulk_delete, admin_only=True)
+router.exact("bulk_delete_confirm", bulk_delete, admin_only=True)
 
-        # GENERAL CALLBACKS
-        elif data == "cancel_delete":
-            await cancel_delete(update, context)
+# GENERAL CALLBACKS
+router.exact("cancel_delete", cancel_delete)
 
-        # Unknown callback
-        else:
+async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Route callback queries - UNIFIED INTERFACE"""
+    query = update.callback_query
+
+    try:
+        if not await router.dispatch(update, context):
+            # Unknown callback
             await query.answer("❌ Noma'lum buyruq")
 
     except Exception as e:
         # Handle any callback errors gracefully
         await query.answer("❌ Xatolik yuz berdi")
-        print(f"Callback error: {e}")  # For debugging
\ No newline at end of file
+        print(f"Callback error: {e}")  # For debugging
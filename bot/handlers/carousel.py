@@ -0,0 +1,152 @@
+"""Carousel catalogue - one message per client, edited in place"""
+
+from telegram import Update, InputMediaPhoto, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
+
+from catalog import catalog_cache
+from ..ratelimit import throttled
+from ..render import render_product
+from ..constants import *
+from ..keyboards import get_client_back_keyboard
+
+# Rendered (caption, keyboard) per (product_id, image_index) for one catalogue snapshot
+_views = {"snapshot": None, "items": {}}
+
+
+def get_carousel_view(snapshot, index, image_index=0):
+    """Return (product, caption, keyboard, file_id) for a carousel position, rendered once per snapshot"""
+    if _views["snapshot"] is not snapshot:
+        _views["snapshot"] = snapshot
+        _views["items"] = {}
+
+    products = snapshot.products
+    product = products[index]
+    file_ids = product.file_ids
+    image_index = image_index if image_index < len(file_ids) else 0
+
+    key = (product.id, image_index)
+    view = _views["items"].get(key)
+    if view is None:
+        position = escape_markdown(f"{index + 1} / {len(products)}", version=2)
+        caption = f"{render_product(product).text}\n\n🔢 {position}"
+
+        # Wrap around at both ends
+        prev_id = products[index - 1].id
+        next_id = products[(index + 1) % len(products)].id
+
+        keyboard = []
+        if len(products) > 1:
+            keyboard.append([
+                InlineKeyboardButton(BTN_PREV_PAGE, callback_data=f"car_{prev_id}"),
+                InlineKeyboardButton(BTN_NEXT_PAGE, callback_data=f"car_{next_id}")
+            ])
+        if len(file_ids) > 1:
+            next_image = (image_index + 1) % len(file_ids)
+            keyboard.append([InlineKeyboardButton(
+                BTN_NEXT_IMAGE.format(image_index + 1, len(file_ids)),
+                callback_data=f"car_{product.id}_{next_image}"
+            )])
+        keyboard.append([InlineKeyboardButton(BTN_ORDER, callback_data=f"order_{product.id}")])
+        keyboard.append([InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")])
+
+        file_id = file_ids[image_index] if file_ids else None
+        view = (product, caption, InlineKeyboardMarkup(keyboard), file_id)
+        _views["items"][key] = view
+
+    return view
+
+
+async def open_carousel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Open the catalogue as a single carousel message"""
+    query = update.callback_query
+    await query.answer()
+
+    snapshot = await catalog_cache.get_snapshot()
+    if not snapshot.products:
+        await query.edit_message_text(
+            NO_PRODUCTS_CLIENT,
+            reply_markup=get_client_back_keyboard(),
+            parse_mode='Markdown'
+        )
+        return
+
+    product, caption, reply_markup, file_id = get_carousel_view(snapshot, 0)
+    chat_id = query.message.chat.id
+
+    if file_id is None:
+        # Text-only product - the menu message itself becomes the carousel
+        await query.edit_message_text(caption, reply_markup=reply_markup, parse_mode='MarkdownV2')
+        return
+
+    await query.edit_message_text(CLIENT_PRODUCTS_HEADER, parse_mode='MarkdownV2')
+    await send_carousel_message(context, chat_id, caption, reply_markup, file_id)
+
+
+async def show_carousel_item(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int, image_index: int = 0):
+    """Move the carousel to another product / image by editing the message"""
+    query = update.callback_query
+    await query.answer()
+
+    snapshot = await catalog_cache.get_snapshot()
+    if not snapshot.products:
+        await context.bot.send_message(
+            chat_id=query.message.chat.id,
+            text=NO_PRODUCTS_CLIENT,
+            reply_markup=get_client_back_keyboard(),
+            parse_mode='Markdown'
+        )
+        return
+
+    # Product removed since the button was drawn - start over
+    index = snapshot.index_of(product_id)
+    if index is None:
+        index, image_index = 0, 0
+
+    product, caption, reply_markup, file_id = get_carousel_view(snapshot, index, image_index)
+    message = query.message
+    is_photo = bool(message.photo)
+
+    try:
+        if is_photo and file_id:
+            await query.edit_message_media(
+                InputMediaPhoto(media=file_id, caption=caption, parse_mode='MarkdownV2'),
+                reply_markup=reply_markup
+            )
+            return
+        if not is_photo and not file_id:
+            await query.edit_message_text(caption, reply_markup=reply_markup, parse_mode='MarkdownV2')
+            return
+    except BadRequest as e:
+        if "not modified" in str(e).lower():
+            return
+
+    # Photo <-> text can't be edited into each other: replace the message
+    try:
+        await message.delete()
+    except BadRequest:
+        pass
+    await send_carousel_message(context, message.chat.id, caption, reply_markup, file_id)
+
+
+async def send_carousel_message(context, chat_id, caption, reply_markup, file_id):
+    """Send a fresh carousel message (photo when the product has one)"""
+    if file_id:
+        try:
+            return await throttled(chat_id, lambda: context.bot.send_photo(
+                chat_id=chat_id,
+                photo=file_id,
+                caption=caption,
+                reply_markup=reply_markup,
+                parse_mode='MarkdownV2'
+            ))
+        except BadRequest:
+            caption = f"{caption}\n\n{INVALID_IMAGES_ERROR}"
+
+    return await throttled(chat_id, lambda: context.bot.send_message(
+        chat_id=chat_id,
+        text=caption,
+        reply_markup=reply_markup,
+        parse_mode='MarkdownV2'
+    ))
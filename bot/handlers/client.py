@@ -3,22 +3,43 @@
 from telegram import Update, InputMediaPhoto
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
+from telegram.helpers import escape_markdown
 
-from database import get_db_session
-from models import Product, Contact
-from ..utils import format_product_for_client
+import config
+import repository
+from catalog import catalog_cache
+from contact import contact_provider
+from ..ratelimit import throttled
+from .carousel import open_carousel
+from ..render import render_product, render_contact, CLIENT, ORDER
 from ..constants import *
-from ..keyboards import get_client_after_products_keyboard, get_product_order_keyboard, get_client_inline_keyboard, get_client_back_keyboard
+from ..keyboards import (
+    get_client_after_products_keyboard,
+    get_client_inline_keyboard,
+    get_client_back_keyboard,
+    get_size_filter_keyboard,
+    get_products_page_keyboard
+)
 
 async def view_products_client(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show products to clients with better navigation"""
+    """Show products to clients with better navigation (carousel or first page)"""
+    if config.CATALOG_VIEW_MODE == "carousel":
+        await open_carousel(update, context)
+    else:
+        await show_products_page(update, context, None)
+
+async def view_products_page(update: Update, context: ContextTypes.DEFAULT_TYPE, cursor: int):
+    """Show the page of products starting at the product in the cursor"""
+    await show_products_page(update, context, cursor)
+
+async def show_products_page(update: Update, context: ContextTypes.DEFAULT_TYPE, start_id):
+    """Send one page of products, starting at product ``start_id`` (None = first page)"""
     query = update.callback_query
     await query.answer()
 
     # Load real active products
-    db = get_db_session()
-    products = db.query(Product).filter(Product.is_active == True).all()
-    db.close()
+    snapshot = await catalog_cache.get_snapshot()
+    products = snapshot.products
 
     if not products:
         # No products - show message with back button
@@ -30,76 +51,175 @@ async def view_products_client(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return
 
-    # Send header with better navigation after products
+    # The cursor is the first product of the page; restart if it is gone
+    start = snapshot.index_of(start_id) if start_id is not None else None
+    start = start or 0
+    page_number, page_count = page_position(products, start)
+
+    # Reuse the message that was tapped as the page header (drops its old buttons)
     await query.edit_message_text(
-        CLIENT_PRODUCTS_HEADER,
+        CLIENT_PRODUCTS_PAGE_HEADER.format(page_number, page_count),
         parse_mode='MarkdownV2'
     )
+    await send_products_page(context, query.message.chat.id, products, start, "products_page_")
 
-    # Send each product
-    for product in products:
-        message = format_product_for_client(product)
-        file_ids = product.get_file_ids_list()
-        reply_markup = get_product_order_keyboard(product.id)
-
-        if file_ids:
-            try:
-                if len(file_ids) == 1:
-                    await context.bot.send_photo(
-                        chat_id=query.message.chat.id,
-                        photo=file_ids[0],
-                        caption=message,
-                        reply_markup=reply_markup,
-                        parse_mode='MarkdownV2'
-                    )
-                else:
-                    # Multiple images
-                    media = []
-                    for i, file_id in enumerate(file_ids):
-                        if i == 0:
-                            media.append(InputMediaPhoto(media=file_id, caption=message, parse_mode='MarkdownV2'))
-                        else:
-                            media.append(InputMediaPhoto(media=file_id))
-
-                    await context.bot.send_media_group(chat_id=query.message.chat.id, media=media)
-                    await context.bot.send_message(
-                        chat_id=query.message.chat.id,
-                        text=f"📞 *Mahsulot*: {product.title}",
-                        reply_markup=reply_markup,
-                        parse_mode='MarkdownV2'
-                    )
-            except BadRequest:
-                await context.bot.send_message(
-                    chat_id=query.message.chat.id,
-                    text=f"{message}\n\n{INVALID_IMAGES_ERROR}",
-                    reply_markup=reply_markup,
-                    parse_mode='MarkdownV2'
-                )
-        else:
-            await context.bot.send_message(
-                chat_id=query.message.chat.id,
-                text=message,
-                reply_markup=reply_markup,
-                parse_mode='MarkdownV2'
-            )
+def page_position(products, start):
+    """(page number, page count) of the page starting at index ``start``"""
+    page_size = max(1, config.CATALOG_PAGE_SIZE)
+    return start // page_size + 1, (len(products) + page_size - 1) // page_size
 
+async def send_products_page(context: ContextTypes.DEFAULT_TYPE, chat_id, products, start, page_prefix):
+    """Send CATALOG_PAGE_SIZE cards from index ``start``, then prev/next buttons
+
+    The buttons carry ``<page_prefix><first product id of that page>``.
+    """
+    page_size = max(1, config.CATALOG_PAGE_SIZE)
+    page_number, page_count = page_position(products, start)
+    prev_cursor = products[max(0, start - page_size)].id if start > 0 else None
+    next_cursor = products[start + page_size].id if start + page_size < len(products) else None
+
+    for product in products[start:start + page_size]:
+        await send_product_card(context, chat_id, product)
+
+    if next_cursor is None and prev_cursor is None:
+        await send_products_footer(context, chat_id)
+        return
+
+    await throttled(chat_id, lambda: context.bot.send_message(
+        chat_id=chat_id,
+        text=PRODUCTS_PAGE_FOOTER.format(page_number, page_count),
+        reply_markup=get_products_page_keyboard(prev_cursor, next_cursor, page_prefix)
+    ))
+
+async def send_products_footer(context: ContextTypes.DEFAULT_TYPE, chat_id):
+    """Navigation menu after the last product"""
     # IMPORTANT: After all products, send navigation menu
-    await context.bot.send_message(
-        chat_id=query.message.chat.id,
+    await throttled(chat_id, lambda: context.bot.send_message(
+        chat_id=chat_id,
         text="📋 *Barcha mahsulotlar ko'rsatildi*\n\nQuyidagi tugmalardan foydalaning:",
         reply_markup=get_client_after_products_keyboard(),
         parse_mode='Markdown'
-    )
+    ))
+
+async def send_product_card(context: ContextTypes.DEFAULT_TYPE, chat_id, product):
+    """Send one product (photo, album or text) through the rate limiter"""
+    rendered = render_product(product)
+    message = rendered.text
+    file_ids = product.get_file_ids_list()
+    reply_markup = rendered.reply_markup
+
+    if file_ids:
+        try:
+            if len(file_ids) == 1:
+                await throttled(chat_id, lambda: context.bot.send_photo(
+                    chat_id=chat_id,
+                    photo=file_ids[0],
+                    caption=message,
+                    reply_markup=reply_markup,
+                    parse_mode='MarkdownV2'
+                ))
+            else:
+                # Multiple images
+                media = []
+                for i, file_id in enumerate(file_ids):
+                    if i == 0:
+                        media.append(InputMediaPhoto(media=file_id, caption=message, parse_mode='MarkdownV2'))
+                    else:
+                        media.append(InputMediaPhoto(media=file_id))
+
+                # An album counts as one message per photo
+                await throttled(chat_id, lambda: context.bot.send_media_group(chat_id=chat_id, media=media), cost=len(media))
+                await throttled(chat_id, lambda: context.bot.send_message(
+                    chat_id=chat_id,
+                    text=f"📞 *Mahsulot*: {product.title}",
+                    reply_markup=reply_markup,
+                    parse_mode='MarkdownV2'
+                ))
+        except BadRequest:
+            await throttled(chat_id, lambda: context.bot.send_message(
+                chat_id=chat_id,
+                text=f"{message}\n\n{INVALID_IMAGES_ERROR}",
+                reply_markup=reply_markup,
+                parse_mode='MarkdownV2'
+            ))
+    else:
+        await throttled(chat_id, lambda: context.bot.send_message(
+            chat_id=chat_id,
+            text=message,
+            reply_markup=reply_markup,
+            parse_mode='MarkdownV2'
+        ))
+
+async def show_size_filter(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the sizes available in the catalogue"""
+    query = update.callback_query
+    await query.answer()
+
+    sizes = await repository.get_available_sizes()
+    if not sizes:
+        await query.edit_message_text(NO_PRODUCTS_CLIENT, reply_markup=get_client_back_keyboard())
+        return
+
+    await query.edit_message_text(SIZE_FILTER_PROMPT, reply_markup=get_size_filter_keyboard(sizes))
+
+async def view_products_by_size(update: Update, context: ContextTypes.DEFAULT_TYPE, size: float, start_id=None):
+    """Show one page of the products available in the chosen size"""
+    query = update.callback_query
+    await query.answer()
+
+    # Filter the cached catalogue: same rows and order as search_products(size=...)
+    snapshot = await catalog_cache.get_snapshot()
+    products = [product for product in snapshot.products if size in product.sizes]
+    safe_size = escape_markdown(f"{size:g}", version=2)
+
+    if not products:
+        await query.edit_message_text(
+            NO_PRODUCTS_FOR_SIZE.format(f"{size:g}"),
+            reply_markup=get_client_after_products_keyboard()
+        )
+        return
+
+    # Restart from the first page if the cursor product left the filter
+    start = next((i for i, product in enumerate(products) if product.id == start_id), 0)
+
+    await query.edit_message_text(SIZE_FILTER_HEADER.format(safe_size), parse_mode='MarkdownV2')
+    await send_products_page(context, query.message.chat.id, products, start, f"size_{size:g}_")
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /search <text> - search titles and descriptions (first page of matches only)"""
+    text = " ".join(context.args or []).strip()
+    if not text:
+        await update.message.reply_text(SEARCH_USAGE)
+        return
+
+    # One extra row tells us whether the query matched more than a page
+    page_size = max(1, config.CATALOG_PAGE_SIZE)
+    products = await repository.search_products(text=text, limit=page_size + 1)
+    if not products:
+        await update.message.reply_text(NO_SEARCH_RESULTS, reply_markup=get_client_after_products_keyboard())
+        return
+
+    # The header counts against the same limits as the cards after it
+    chat_id = update.effective_chat.id
+    await throttled(chat_id, lambda: update.message.reply_text(SEARCH_HEADER, parse_mode='MarkdownV2'))
+    for product in products[:page_size]:
+        await send_product_card(context, chat_id, product)
+
+    if len(products) > page_size:
+        await throttled(chat_id, lambda: context.bot.send_message(
+            chat_id=chat_id,
+            text=SEARCH_TRUNCATED.format(page_size),
+            reply_markup=get_client_after_products_keyboard()
+        ))
+    else:
+        await send_products_footer(context, chat_id)
 
 async def show_contact_info_client(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show contact info for clients"""
     query = update.callback_query
     await query.answer()
 
-    # Load real contact data
-    db = get_db_session()
-    contact = db.query(Contact).first()
-    db.close()
+    contact = await contact_provider.get()
 
     if not contact:
         # Fallback contact with back button
@@ -111,40 +231,20 @@ async def show_contact_info_client(update: Update, context: ContextTypes.DEFAULT
         )
         return
 
-    # Build contact message with real data
-    contact_message = "📞 Bog'lanish ma'lumotlari\n\n"
-
-    if contact.telegram_username:
-        contact_message += f"💬 Telegram: @{contact.telegram_username}\n"
-
-    phones = contact.get_phone_numbers_list()
-    if phones:
-        if len(phones) == 1:
-            contact_message += f"📱 Telefon: {phones[0]}\n"
-        else:
-            contact_message += f"📱 Telefonlar:\n"
-            for phone in phones:
-                contact_message += f"  • {phone}\n"
-
-    if contact.instagram_username:
-        contact_message += f"📷 Instagram: https://instagram.com/{contact.instagram_username}\n"
-
     # Always include back button for clean navigation
     reply_markup = get_client_back_keyboard()
-    await query.edit_message_text(contact_message, reply_markup=reply_markup, parse_mode='MarkdownV2')
+    await query.edit_message_text(render_contact(contact, CLIENT).text, reply_markup=reply_markup, parse_mode='MarkdownV2')
 
-async def handle_order_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def handle_order_request(update: Update, context: ContextTypes.DEFAULT_TYPE, product_id: int):
     """Handle order requests"""
     query = update.callback_query
     await query.answer()
 
-    product_id = int(query.data.split("_")[1])
-
-    # Load real data
-    db = get_db_session()
-    contact = db.query(Contact).first()
-    product = db.query(Product).filter(Product.id == product_id).first()
-    db.close()
+    # Contact and active products come from memory; only inactive ones hit the database
+    contact = await contact_provider.get()
+    snapshot = await catalog_cache.get_snapshot()
+    position = snapshot.index_of(product_id)
+    product = snapshot.products[position] if position is not None else await repository.get_product(product_id)
 
     # Build order message
     if product:
@@ -153,26 +253,13 @@ async def handle_order_request(update: Update, context: ContextTypes.DEFAULT_TYP
         order_message = f"📞 Buyurtma\n\n🆔 Mahsulot ID: {product_id}\n\n"
 
     if contact:
-        phones = contact.get_phone_numbers_list()
-        if phones:
-            if len(phones) == 1:
-                order_message += f"📱 Telefon: {phones[0]}\n"
-            else:
-                order_message += f"📱 Telefonlar:\n"
-                for phone in phones:
-                    order_message += f"  • {phone}\n"
-
-        if contact.telegram_username:
-            order_message += f"💬 Telegram: @{contact.telegram_username}\n"
-
-        if contact.instagram_username:
-            order_message += f"📷 Instagram: https://instagram.com/{contact.instagram_username}"
+        order_message += render_contact(contact, ORDER).text
     else:
         order_message += "📱 Telefon: +998901234567\n💬 Telegram: @dunya_jewellery\n📷 Instagram: https://instagram.com/dunya_jewellery"
 
     # Add back button for better navigation
     reply_markup = get_client_back_keyboard()
-    await query.edit_message_text(order_message, reply_markup=reply_markup, parse_mode='Markdown')
+    await edit_or_send(query, context, order_message, reply_markup=reply_markup, parse_mode='Markdown')
 
 async def back_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Back to main menu - clean navigation"""
@@ -180,8 +267,16 @@ async def back_to_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
 
     reply_markup = get_client_inline_keyboard()
-    await query.edit_message_text(
+    await edit_or_send(
+        query,
+        context,
         CLIENT_WELCOME,
         reply_markup=reply_markup,
         parse_mode='Markdown'
-    )
\ No newline at end of file
+    )
+
+async def edit_or_send(query, context: ContextTypes.DEFAULT_TYPE, text, **kwargs):
+    """Edit the tapped message, or send a new one if it is a photo (no text to edit)"""
+    if query.message.photo:
+        return await context.bot.send_message(chat_id=query.message.chat.id, text=text, **kwargs)
+    return await query.edit_message_text(text, **kwargs)
\ No newline at end of file
@@ -4,9 +4,12 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.helpers import escape_markdown
 from telegram.ext import ContextTypes
 
-from database import get_db_session
-from models import Contact
-from ..utils import admin_required, set_user_state, format_contact_for_admin, clear_user_state
+import broadcast
+import events
+import repository
+from contact import contact_provider
+from ..utils import admin_required, set_user_state, clear_user_state
+from ..render import render_contact, ADMIN
 from ..constants import *
 from ..keyboards import get_contact_edit_keyboard, get_admin_nav_keyboard
 
@@ -22,16 +25,14 @@ async def show_admin_contact(update: Update, context: ContextTypes.DEFAULT_TYPE)
         chat_id = update.effective_chat.id
         edit_message = lambda text, **kwargs: context.bot.send_message(chat_id, text, **kwargs)
 
-    db = get_db_session()
-    contact = db.query(Contact).first()  # Get the first (and only) contact
-    db.close()
+    contact = await contact_provider.get()  # Same record the API and clients see
 
     if not contact:
         # Create default contact if none exists
         await create_default_contact(update, context)
         return
 
-    message = format_contact_for_admin(contact)
+    message = render_contact(contact, ADMIN).text
     reply_markup = get_contact_edit_keyboard()
 
     await edit_message(
@@ -42,33 +43,20 @@ async def show_admin_contact(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def create_default_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Create default contact record"""
-    db = get_db_session()
-
-    contact = Contact(
-        telegram_username="dunya_jewellery",  # Will show as https://t.me/dunya_jewellery
-        phone_numbers="+998901234567",  # Valid Uzbek number
-        instagram_username="dunya_jewellery",  # Will show as https://instagram.com/dunya_jewellery
-        is_active=True
-    )
-
-    db.add(contact)
-    db.commit()
-    db.close()
+    await repository.create_default_contact()
+    await broadcast.announce(events.CONTACT_UPDATED)
 
     await show_admin_contact(update, context)
 
 @admin_required
-async def start_edit_contact_field(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Start editing specific contact field"""
+async def start_edit_contact_field(update: Update, context: ContextTypes.DEFAULT_TYPE, field: str):
+    """Start editing specific contact field (telegram / phones / instagram)"""
     query = update.callback_query
     await query.answer()
 
     user_id = query.from_user.id
-    field = query.data.split("_")[2]  # edit_contact_telegram -> telegram
 
-    db = get_db_session()
-    contact = db.query(Contact).first()
-    db.close()
+    contact = await contact_provider.get()
 
     if not contact:
         await context.bot.send_message(
@@ -77,10 +65,9 @@ async def start_edit_contact_field(update: Update, context: ContextTypes.DEFAULT
         )
         return
 
-    set_user_state(user_id, {
+    await set_user_state(user_id, {
         'action': 'edit_contact',
-        'field': field,
-        'contact': contact
+        'field': field
     })
 
     if field == 'telegram':
@@ -164,21 +151,21 @@ async def handle_contact_field_edit(update: Update, context: ContextTypes.DEFAUL
     field = state['field']
     user_id = update.effective_user.id
 
-    db = get_db_session()
-    contact = db.query(Contact).first()
+    contact = await contact_provider.get()
 
     if not contact:
         await update.message.reply_text(CONTACT_NOT_FOUND)
-        db.close()
-        clear_user_state(user_id)
+        await clear_user_state(user_id)
         return
 
+    changes = {}
+
     try:
         if field == 'telegram':
             if text == '/skip':
                 await update.message.reply_text("✅ Telegram o'zgartirilmadi")
             else:
-                contact.telegram_username = text.replace('@', '').strip() if text.strip() else None
+                changes['telegram_username'] = text.replace('@', '').strip() if text.strip() else None
                 await update.message.reply_text("✅ Telegram yangilandi")
 
         elif field == 'phones':
@@ -189,16 +176,14 @@ async def handle_contact_field_edit(update: Update, context: ContextTypes.DEFAUL
                     phones = parse_phone_numbers(text)
                     if not phones:
                         await update.message.reply_text("❌ Kamida bitta telefon raqam kiriting!\n\n📝 Format: +998901234567, +998907654321\n💡 Yana urinib ko'ring:")
-                        db.close()
                         # DON'T clear user state - keep them in editing mode
                         return
 
                     # COMPLETELY REPLACE old phone numbers with new ones
-                    contact.set_phone_numbers(phones)
+                    changes['phone_numbers'] = phones
                     await update.message.reply_text(f"✅ Telefon raqamlar to'liq yangilandi!\n\n📞 Yangi ro'yxat ({len(phones)} ta):\n" + "\n".join([f"  • {phone}" for phone in phones]))
                 except ValueError as e:
                     await update.message.reply_text(f"❌ {str(e)}\n\n📝 To'g'ri format: +998901234567, +998907654321\n💡 Qaytadan kiriting:")
-                    db.close()
                     # DON'T clear user state - keep them in editing mode
                     return
 
@@ -206,16 +191,17 @@ async def handle_contact_field_edit(update: Update, context: ContextTypes.DEFAUL
             if text == '/skip':
                 await update.message.reply_text("✅ Instagram o'zgartirilmadi")
             else:
-                contact.instagram_username = text.replace('@', '').strip() if text.strip() else None
+                changes['instagram_username'] = text.replace('@', '').strip() if text.strip() else None
                 await update.message.reply_text("✅ Instagram yangilandi")
 
         # Success - commit changes and show final message
-        db.commit()
+        if changes:
+            await repository.update_contact(**changes)
+            await broadcast.announce(events.CONTACT_UPDATED)
         await update.message.reply_text(CONTACT_UPDATED)
 
     except Exception as e:
         await update.message.reply_text(ERROR_OCCURRED.format(str(e)))
     finally:
-        db.close()
         # Clear user state only on success or unexpected error
-        clear_user_state(user_id)
\ No newline at end of file
+        await clear_user_state(user_id)
\ No newline at end of file
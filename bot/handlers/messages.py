@@ -3,10 +3,11 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from database import get_db_session
-from models import Product, Contact
+import broadcast
+import events
+import repository
 from ..keyboards import get_admin_nav_keyboard
-from ..utils import is_admin, get_user_state, clear_user_state, parse_sizes
+from ..utils import is_admin, get_user_state, set_user_state, clear_user_state, parse_sizes
 from ..constants import *
 
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -15,7 +16,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     user_id = update.effective_user.id
-    state = get_user_state(user_id)
+    state = await get_user_state(user_id)
 
     if not state:
         return
@@ -55,6 +56,7 @@ async def handle_field_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
         return
 
     await move_to_next_step(update, context, state)
+    await set_user_state(update.effective_user.id, state)
 
 async def move_to_next_step(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Move to next step in product workflow"""
@@ -71,7 +73,7 @@ async def move_to_next_step(update: Update, context: ContextTypes.DEFAULT_TYPE,
 async def send_description_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Send description prompt"""
     if state['action'] == 'edit':
-        current_desc = state['current_product'].description or CURRENT_VALUE_NONE
+        current_desc = state['current']['description'] or CURRENT_VALUE_NONE
         prompt = EDIT_DESCRIPTION_PROMPT.format(current_desc)
     else:
         prompt = ENTER_DESCRIPTION
@@ -81,7 +83,7 @@ async def send_description_prompt(update: Update, context: ContextTypes.DEFAULT_
 async def send_sizes_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Send sizes prompt"""
     if state['action'] == 'edit':
-        current_sizes = ", ".join([str(s) for s in state['current_product'].get_sizes_list()])
+        current_sizes = ", ".join([str(s) for s in state['current']['sizes']])
         current_sizes = current_sizes or CURRENT_VALUE_NONE
         prompt = EDIT_SIZES_PROMPT.format(current_sizes)
     else:
@@ -92,7 +94,7 @@ async def send_sizes_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE,
 async def send_images_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Send images prompt"""
     if state['action'] == 'edit':
-        current_images = len(state['current_product'].get_file_ids_list())
+        current_images = state['current']['image_count']
         prompt = EDIT_IMAGES_PROMPT.format(current_images)
         # Start fresh for new image uploads (like phone numbers)
         state['images'] = []
@@ -106,57 +108,49 @@ async def send_images_prompt(update: Update, context: ContextTypes.DEFAULT_TYPE,
 
 async def save_product(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Save product to database"""
-    db = get_db_session()
     user_id = update.effective_user.id
 
     try:
         if state['action'] == 'add':
-            await create_new_product(update, context, state, db)
+            await create_new_product(update, context, state)
         elif state['action'] == 'edit':
-            await update_existing_product(update, context, state, db)
+            await update_existing_product(update, context, state)
     except Exception as e:
         await update.message.reply_text(ERROR_OCCURRED.format(str(e)), parse_mode='Markdown')
     finally:
-        db.close()
-        clear_user_state(user_id)
+        await clear_user_state(user_id)
 
-async def create_new_product(update: Update, context: ContextTypes.DEFAULT_TYPE, state, db):
+async def create_new_product(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Create new product"""
     if not state.get('title'):
         await update.message.reply_text("❌ Mahsulot nomi kiritilmagan!", parse_mode='Markdown')
         return
 
-    product = Product(
+    product = await repository.create_product(
         title=state['title'],
         description=state.get('description'),
-        is_active=True
+        sizes=state.get('sizes', []),
+        file_ids=state.get('images', [])
     )
-
-    product.set_sizes(state.get('sizes', []))
-    product.set_file_ids(state.get('images', []))
-
-    db.add(product)
-    db.commit()
-    db.refresh(product)
+    await broadcast.announce(events.PRODUCT_CREATED, ids=[product.id])
 
     success_msg = PRODUCT_CREATED.format(product.title, product.id)
     await update.message.reply_text(success_msg, parse_mode='Markdown', reply_markup=get_admin_nav_keyboard())
 
-async def update_existing_product(update: Update, context: ContextTypes.DEFAULT_TYPE, state, db):
+async def update_existing_product(update: Update, context: ContextTypes.DEFAULT_TYPE, state):
     """Update existing product"""
-    product = db.query(Product).filter(Product.id == state['product_id']).first()
+    product = await repository.update_product(
+        state['product_id'],
+        title=state['title'],
+        description=state.get('description'),
+        sizes=state.get('sizes', []),
+        file_ids=state.get('images', [])  # COMPLETE REPLACEMENT
+    )
 
     if not product:
         await update.message.reply_text(PRODUCT_NOT_FOUND, parse_mode='Markdown')
         return
-
-    # Update product fields
-    product.title = state['title']
-    product.description = state.get('description')
-    product.set_sizes(state.get('sizes', []))
-    product.set_file_ids(state.get('images', []))  # COMPLETE REPLACEMENT
-
-    db.commit()
+    await broadcast.announce(events.PRODUCT_UPDATED, ids=[product.id])
 
     success_msg = PRODUCT_UPDATED.format(product.title)
     await update.message.reply_text(success_msg, parse_mode='Markdown', reply_markup=get_admin_nav_keyboard())
@@ -167,7 +161,7 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     user_id = update.effective_user.id
-    state = get_user_state(user_id)
+    state = await get_user_state(user_id)
 
     if not state or state.get('step') != 'images':
         return
@@ -176,8 +170,8 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     file_id = update.message.photo[-1].file_id
 
     # If this is the first photo, clear old images
-    if not state.get('images_started', False):
-        await update.message.reply_text(IMAGES_REPLACED, parse_mode='Markdown')
+    first_photo = not state.get('images_started', False)
+    if first_photo:
         state['images'] = []  # Clear old images
         state['images_started'] = True
 
@@ -188,6 +182,12 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     state['images'].append(file_id)
     count = len(state['images'])
 
+    # Save before replying so an album's next photo sees this one
+    await set_user_state(user_id, state)
+
+    if first_photo:
+        await update.message.reply_text(IMAGES_REPLACED, parse_mode='Markdown')
+
     await update.message.reply_text(
         IMAGE_ADDED.format(count),
         parse_mode='Markdown'
@@ -2,6 +2,7 @@
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from .constants import *
+from .router import encode_b36
 
 # UNIFIED INTERFACE - Same buttons for both admin and client
 def get_client_inline_keyboard():
@@ -15,11 +16,32 @@ def get_client_inline_keyboard():
 def get_client_after_products_keyboard():
     """Navigation after viewing all products (clients only)"""
     keyboard = [
+        [InlineKeyboardButton(BTN_FILTER_SIZE, callback_data="filter_sizes")],
         [InlineKeyboardButton(BTN_CONTACT, callback_data="contact")],
         [InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")]
     ]
     return InlineKeyboardMarkup(keyboard)
 
+def get_products_page_keyboard(prev_cursor=None, next_cursor=None, prefix="products_page_"):
+    """Page navigation after a page of products (clients only)
+
+    ``prefix`` picks the list being paged: the catalogue or one size.
+    """
+    keyboard = []
+
+    nav_row = []
+    if prev_cursor is not None:
+        nav_row.append(InlineKeyboardButton(BTN_PREV_PAGE, callback_data=f"{prefix}{prev_cursor}"))
+    if next_cursor is not None:
+        nav_row.append(InlineKeyboardButton(BTN_NEXT_PAGE, callback_data=f"{prefix}{next_cursor}"))
+    if nav_row:
+        keyboard.append(nav_row)
+
+    keyboard.append([InlineKeyboardButton(BTN_FILTER_SIZE, callback_data="filter_sizes")])
+    keyboard.append([InlineKeyboardButton(BTN_CONTACT, callback_data="contact")])
+    keyboard.append([InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")])
+    return InlineKeyboardMarkup(keyboard)
+
 def get_client_back_keyboard():
     """Simple back button for clients"""
     keyboard = [
@@ -34,17 +56,51 @@ def get_product_order_keyboard(product_id):
     ]
     return InlineKeyboardMarkup(keyboard)
 
+def get_product_admin_keyboard(product_id):
+    """Back / edit / delete buttons under a single product (admins only)"""
+    keyboard = [
+        [InlineKeyboardButton(BTN_BACK_TO_LIST, callback_data="admin_products")],
+        [InlineKeyboardButton(BTN_EDIT, callback_data=f"edit_{product_id}")],
+        [InlineKeyboardButton(BTN_DELETE, callback_data=f"delete_{product_id}")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_size_filter_keyboard(sizes):
+    """Size picker for filtering products (clients only)"""
+    keyboard = []
+
+    # Create buttons in rows of 4
+    row = []
+    for size in sizes:
+        label = f"{size:g}"
+        row.append(InlineKeyboardButton(label, callback_data=f"size_{label}"))
+
+        if len(row) == 4:
+            keyboard.append(row)
+            row = []
+
+    if row:
+        keyboard.append(row)
+
+    keyboard.append([InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")])
+    return InlineKeyboardMarkup(keyboard)
+
 # ADMIN-SPECIFIC KEYBOARDS (triggered from unified buttons)
-def get_products_list_keyboard(products):
-    """Product list keyboard for admin"""
+def get_products_list_keyboard(products, selected=None):
+    """Product list keyboard for admin (multi-select when ``selected`` is a set of ids)"""
     keyboard = []
 
     # Create buttons in rows of 3
     row = []
     for product in products:
-        status_icon = "✅" if product.is_active else "❌"
+        if selected is None:
+            status_icon = "✅" if product.is_active else "❌"
+            callback_data = f"view_product_{product.id}"
+        else:
+            status_icon = "☑️" if product.id in selected else "⬜"
+            callback_data = f"sel_{encode_b36(product.id)}"
         button_text = f"{status_icon} {product.id}"
-        row.append(InlineKeyboardButton(button_text, callback_data=f"view_product_{product.id}"))
+        row.append(InlineKeyboardButton(button_text, callback_data=callback_data))
 
         if len(row) == 3:
             keyboard.append(row)
@@ -55,11 +111,33 @@ def get_products_list_keyboard(products):
         keyboard.append(row)
 
     # Add action buttons
-    keyboard.append([InlineKeyboardButton(BTN_ADD_NEW, callback_data="admin_add")])
-    keyboard.append([InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")])
+    if selected is None:
+        keyboard.append([
+            InlineKeyboardButton(BTN_ADD_NEW, callback_data="admin_add"),
+            InlineKeyboardButton(BTN_BULK_SELECT, callback_data="bulk_select")
+        ])
+        keyboard.append([InlineKeyboardButton(BTN_BACK_MAIN, callback_data="back_to_main")])
+    else:
+        keyboard.append([
+            InlineKeyboardButton(BTN_BULK_ACTIVATE, callback_data="bulk_activate"),
+            InlineKeyboardButton(BTN_BULK_DEACTIVATE, callback_data="bulk_deactivate")
+        ])
+        keyboard.append([
+            InlineKeyboardButton(BTN_BULK_ALL, callback_data="bulk_all"),
+            InlineKeyboardButton(BTN_BULK_DELETE, callback_data="bulk_delete")
+        ])
+        keyboard.append([InlineKeyboardButton(BTN_BULK_DONE, callback_data="admin_products")])
 
     return InlineKeyboardMarkup(keyboard)
 
+def get_bulk_delete_confirmation_keyboard():
+    """Bulk delete confirmation buttons"""
+    keyboard = [
+        [InlineKeyboardButton(BTN_CONFIRM_DELETE, callback_data="bulk_delete_confirm")],
+        [InlineKeyboardButton(BTN_CANCEL, callback_data="bulk_select_back")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
 def get_delete_confirmation_keyboard(product_id):
     """Delete confirmation buttons"""
     keyboard = [
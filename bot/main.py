@@ -3,8 +3,10 @@
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 import config
 
+from .updates import ChatOrderedUpdateProcessor
 from .handlers.start import start_command, help_command
 from .handlers.admin import start_add_product
+from .handlers.client import search_command
 from .handlers.contacts import show_admin_contact
 from .handlers.callbacks import handle_callback_query
 from .handlers.messages import handle_text_message, handle_photo
@@ -13,13 +15,22 @@ def setup_bot():
     """Setup bot with handlers - CLEAN VERSION"""
     if not config.BOT_TOKEN:
         raise RuntimeError("BOT_TOKEN is not set. Please define it in the environment.")
-    app = Application.builder().token(config.BOT_TOKEN).build()
+    builder = (
+        Application.builder()
+        .token(config.BOT_TOKEN)
+        .concurrent_updates(ChatOrderedUpdateProcessor(config.BOT_CONCURRENT_UPDATES))
+    )
+    if config.BOT_MODE == "webhook":
+        # Updates arrive through the FastAPI webhook route, no poller needed
+        builder = builder.updater(None)
+    app = builder.build()
 
     # Commands
     app.add_handler(CommandHandler("start", start_command))
     app.add_handler(CommandHandler("help", help_command))
     app.add_handler(CommandHandler("add", start_add_product))
     app.add_handler(CommandHandler("edit_contact", show_admin_contact))
+    app.add_handler(CommandHandler("search", search_command))
 
     # Callbacks (main navigation)
     app.add_handler(CallbackQueryHandler(handle_callback_query))
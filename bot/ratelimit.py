@@ -0,0 +1,100 @@
+"""Outgoing message rate limiting - keeps bursts under Telegram flood limits"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+
+import config
+
+
+class TokenBucket:
+    """Token bucket that may go into debt, so callers can reserve future slots"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available_at(self, cost, now):
+        """Earliest time ``cost`` tokens are available"""
+        self._refill(now)
+        if self.tokens >= cost:
+            return now
+        return now + (cost - self.tokens) / self.rate
+
+    def reserve(self, cost, now):
+        """Take ``cost`` tokens, going negative for slots in the future"""
+        self._refill(now)
+        self.tokens -= cost
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class SendScheduler:
+    """Schedules sends against a global bucket and one bucket per chat"""
+
+    def __init__(self, global_rate, chat_rate, chat_burst, max_chats=10000):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self._chats = OrderedDict()
+
+    def _chat_bucket(self, chat_id, now):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+            # Forget the least recently used chats once they have fully refilled
+            while len(self._chats) > self.max_chats:
+                oldest_id, oldest = next(iter(self._chats.items()))
+                if not oldest.is_full(now):
+                    break
+                del self._chats[oldest_id]
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def reserve(self, chat_id, cost=1):
+        """Reserve a send slot, return how many seconds to wait for it"""
+        now = time.monotonic()
+        chat_bucket = self._chat_bucket(chat_id, now)
+        send_at = max(self.global_bucket.available_at(cost, now), chat_bucket.available_at(cost, now))
+        self.global_bucket.reserve(cost, now)
+        chat_bucket.reserve(cost, now)
+        return send_at - now
+
+    async def acquire(self, chat_id, cost=1):
+        """Wait until a message to ``chat_id`` may be sent"""
+        delay = self.reserve(chat_id, cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+send_scheduler = SendScheduler(
+    global_rate=config.TELEGRAM_GLOBAL_RATE,
+    chat_rate=config.TELEGRAM_CHAT_RATE,
+    chat_burst=config.TELEGRAM_CHAT_BURST
+)
+
+
+async def throttled(chat_id, send, cost=1):
+    """Run ``send()`` once the scheduler allows it; retry once on a flood error
+
+    ``cost`` is the number of messages the call produces (e.g. a media group).
+    """
+    await send_scheduler.acquire(chat_id, cost)
+    try:
+        return await send()
+    except RetryAfter as e:
+        await asyncio.sleep(e.retry_after)
+        return await send()
@@ -0,0 +1,118 @@
+"""Rendered product / contact messages, cached until the record changes"""
+
+from collections import OrderedDict
+
+import config
+from .utils import (
+    format_product_for_client, format_product_for_admin,
+    format_contact_for_admin, format_contact_for_client, format_contact_for_order
+)
+from .keyboards import get_product_order_keyboard, get_product_admin_keyboard
+
+CLIENT = "client"
+ADMIN = "admin"
+ORDER = "order"  # Contact lines of an order message
+
+
+class Rendered:
+    """Final MarkdownV2 text and keyboard for one record and audience"""
+
+    __slots__ = ("text", "reply_markup")
+
+    def __init__(self, text, reply_markup=None):
+        self.text = text
+        self.reply_markup = reply_markup
+
+
+class RenderCache:
+    """LRU of Rendered keyed on (kind, id, updated_at, audience)
+
+    A new updated_at means a new key, so edits never serve stale text; old keys
+    age out of the LRU or are dropped by ``invalidate``. That still matters:
+    SQLite timestamps have one-second resolution, so two quick edits can share
+    an updated_at. Keys are indexed per record, so dropping one record costs
+    its own entries, not a scan of the whole cache.
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._record_keys = {}  # (kind, id) -> keys cached for that record
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rendered
+
+        self.misses += 1
+        rendered = render()
+        self._entries[key] = rendered
+        self._record_keys.setdefault(key[:2], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            keys = self._record_keys[evicted[:2]]
+            keys.discard(evicted)
+            if not keys:
+                del self._record_keys[evicted[:2]]
+        return rendered
+
+    def invalidate(self, kind=None, record_id=None):
+        """Drop entries for one record, every record of ``kind``, or everything"""
+        if kind is None:
+            self._entries.clear()
+            self._record_keys.clear()
+            return
+        if record_id is None:
+            records = [record for record in self._record_keys if record[0] == kind]
+        else:
+            records = [(kind, record_id)]
+        for record in records:
+            for key in self._record_keys.pop(record, ()):
+                del self._entries[key]
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+render_cache = RenderCache(config.RENDER_CACHE_SIZE)
+
+
+def render_product(product, audience=CLIENT):
+    """Caption and keyboard for a product card (ORM Product or CachedProduct)"""
+    key = ("product", product.id, getattr(product, "updated_at", None), audience)
+    if audience == ADMIN:
+        return render_cache.get(key, lambda: Rendered(
+            format_product_for_admin(product),
+            get_product_admin_keyboard(product.id)
+        ))
+    return render_cache.get(key, lambda: Rendered(
+        format_product_for_client(product),
+        get_product_order_keyboard(product.id)
+    ))
+
+
+CONTACT_FORMATTERS = {
+    CLIENT: format_contact_for_client,
+    ADMIN: format_contact_for_admin,
+    ORDER: format_contact_for_order
+}
+
+
+def render_contact(contact, audience=CLIENT):
+    """Contact text (keyboards depend on the screen, so none is cached)"""
+    key = ("contact", contact.id, getattr(contact, "updated_at", None), audience)
+    formatter = CONTACT_FORMATTERS[audience]
+    return render_cache.get(key, lambda: Rendered(formatter(contact)))
+
+
+def invalidate_product(product_id=None):
+    """Forget renders of one product (or all) - call after admin edits"""
+    render_cache.invalidate("product", product_id)
+
+
+def invalidate_contact():
+    render_cache.invalidate("contact")
@@ -0,0 +1,111 @@
+"""Declarative callback_data router - exact and longest-prefix matches in O(len(data))"""
+
+from .utils import is_admin
+from .constants import ACCESS_DENIED
+
+B36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def b36(value):
+    """Parse a base36 payload (compact ids for the 64-byte callback_data limit)"""
+    return int(value, 36)
+
+
+def encode_b36(number):
+    """Encode a non-negative int for a ``b36`` payload"""
+    if number == 0:
+        return "0"
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(B36_DIGITS[remainder])
+    return "".join(reversed(digits))
+
+
+def choice(*values):
+    """Payload type that only accepts one of ``values``"""
+    def convert(value):
+        if value not in values:
+            raise ValueError(f"Unexpected value: {value!r}")
+        return value
+    return convert
+
+
+class Route:
+    """One callback pattern and how to dispatch it"""
+
+    __slots__ = ("handler", "admin_handler", "admin_only", "params", "required")
+
+    def __init__(self, handler, admin_handler=None, admin_only=False, params=(), optional=0):
+        self.handler = handler
+        self.admin_handler = admin_handler
+        self.admin_only = admin_only
+        self.params = params
+        self.required = len(params) - optional
+
+    def parse(self, payload):
+        """Convert the '_'-separated payload with ``params``; None if it does not fit"""
+        parts = payload.split("_") if payload else []
+        if not self.required <= len(parts) <= len(self.params):
+            return None
+        try:
+            return [convert(part) for convert, part in zip(self.params, parts)]
+        except ValueError:
+            return None
+
+
+class CallbackRouter:
+    """Maps callback_data to handlers
+
+    ``exact("contact", ...)`` matches the whole string. ``prefix("edit_", ...)``
+    matches ``edit_<payload>``; the longest registered prefix wins, so
+    ``edit_contact_`` and ``edit_`` can coexist in any registration order.
+    Lookups only try the '_' positions of the incoming data, so the cost does
+    not grow with the number of routes.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._prefixes = {}
+
+    def exact(self, data, handler, **options):
+        self._exact[data] = Route(handler, **options)
+
+    def prefix(self, prefix, handler, **options):
+        if not prefix.endswith("_"):
+            raise ValueError(f"Prefix must end with '_': {prefix!r}")
+        self._prefixes[prefix] = Route(handler, **options)
+
+    def resolve(self, data):
+        """Return (route, args) for ``data`` or (None, None)"""
+        route = self._exact.get(data)
+        if route is not None:
+            return route, []
+
+        end = data.rfind("_")
+        while end != -1:
+            route = self._prefixes.get(data[:end + 1])
+            if route is not None:
+                args = route.parse(data[end + 1:])
+                return (route, args) if args is not None else (None, None)
+            end = data.rfind("_", 0, end)
+        return None, None
+
+    async def dispatch(self, update, context):
+        """Run the handler for the update's callback_data; False if nothing matched"""
+        query = update.callback_query
+        route, args = self.resolve(query.data or "")
+        if route is None:
+            return False
+
+        handler = route.handler
+        if route.admin_only or route.admin_handler is not None:
+            admin = is_admin(query.from_user.id)
+            if route.admin_only and not admin:
+                await query.answer(ACCESS_DENIED)
+                return True
+            if admin and route.admin_handler is not None:
+                handler = route.admin_handler
+
+        await handler(update, context, *args)
+        return True
@@ -0,0 +1,84 @@
+"""Admin workflow state stores - plain JSON data, bounded and optionally persistent"""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import config
+from sqlalchemy import delete
+
+from database import AsyncSessionLocal
+from models import BotUserState
+
+
+class MemoryStateStore:
+    """In-process store with LRU eviction and a TTL per entry
+
+    Async only to share DatabaseStateStore's interface; nothing here awaits.
+    """
+
+    def __init__(self, max_entries=1000, ttl=86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, json)
+
+    async def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return json.loads(data)
+
+    async def set(self, user_id, state):
+        # Serializing here keeps both stores to the same plain-data contract
+        self._entries[user_id] = (time.monotonic() + self.ttl, json.dumps(state))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self, user_id):
+        self._entries.pop(user_id, None)
+
+
+class DatabaseStateStore:
+    """Store backed by the bot_user_states table, shared by every bot worker
+
+    Uses the async session so handlers never block the event loop; each
+    call is a single primary-key statement.
+    """
+
+    def __init__(self, ttl=86400):
+        self.ttl = ttl
+
+    async def get(self, user_id):
+        async with AsyncSessionLocal() as db:
+            row = await db.get(BotUserState, user_id)
+            if row is None:
+                return None
+            if row.updated_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+                await db.delete(row)
+                await db.commit()
+                return None
+            return json.loads(row.data)
+
+    async def set(self, user_id, state):
+        async with AsyncSessionLocal() as db:
+            await db.merge(BotUserState(user_id=user_id, data=json.dumps(state), updated_at=datetime.utcnow()))
+            await db.commit()
+
+    async def clear(self, user_id):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(BotUserState).where(BotUserState.user_id == user_id))
+            await db.commit()
+
+
+def create_state_store():
+    """Build the store selected by STATE_STORE ("memory" or "database")"""
+    if config.STATE_STORE == "database":
+        return DatabaseStateStore(ttl=config.STATE_TTL)
+    return MemoryStateStore(max_entries=config.STATE_MAX_ENTRIES, ttl=config.STATE_TTL)
@@ -0,0 +1,64 @@
+"""Concurrent update processing that keeps each chat's updates in order"""
+
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def update_chat_key(update):
+    """Chat an update belongs to (falls back to the user for chat-less updates)"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Runs up to ``max_concurrent_updates`` updates at once, one at a time per chat
+
+    The chat lock is taken before the concurrency slot, so a backlog from one
+    busy chat waits without holding slots other chats could use. asyncio.Lock
+    wakes waiters in FIFO order, which keeps a chat's updates in arrival order.
+    """
+
+    __slots__ = ("_chat_locks",)
+
+    def __init__(self, max_concurrent_updates):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks = {}  # chat key -> [lock, users]
+
+    async def process_update(self, update, coroutine):
+        key = update_chat_key(update)
+        if key is None:
+            await super().process_update(update, coroutine)
+            return
+
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await super().process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chat_locks[key]
+
+    async def do_process_update(self, update, coroutine):
+        await coroutine
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    @property
+    def active_chats(self):
+        """Number of chats with an update running or queued"""
+        return len(self._chat_locks)
@@ -4,25 +4,26 @@ import config
 from .constants import *
 from telegram.helpers import escape_markdown
 
-# Global user states
-user_states = {}
+from .state import create_state_store
+
+# Admin workflow states (plain JSON-serializable dicts)
+state_store = create_state_store()
 
 def is_admin(user_id):
     """Check if user is admin"""
     return user_id in config.ADMIN_CHAT_IDS
 
-def get_user_state(user_id):
-    """Get user state"""
-    return user_states.get(user_id)
+async def get_user_state(user_id):
+    """Get user state (a copy - call set_user_state after changing it)"""
+    return await state_store.get(user_id)
 
-def set_user_state(user_id, state):
+async def set_user_state(user_id, state):
     """Set user state"""
-    user_states[user_id] = state
+    await state_store.set(user_id, state)
 
-def clear_user_state(user_id):
+async def clear_user_state(user_id):
     """Clear user state"""
-    if user_id in user_states:
-        del user_states[user_id]
+    await state_store.clear(user_id)
 
 def format_product_for_client(product):
     """Format product for client display"""
@@ -125,28 +126,44 @@ def format_contact_for_admin(contact):
         return f"❌ Kontakt ma'lumotini ko'rsatishda xatolik (ID: {getattr(contact, 'id', 'N/A')})"
 
 def format_contact_for_client(contact):
-    """Format contact for client display"""
-    # Escape for MarkdownV2
+    """Format contact for the client contact screen (MarkdownV2)"""
+    message = f"{CONTACT_HEADER_CLIENT}\n\n"
+
     if contact.telegram_username:
-        safe_user = contact.telegram_username.replace('-', '\\-')
-        telegram = "@" + escape_markdown(safe_user, version=2)
-    else:
-        telegram = "❌"
+        message += f"💬 Telegram: @{escape_markdown(contact.telegram_username, version=2)}\n"
+
+    phones = contact.get_phone_numbers_list()
+    if len(phones) == 1:
+        message += f"📱 Telefon: {escape_markdown(phones[0], version=2)}\n"
+    elif phones:
+        message += "📱 Telefonlar:\n" + "".join(f"  • {escape_markdown(phone, version=2)}\n" for phone in phones)
+
+    if contact.instagram_username:
+        message += f"📷 Instagram: {escape_markdown(f'https://instagram.com/{contact.instagram_username}', version=2)}\n"
+
+    return message
+
+def format_contact_for_order(contact):
+    """Format the contact lines of an order message (Markdown)"""
+    message = ""
 
     phones = contact.get_phone_numbers_list()
-    phones_text = ", ".join(escape_markdown(p.replace('+', '\\+'), version=2) for p in phones) if phones else "❌"
+    if len(phones) == 1:
+        message += f"📱 Telefon: {phones[0]}\n"
+    elif phones:
+        message += "📱 Telefonlar:\n" + "".join(f"  • {phone}\n" for phone in phones)
+
+    if contact.telegram_username:
+        message += f"💬 Telegram: @{contact.telegram_username}\n"
 
     if contact.instagram_username:
-        safe_inst = contact.instagram_username.replace('-', '\\-')
-        instagram = escape_markdown(f"https://instagram.com/{safe_inst}", version=2)
-    else:
-        instagram = "❌"
+        message += f"📷 Instagram: https://instagram.com/{contact.instagram_username}"
 
-    return CONTACT_TEMPLATE_CLIENT.format(telegram, phones_text, instagram)
+    return message
 
 def admin_required(func):
     """Admin decorator"""
-    async def wrapper(update, context):
+    async def wrapper(update, context, *args, **kwargs):
         user_id = update.effective_user.id
         if not is_admin(user_id):
             if update.callback_query:
@@ -154,5 +171,5 @@ def admin_required(func):
             else:
                 await update.message.reply_text(ACCESS_DENIED)
             return
-        return await func(update, context)
+        return await func(update, context, *args, **kwargs)
     return wrapper
\ No newline at end of file
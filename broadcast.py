@@ -0,0 +1,93 @@
+"""
+Change propagation between workers through the change_events table.
+
+Each process keeps its own catalogue cache, contact cache, render cache and
+SSE / WebSocket subscribers. Admin edits call announce(), which refreshes this
+process right away and records a change_events row; poll_changes() in every
+other worker (see main.lifespan) picks the row up within CHANGE_POLL_INTERVAL
+seconds and does the same there. With CHANGE_POLL_INTERVAL=0 (one worker)
+nothing is recorded.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+
+import config
+import events
+import repository
+from catalog import catalog_cache
+from contact import contact_provider
+from bot.render import invalidate_product, invalidate_contact
+
+# Identifies this process's rows, so its poller skips them
+ORIGIN = uuid.uuid4().hex
+
+# How often the poller deletes rows older than CHANGE_EVENTS_RETENTION
+PRUNE_INTERVAL = 60
+
+
+def apply_change(event_type, data):
+    """Drop this process's cached copies and tell its event subscribers"""
+    if event_type == events.CONTACT_UPDATED:
+        contact_provider.invalidate()
+        invalidate_contact()
+    else:
+        catalog_cache.invalidate()
+        for product_id in data.get("ids") or [None]:
+            invalidate_product(product_id)
+    events.event_broker.publish(event_type, **data)
+
+
+async def announce(event_type, **data):
+    """Apply a change here and record it for the other workers"""
+    apply_change(event_type, data)
+    if config.CHANGE_POLL_INTERVAL <= 0:
+        return
+    try:
+        await repository.add_change_event(event_type, orjson.dumps(data).decode(), ORIGIN)
+    except Exception as e:
+        # The edit itself is committed; other workers fall back to their cache TTLs
+        print(f"⚠️ Could not record change event {event_type}: {e}")
+
+
+async def poll_changes():
+    """Apply other workers' change events forever, every CHANGE_POLL_INTERVAL seconds
+
+    Reads rows from the newest created_at seen minus CHANGES_OVERLAP, so rows
+    committed late are still picked up, and skips ids already applied.
+    """
+    since = await repository.get_latest_change_event_time()
+    seen = {}  # id -> created_at, for the overlap window
+    if since is not None:
+        # Changes from before this process started are already in the database
+        for row in await repository.get_change_events(since - timedelta(seconds=config.CHANGES_OVERLAP)):
+            seen[row.id] = row.created_at
+    pruned_at = 0.0
+
+    while True:
+        await asyncio.sleep(config.CHANGE_POLL_INTERVAL)
+        try:
+            window = since - timedelta(seconds=config.CHANGES_OVERLAP) if since else None
+            for row in await repository.get_change_events(window):
+                if row.id in seen:
+                    continue
+                seen[row.id] = row.created_at
+                if since is None or row.created_at > since:
+                    since = row.created_at
+                if row.origin != ORIGIN:
+                    apply_change(row.type, orjson.loads(row.data))
+
+            if since is not None:
+                window = since - timedelta(seconds=config.CHANGES_OVERLAP)
+                seen = {event_id: created_at for event_id, created_at in seen.items() if created_at >= window}
+
+            if time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                pruned_at = time.monotonic()
+                cutoff = datetime.utcnow() - timedelta(seconds=config.CHANGE_EVENTS_RETENTION)
+                await repository.prune_change_events(cutoff)
+        except Exception as e:
+            print(f"⚠️ Change event poll failed: {e}")
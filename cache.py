@@ -0,0 +1,64 @@
+"""Versioned in-memory cache of one value, the base of the catalogue and contact caches"""
+
+import asyncio
+import time
+
+
+class VersionedCache:
+    """One value loaded on demand, dropped by invalidate() or after ``ttl`` seconds
+
+    Admin write paths call invalidate(); the TTL only guards against writes
+    that bypass them (other processes, manual SQL). A load that started before
+    an invalidate() is returned to its caller but not stored. Subclasses
+    implement load(); a None result is cached like any other value.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._value = None
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        """Read the value from the database"""
+        raise NotImplementedError
+
+    def _is_fresh(self):
+        return self._loaded and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self):
+        """Return the cached value, loading it on a miss"""
+        if self._is_fresh():
+            self.hits += 1
+            return self._value
+
+        async with self._lock:
+            # Another caller may have reloaded while we waited
+            if self._is_fresh():
+                self.hits += 1
+                return self._value
+
+            self.misses += 1
+            version = self.version
+            value = await self.load()
+
+            # Don't store a value that was invalidated mid-load
+            if version == self.version:
+                self._value = value
+                self._loaded = True
+                self._loaded_at = time.monotonic()
+            return value
+
+    def invalidate(self):
+        """Drop the cached value after an admin write"""
+        self.version += 1
+        self._value = None
+        self._loaded = False
+
+    def stats(self):
+        """Cache counters for monitoring"""
+        return {"version": self.version, "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
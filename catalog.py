@@ -0,0 +1,123 @@
+"""In-memory cache of the active catalogue, shared by the API and the bot"""
+
+import hashlib
+from collections import OrderedDict
+
+import config
+import repository
+from cache import VersionedCache
+
+
+class CachedProduct:
+    """Read-only product snapshot with sizes and file IDs already parsed"""
+
+    __slots__ = ("id", "title", "description", "sizes", "file_ids", "is_active", "created_at", "updated_at")
+
+    def __init__(self, product):
+        self.id = product.id
+        self.title = product.title
+        self.description = product.description
+        self.sizes = tuple(product.get_sizes_list())
+        self.file_ids = tuple(product.get_file_ids_list())
+        self.is_active = product.is_active
+        self.created_at = product.created_at
+        self.updated_at = product.updated_at
+
+    # Same helpers as models.Product so formatters accept either
+    def get_sizes_list(self):
+        """Return sizes as list of floats"""
+        return list(self.sizes)
+
+    def get_file_ids_list(self):
+        """Return file IDs as list"""
+        return list(self.file_ids)
+
+
+class CatalogSnapshot:
+    """One loaded version of the active catalogue plus its HTTP validators"""
+
+    def __init__(self, products, version, last_change=None):
+        self.products = products
+        self.version = version
+        # Read before the products, so changes made during the load are >= it
+        self.last_change = last_change
+        self._positions = None
+        self._encoded = OrderedDict()
+
+        # Strong ETag from the rows themselves, so every worker agrees on it
+        digest = hashlib.sha1()
+        for product in products:
+            digest.update(f"{product.id}:{product.updated_at.isoformat() if product.updated_at else ''};".encode())
+        self.etag = digest.hexdigest()[:20]
+
+        # Deactivated and deleted rows bump updated_at but leave the active
+        # list, so last_change (every row) is what moves when they do. It
+        # comes from the database, so every worker and restart agrees on it.
+        timestamps = [p.updated_at for p in products if p.updated_at]
+        if last_change:
+            timestamps.append(last_change)
+        self.last_modified = max(timestamps) if timestamps else None
+
+    def index_of(self, product_id):
+        """Position of a product in the catalogue, or None"""
+        if self._positions is None:
+            self._positions = {product.id: i for i, product in enumerate(self.products)}
+        return self._positions.get(product_id)
+
+    def encoded(self, key, encode):
+        """Serialized page bytes for ``key``, built once per snapshot with ``encode()``"""
+        body = self._encoded.get(key)
+        if body is not None:
+            self._encoded.move_to_end(key)
+            return body
+
+        body = encode()
+        self._encoded[key] = body
+        while len(self._encoded) > config.CATALOG_ENCODED_PAGES:
+            self._encoded.popitem(last=False)
+        return body
+
+    def page_after(self, created_at, product_id, limit):
+        """Keyset page: products strictly after (created_at, id) in newest-first order"""
+        key = (created_at, product_id)
+        low, high = 0, len(self.products)
+        while low < high:
+            mid = (low + high) // 2
+            product = self.products[mid]
+            if (product.created_at, product.id) < key:
+                high = mid
+            else:
+                low = mid + 1
+        return self.products[low:low + limit]
+
+
+class CatalogCache(VersionedCache):
+    """Versioned cache of active products, newest first (see VersionedCache)"""
+
+    def __init__(self, ttl=None):
+        super().__init__(config.CATALOG_CACHE_TTL if ttl is None else ttl)
+
+    async def load(self):
+        version = self.version
+        # Read before the products, so changes made during the load are >= it
+        last_change = await repository.get_last_change()
+        products = [CachedProduct(p) for p in await repository.get_active_products()]
+        return CatalogSnapshot(products, version, last_change)
+
+    async def get_snapshot(self):
+        """Return the cached catalogue snapshot, loading it on a miss"""
+        return await self.get()
+
+    async def get_active_products(self):
+        """Return the cached active catalogue (newest first)"""
+        return (await self.get_snapshot()).products
+
+    def stats(self):
+        """Cache counters for monitoring"""
+        return {
+            **super().stats(),
+            "cached_products": len(self._value.products) if self._value is not None else 0
+        }
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,143 @@
+"""
+HTTP behaviour checks for the API, run in-process against a scratch database.
+
+Each check drives the real routes through a TestClient, changes rows with the
+sync engine where needed, and reports what it saw. Exits with code 1 if any
+check fails.
+
+Usage:
+  - Run every check:
+      ./.venv/bin/python check_api.py --database-url sqlite:////tmp/check_api.db
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+SEED_PRODUCTS = 200
+
+
+def _newest_on_page(page):
+    """Id of the most recently updated product in a JSON page"""
+    return max(page, key=lambda product: product["updated_at"])["id"]
+
+
+def _change_product(engine, product_id, **values):
+    from sqlalchemy import update
+    from models import Product
+
+    with engine.begin() as conn:
+        conn.execute(update(Product).where(Product.id == product_id).values(updated_at=datetime.utcnow(), **values))
+
+
+def check_last_modified_db_path(client, engine):
+    """A row leaving a database-path page must not move Last-Modified back"""
+    cases = [
+        # (query, how the newest row on the page leaves it)
+        ({"active_only": "false"}, {"is_active": False, "deleted_at": datetime.utcnow()}),
+        ({"size": 17}, {"is_active": False}),
+    ]
+    for params, leave in cases:
+        first = client.get("/api/products", params=params)
+        first.raise_for_status()
+        # HTTP dates have one-second resolution; a change within the same
+        # second is only visible through the ETag
+        time.sleep(1.1)
+        _change_product(engine, _newest_on_page(first.json()), **leave)
+
+        again = client.get("/api/products", params=params, headers={
+            "If-Modified-Since": first.headers["Last-Modified"]
+        })
+        if again.status_code != 200:
+            return f"{params}: got {again.status_code} after a row left the page"
+    return None
+
+
+def check_encoding_validators(client, engine):
+    """Compressed bodies get their own ETag; every answer says Vary: Accept-Encoding"""
+    for url in ("/api/products", "/api/products/snapshot", "/api/contact"):
+        for encoding in ("gzip", "identity"):
+            response = client.get(url, headers={"Accept-Encoding": encoding})
+            response.raise_for_status()
+            etag = response.headers["ETag"]
+            if (encoding == "gzip") != etag.endswith('-gz"'):
+                return f"{url} ({encoding}): ETag {etag} with Content-Encoding {response.headers.get('Content-Encoding')}"
+
+            again = client.get(url, headers={"Accept-Encoding": encoding, "If-None-Match": etag})
+            for answer in (response, again):
+                if answer.headers.get("Vary", "").lower() != "accept-encoding":
+                    return f"{url} ({encoding}, {answer.status_code}): Vary {answer.headers.get('Vary')!r}"
+            if again.status_code != 304:
+                return f"{url} ({encoding}): got {again.status_code} for its own ETag"
+    return None
+
+
+def check_change_token_errors(client, engine):
+    """Malformed or out-of-range change tokens are a 400, not a 500"""
+    import base64
+
+    tokens = {
+        "datetime.min": base64.urlsafe_b64encode(b"0001-01-01T00:00:00").decode().rstrip("="),
+        "not base64": "%%%",
+        "not a timestamp": base64.urlsafe_b64encode(b"yesterday").decode().rstrip("="),
+    }
+    for name, token in tokens.items():
+        response = client.get("/api/products/changes", params={"since": token})
+        if response.status_code != 400:
+            return f"{name}: got {response.status_code}"
+    return None
+
+
+CHECKS = [
+    ("Last-Modified on the database path", check_last_modified_db_path),
+    ("Per-encoding ETags and Vary", check_encoding_validators),
+    ("Change token errors", check_change_token_errors),
+]
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Check conditional GETs and error handling of the API")
+    parser.add_argument("--database-url", help="Scratch database to seed and query (default: configured DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    # The app's engines read DATABASE_URL at import time
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import config
+    from api import router
+    from database import create_tables, engine
+    from explain_queries import seed_products
+    from main import GZipMiddleware
+
+    create_tables()
+    seed_products(engine, SEED_PRODUCTS)
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MINIMUM_SIZE)
+    app.include_router(router, prefix="/api")
+
+    failures = []
+    # Server errors come back as 500s for the checks to report
+    with TestClient(app, raise_server_exceptions=False) as client:
+        for name, check in CHECKS:
+            problem = check(client, engine)
+            if problem:
+                failures.append(name)
+                print(f"❌ {name}: {problem}")
+            else:
+                print(f"✅ {name}")
+
+    if failures:
+        print(f"❌ {len(failures)} checks failed")
+        sys.exit(1)
+    print("✅ All API checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Import checks for import_export.py, run against a scratch database.
+
+Each check empties the product tables, imports a generated file through
+import_table and compares the rejected count and the rows written with what
+the file should produce. Exits with code 1 if any check fails.
+
+Usage:
+  - Against a temporary SQLite file:
+      ./.venv/bin/python check_import_export.py
+
+  - Against PostgreSQL (its product tables are emptied):
+      ./.venv/bin/python check_import_export.py --database-url postgresql://...
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, func, select, update
+
+from models import Base, Product, ProductSize, ProductImage
+from migrations import run_migrations
+from import_export import import_table
+
+
+def _reset(engine):
+    with engine.begin() as conn:
+        for table in (ProductSize, ProductImage, Product):
+            conn.execute(delete(table))
+
+
+def _import(engine, lines, batch_size=500, upsert=False):
+    stream = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    return import_table(engine, "products", stream, "jsonl", batch_size, upsert)
+
+
+def _product_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Product)).scalar()
+
+
+def check_mixed_ids(engine):
+    """Id-less rows before explicit ids must not take those ids"""
+    _reset(engine)
+    lines = [{"title": f"New {n}", "sizes": [17]} for n in range(600)]
+    lines += [{"id": n, "title": f"Kept {n}", "sizes": [17]} for n in range(1, 601)]
+    rejected = _import(engine, lines, batch_size=300)
+    count = _product_count(engine)
+    if rejected or count != 1200:
+        return f"{rejected} rejected, {count} of 1200 products written"
+    return None
+
+
+def check_non_string_values(engine):
+    """Valid JSON with the wrong types is rejected per line, not a crash"""
+    _reset(engine)
+    lines = [
+        {"title": 123},
+        {"title": "Ring", "description": ["a"]},
+        {"title": "Ring", "sizes": {"17": True}},
+        {"id": [1], "title": "Ring"},
+        {"id": True, "title": "Ring"},
+        {"title": "Ring", "file_ids": [{"id": "x"}]},
+        {"title": "Ring", "sizes": [16.5, 17], "file_ids": ["file-1"]},
+    ]
+    try:
+        rejected = _import(engine, lines)
+    except Exception as e:
+        return f"import crashed: {e!r}"
+    count = _product_count(engine)
+    if rejected != len(lines) - 1 or count != 1:
+        return f"{rejected} rejected (expected {len(lines) - 1}), {count} products written (expected 1)"
+    return None
+
+
+def check_upsert_restores(engine):
+    """Upserting the id of a soft-deleted product brings it back"""
+    _reset(engine)
+    _import(engine, [{"id": 7, "title": "Ring", "sizes": [17]}])
+    with engine.begin() as conn:
+        conn.execute(update(Product).where(Product.id == 7).values(is_active=False, deleted_at=datetime.utcnow()))
+
+    rejected = _import(engine, [{"id": 7, "title": "Ring again", "sizes": [17]}], upsert=True)
+    with engine.connect() as conn:
+        row = conn.execute(select(Product.title, Product.deleted_at).where(Product.id == 7)).one()
+    if rejected or row.deleted_at is not None or row.title != "Ring again":
+        return f"{rejected} rejected, title {row.title!r}, deleted_at {row.deleted_at}"
+    return None
+
+
+CHECKS = [
+    ("Mixed rows with and without ids", check_mixed_ids),
+    ("Non-string values", check_non_string_values),
+    ("Upsert restores soft-deleted products", check_upsert_restores),
+]
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Check import_export.py against a scratch database")
+    parser.add_argument("--database-url", help="Scratch database (default: a temporary SQLite file)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(scratch, 'check_import.db')}")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+        failures = []
+        for name, check in CHECKS:
+            problem = check(engine)
+            if problem:
+                failures.append(name)
+                print(f"❌ {name}: {problem}")
+            else:
+                print(f"✅ {name}")
+        engine.dispose()
+
+    if failures:
+        print(f"❌ {len(failures)} checks failed")
+        sys.exit(1)
+    print("✅ All import checks passed")
+
+
+if __name__ == "__main__":
+    main()
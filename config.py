@@ -7,6 +7,15 @@ load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_CHAT_IDS = [int(id.strip()) for id in os.getenv("ADMIN_CHAT_ID", "").split(",") if id.strip()]
 
+# Update delivery: "polling" or "webhook" (updates POSTed to the API server)
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # public base URL, e.g. https://shop.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # sent back by Telegram in X-Telegram-Bot-Api-Secret-Token
+
+# Updates handled at once (different chats only - each chat stays in order)
+BOT_CONCURRENT_UPDATES = int(os.getenv("BOT_CONCURRENT_UPDATES", 32))
+
 # Database Configuration
 # Primary: Use DATABASE_URL directly
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -23,10 +32,62 @@ DB_SSLMODE = os.getenv("DB_SSLMODE")  # e.g., require, verify-full
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+# Seconds open connections (event streams) get to finish on shutdown
+SHUTDOWN_TIMEOUT = int(os.getenv("SHUTDOWN_TIMEOUT", 10))
 
 # App Configuration
 APP_NAME = os.getenv("APP_NAME", "Dunya Jewellery Bot")
 
+# Catalogue cache (seconds before a forced reload, safety net for missed invalidations)
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 300))
+# Current contact cache, same safety net for contact edits
+CONTACT_CACHE_TTL = int(os.getenv("CONTACT_CACHE_TTL", 300))
+# Pre-encoded /api/products pages kept per catalogue version
+CATALOG_ENCODED_PAGES = int(os.getenv("CATALOG_ENCODED_PAGES", 256))
+
+# /api/products/changes: seconds re-sent before a token (late commits, clock
+# skew) and the most changes returned before telling the client to resync
+CHANGES_OVERLAP = int(os.getenv("CHANGES_OVERLAP", 5))
+CHANGES_MAX = int(os.getenv("CHANGES_MAX", 1000))
+
+# Change events pushed over /api/events (SSE) and /api/events/ws: events queued
+# per client before it is told to resync, client limit, keepalive interval (s)
+EVENTS_MAX_PENDING = int(os.getenv("EVENTS_MAX_PENDING", 100))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", 10000))
+EVENTS_KEEPALIVE = int(os.getenv("EVENTS_KEEPALIVE", 15))
+
+# Several workers (uvicorn --workers, webhook mode): each polls change_events
+# every CHANGE_POLL_INTERVAL seconds to drop its caches and push events to its
+# own SSE/WebSocket clients after another worker's admin edit. 0 disables
+# (single worker). Rows are kept CHANGE_EVENTS_RETENTION seconds.
+CHANGE_POLL_INTERVAL = float(os.getenv("CHANGE_POLL_INTERVAL", 1))
+CHANGE_EVENTS_RETENTION = int(os.getenv("CHANGE_EVENTS_RETENTION", 3600))
+
+# Responses smaller than this many bytes are sent uncompressed
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+
+# Admin workflow state: "memory" (per process) or "database" (shared, survives restarts)
+STATE_STORE = os.getenv("STATE_STORE", "memory").lower()
+STATE_TTL = int(os.getenv("STATE_TTL", 86400))
+STATE_MAX_ENTRIES = int(os.getenv("STATE_MAX_ENTRIES", 1000))
+
+# Soft-deleted products move to products_archive after ARCHIVE_AFTER_DAYS
+# (checked every ARCHIVE_INTERVAL seconds by the API process, 0 disables;
+# the product counters row is recounted on the same schedule)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+ARCHIVE_INTERVAL = int(os.getenv("ARCHIVE_INTERVAL", 3600))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+# Rendered product / contact messages kept in memory
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", 5000))
+
+# Bot catalogue paging and outgoing message limits (Telegram allows ~30 msg/s overall, ~1 msg/s per chat)
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", 5))
+CATALOG_VIEW_MODE = os.getenv("CATALOG_VIEW_MODE", "carousel").lower()  # "carousel" or "pages"
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 25))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))
+TELEGRAM_CHAT_BURST = float(os.getenv("TELEGRAM_CHAT_BURST", 3))
+
 # Print configuration for debugging
 if DEBUG:
     print("🔧 Configuration:")
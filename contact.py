@@ -0,0 +1,65 @@
+"""Memoized current contact, shared by the API and the bot"""
+
+import orjson
+
+import config
+import repository
+from cache import VersionedCache
+
+
+class CachedContact:
+    """Read-only contact snapshot with URLs and the API body prepared once"""
+
+    __slots__ = (
+        "id", "telegram_username", "phone_numbers", "instagram_username", "is_active", "updated_at",
+        "telegram_url", "instagram_url", "_json"
+    )
+
+    def __init__(self, contact):
+        self.id = contact.id
+        self.telegram_username = contact.telegram_username
+        self.phone_numbers = tuple(contact.get_phone_numbers_list())
+        self.instagram_username = contact.instagram_username
+        self.is_active = contact.is_active
+        self.updated_at = contact.updated_at
+        self.telegram_url = f"https://t.me/{self.telegram_username}" if self.telegram_username else None
+        self.instagram_url = f"https://instagram.com/{self.instagram_username}" if self.instagram_username else None
+        self._json = None
+
+    # Same helper as models.Contact so formatters accept either
+    def get_phone_numbers_list(self):
+        """Return phone numbers as list"""
+        return list(self.phone_numbers)
+
+    def json(self):
+        """ContactResponse body as JSON bytes, encoded on first use"""
+        if self._json is None:
+            self._json = orjson.dumps({
+                "id": self.id,
+                "telegram_username": self.telegram_username,
+                "telegram_url": self.telegram_url,
+                "phone_numbers": self.phone_numbers,
+                "instagram_username": self.instagram_username,
+                "instagram_url": self.instagram_url,
+                "is_active": self.is_active
+            })
+        return self._json
+
+
+class ContactProvider(VersionedCache):
+    """The current contact (newest active row), loaded once per edit
+
+    Contact edits call invalidate(); the TTL only guards against writes that
+    bypass them. A missing contact is cached too, so lookups never hit the
+    database between reloads.
+    """
+
+    def __init__(self, ttl=None):
+        super().__init__(config.CONTACT_CACHE_TTL if ttl is None else ttl)
+
+    async def load(self):
+        contact = await repository.get_contact()
+        return CachedContact(contact) if contact else None
+
+
+contact_provider = ContactProvider()
@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from models import Base
+from migrations import run_migrations
 import config
 import os
 
@@ -32,6 +35,24 @@ def get_database_url():
     return "sqlite:///./ecommerce.db"
 
 
+def get_async_database_url(url):
+    """Translate a sync database URL to its asyncio driver equivalent"""
+    url = make_url(url)
+
+    if url.drivername.startswith("postgresql"):
+        # asyncpg takes ``ssl`` instead of libpq's ``sslmode``
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", None)
+        if sslmode:
+            query["ssl"] = sslmode
+        return url.set(drivername="postgresql+asyncpg", query=query)
+
+    if url.drivername.startswith("sqlite"):
+        return url.set(drivername="sqlite+aiosqlite")
+
+    return url
+
+
 # Create engine with PostgreSQL optimizations
 database_url = get_database_url()
 
@@ -58,11 +79,39 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the FastAPI routes (same database, asyncio driver)
+async_database_url = get_async_database_url(database_url)
+
+if database_url.startswith('postgresql'):
+    async_engine = create_async_engine(
+        async_database_url,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=config.DEBUG
+    )
+else:
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=config.DEBUG
+    )
+
+# expire_on_commit=False keeps loaded attributes usable after commit,
+# since lazy refreshes are not possible outside the async context
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def create_tables():
-    """Create all tables"""
+    """Create all tables and apply pending migrations"""
     try:
         Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
         print("📊 Database tables created successfully")
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
@@ -83,13 +132,21 @@ def test_connection():
         return False
 
 
-def get_db():
-    """Get database session for FastAPI"""
-    db = SessionLocal()
+async def test_async_connection():
+    """Test database connection through the async engine"""
     try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"❌ Async database connection test failed: {e}")
+        return False
+
+
+async def get_db():
+    """Get async database session for FastAPI"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def get_db_session():
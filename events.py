@@ -0,0 +1,143 @@
+"""In-process fan-out of catalogue change events to SSE / WebSocket clients"""
+
+import asyncio
+import itertools
+
+import orjson
+
+import config
+
+PRODUCT_CREATED = "product.created"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_DELETED = "product.deleted"
+CONTACT_UPDATED = "contact.updated"
+# Sent instead of the backlog a slow client could not keep up with
+RESYNC = "resync"
+
+
+class TooManySubscribers(Exception):
+    """The broker is at EVENTS_MAX_SUBSCRIBERS"""
+
+
+class Event:
+    """One published event, encoded once for every subscriber"""
+
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, event_id, event_type, data):
+        self.id = event_id
+        self.type = event_type
+        self.data = data  # JSON text
+
+    def sse(self):
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+
+class Subscription:
+    """A connected client: bounded queue of events not sent yet"""
+
+    __slots__ = ("queue", "resyncs", "behind", "closed")
+
+    def __init__(self, max_pending):
+        self.queue = asyncio.Queue(max_pending)
+        self.resyncs = 0
+        self.behind = False  # A resync is queued; later events would be redundant
+        self.closed = False
+
+    async def next_event(self, timeout):
+        """Next event, or None after ``timeout`` seconds without one or once closed"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is not None and event.type == RESYNC:
+            self.behind = False
+        return event
+
+
+class EventBroker:
+    """Publish/subscribe for catalogue changes
+
+    publish() never waits: each subscriber has a queue of at most
+    ``max_pending`` events. A subscriber whose queue is full has its backlog
+    replaced by one ``resync`` event (refetch /api/products/changes), so one
+    slow client can neither block the admin handlers nor grow memory.
+    Idle subscribers cost a queue and a parked coroutine each.
+    """
+
+    def __init__(self, max_pending=None, max_subscribers=None):
+        self.max_pending = config.EVENTS_MAX_PENDING if max_pending is None else max_pending
+        self.max_subscribers = config.EVENTS_MAX_SUBSCRIBERS if max_subscribers is None else max_subscribers
+        self.published = 0
+        self.resyncs = 0
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    def check_capacity(self):
+        """Raise TooManySubscribers if subscribe() would
+
+        Lets routes refuse a client before they start a stream, and subscribe
+        only once it is running, so nothing leaks if the client is gone first.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers()
+
+    def subscribe(self):
+        self.check_capacity()
+        subscription = Subscription(self.max_pending)
+        if self._closed:
+            self._end(subscription)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type, **data):
+        """Queue an event for every subscriber (call from the event loop thread)"""
+        if self._closed:
+            return
+        event = Event(next(self._ids), event_type, orjson.dumps(data).decode())
+        self.published += 1
+        for subscription in self._subscribers:
+            if subscription.behind:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._resync(subscription)
+
+    def _resync(self, subscription):
+        """Drop a slow subscriber's backlog and tell it to resync"""
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(Event(next(self._ids), RESYNC, "{}"))
+        subscription.behind = True
+        subscription.resyncs += 1
+        self.resyncs += 1
+
+    def _end(self, subscription):
+        """Mark a subscriber closed and wake it up"""
+        subscription.closed = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def close(self):
+        """End every stream (server shutdown)"""
+        self._closed = True
+        for subscription in self._subscribers:
+            self._end(subscription)
+
+    def stats(self):
+        """Broker counters for monitoring"""
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "resyncs": self.resyncs,
+            "max_pending": self.max_pending
+        }
+
+
+event_broker = EventBroker()
@@ -0,0 +1,229 @@
+"""
+Query plan audit for the hot product and contact queries.
+
+Runs EXPLAIN on every query used by api.py and the bot handlers and fails
+(exit code 1) if any of them reads a table with a sequential scan while that
+table holds more than --threshold rows.
+
+Usage:
+  - Audit the configured database:
+      ./.venv/bin/python explain_queries.py
+
+  - Seed a scratch database with generated products first:
+      ./.venv/bin/python explain_queries.py --database-url sqlite:///./explain.db --seed 20000
+
+  - Change the row threshold (default 1000):
+      ./.venv/bin/python explain_queries.py --threshold 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from models import Base, Product, ProductSize, ProductImage, ProductArchive, Contact, ChangeEvent
+from migrations import run_migrations
+from repository import product_search_query, current_contact_query, after_position, NOT_DELETED
+
+SEED_BATCH_SIZE = 1000
+SAMPLE_SIZES = [15.5, 16, 16.5, 17, 17.5, 18, 18.5, 19, 19.5, 20]
+
+
+def hot_queries(sample_id, sample_created_at):
+    """(name, statement, allow_scan) for each query the app issues"""
+    newest_first = (Product.created_at.desc(), Product.id.desc())
+    return [
+        # Catalogue cache load / bot client view
+        ("active_catalogue", select(Product).where(Product.is_active == True, NOT_DELETED)
+            .order_by(*newest_first), False),
+        # /api/products?active_only=false, first page and a deep page
+        ("all_products_page", product_search_query(active_only=False).limit(51), False),
+        ("all_products_deep_page", product_search_query(active_only=False).offset(5000).limit(51), False),
+        # /api/products?cursor=...
+        ("all_products_keyset", product_search_query(active_only=False)
+            .where(after_position(sample_created_at, sample_id)).limit(51), False),
+        # /api/products/{id}, bot single product / order / edit / delete
+        ("product_by_id", select(Product).where(Product.id == sample_id), False),
+        # selectin loads of a product's sizes and images
+        ("product_sizes_load", select(ProductSize).where(ProductSize.product_id.in_([sample_id])), False),
+        ("product_images_load", select(ProductImage).where(ProductImage.product_id.in_([sample_id])), False),
+        # /api/products?size=... and the bot size filter
+        ("size_filter", product_search_query(size=17.0).limit(51), False),
+        ("size_range_filter", product_search_query(size_min=16.5, size_max=17.5).limit(51), False),
+        # Bot size picker
+        ("available_sizes", select(ProductSize.size).join(Product, Product.id == ProductSize.product_id)
+            .where(Product.is_active == True, NOT_DELETED).distinct().order_by(ProductSize.size), False),
+        # /api/products?q=... (only index-backed with pg_trgm)
+        ("text_search", product_search_query(text="ring").limit(51), True),
+        # Contact provider loads (/api/contact and the bot)
+        ("current_contact", current_contact_query(), False),
+        # Admin product list reads every product by design
+        ("admin_products", select(Product).where(NOT_DELETED), True),
+        # /api/products/changes (live rows and archived deletions)
+        ("product_changes", select(Product.id).where(Product.updated_at >= sample_created_at)
+            .order_by(Product.updated_at, Product.id).limit(1001), False),
+        ("archived_changes", select(ProductArchive.id).where(ProductArchive.updated_at >= sample_created_at)
+            .limit(1001), False),
+        # Change event poller in every worker (broadcast.poll_changes)
+        ("change_events_poll", select(ChangeEvent).where(ChangeEvent.created_at >= sample_created_at)
+            .order_by(ChangeEvent.id), False),
+        # Archive job: soft-deleted products old enough to move out
+        ("archive_candidates", select(Product.id).where(Product.deleted_at < sample_created_at)
+            .order_by(Product.deleted_at).limit(500), False),
+    ]
+
+
+def seed_products(engine, count):
+    """Insert generated products (with sizes and images) until ``count`` exist"""
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Product)).scalar()
+    missing = count - existing
+    if missing <= 0:
+        print(f"🌱 {existing} products already present")
+        return
+
+    print(f"🌱 Seeding {missing} products...")
+    start = datetime.utcnow() - timedelta(days=365)
+    created = 0
+    while created < missing:
+        batch = min(SEED_BATCH_SIZE, missing - created)
+        with engine.begin() as conn:
+            rows = []
+            children = []
+            for i in range(batch):
+                n = existing + created + i
+                row_sizes = random.sample(SAMPLE_SIZES, 3)
+                file_ids = [f"seed-{n}-{position}" for position in range(random.randint(0, 3))]
+                children.append((row_sizes, file_ids))
+                rows.append({
+                    "title": f"Ring {n}",
+                    "description": f"Generated product {n}",
+                    # Legacy columns stay in sync like every real write path
+                    "sizes": ",".join(str(size) for size in row_sizes),
+                    "telegram_file_ids": ",".join(file_ids),
+                    "is_active": n % 10 != 0,
+                    "created_at": start + timedelta(minutes=n),
+                    "updated_at": start + timedelta(minutes=n),
+                })
+            ids = conn.execute(insert(Product).returning(Product.id, sort_by_parameter_order=True), rows).scalars().all()
+
+            sizes = []
+            images = []
+            for product_id, (row_sizes, file_ids) in zip(ids, children):
+                for size in row_sizes:
+                    sizes.append({"product_id": product_id, "size": size})
+                for position, file_id in enumerate(file_ids):
+                    images.append({"product_id": product_id, "position": position, "file_id": file_id})
+            conn.execute(insert(ProductSize), sizes)
+            if images:
+                conn.execute(insert(ProductImage), images)
+        created += batch
+
+    with engine.begin() as conn:
+        if not conn.execute(select(func.count()).select_from(Contact)).scalar():
+            conn.execute(insert(Contact).values(telegram_username="dunya_jewellery", phone_numbers="+998901234567", is_active=True))
+
+    # Fresh statistics so the planner sees the real table sizes
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print("✅ Seeded")
+
+
+def table_row_counts(engine):
+    with engine.connect() as conn:
+        return {
+            table.name: conn.execute(select(func.count()).select_from(table)).scalar()
+            for table in Base.metadata.sorted_tables
+        }
+
+
+def explain(conn, statement):
+    """Return the tables read with a sequential scan by ``statement``"""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans = []
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return scans, json.dumps(plan[0]["Plan"], indent=1)
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        scans = []
+        for row in rows:
+            detail = row[-1]
+            # "SCAN products" is a table scan; "SCAN products USING INDEX ..." is not
+            if detail.startswith("SCAN ") and "USING" not in detail and "CONSTANT ROW" not in detail:
+                scans.append(detail.split()[1])
+        return scans, "\n".join(row[-1] for row in rows)
+
+    raise RuntimeError(f"Unsupported dialect: {conn.dialect.name}")
+
+
+def audit(engine, threshold, verbose=False):
+    """Explain every hot query; return the list of failures"""
+    counts = table_row_counts(engine)
+    with engine.connect() as conn:
+        sample = conn.execute(
+            select(Product.id, Product.created_at).order_by(Product.created_at.desc()).offset(100).limit(1)
+        ).first() or (1, datetime.utcnow())
+
+        failures = []
+        for name, statement, allow_scan in hot_queries(sample[0], sample[1]):
+            scans, plan = explain(conn, statement)
+            large_scans = [table for table in scans if counts.get(table, 0) > threshold]
+
+            if large_scans and not allow_scan:
+                failures.append(name)
+                status = "❌"
+            elif large_scans:
+                status = "⚠️ "
+            else:
+                status = "✅"
+
+            print(f"{status} {name}: {'seq scan on ' + ', '.join(large_scans) if large_scans else 'ok'}")
+            if verbose or (large_scans and not allow_scan):
+                print("   " + plan.replace("\n", "\n   "))
+
+    return failures
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries and fail on sequential scans")
+    parser.add_argument("--database-url", help="Audit this database instead of the configured one")
+    parser.add_argument("--seed", type=int, default=0, help="Generate products until this many exist")
+    parser.add_argument("--threshold", type=int, default=1000, help="Row count above which a seq scan fails")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from database import engine
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    if args.seed:
+        seed_products(engine, args.seed)
+
+    failures = audit(engine, args.threshold, args.verbose)
+    if failures:
+        print(f"❌ {len(failures)} queries fall back to sequential scans: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ All hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Offline stand-in for telegram.Bot, used by the simulations and checks.
+
+FakeBot records every Bot API call (method, chat, time) instead of sending it
+and can add a fixed latency per call. message_update / callback_update build
+real telegram.Update objects bound to it, so handlers run unchanged:
+update.message.reply_text, query.answer, query.edit_message_text and
+context.bot all end up in FakeBot.calls.
+"""
+
+import asyncio
+import itertools
+import time
+from datetime import datetime
+
+
+class FakeMessage:
+    """What a Bot API send returns - handlers only read ids from it"""
+
+    def __init__(self, message_id, chat_id):
+        self.message_id = message_id
+        self.chat_id = chat_id
+
+    async def delete(self):
+        return True
+
+
+class FakeBot:
+    """Records Bot API calls as (method, chat_id, monotonic time, kwargs)"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.defaults = None  # Read by Update.de_json
+        self.calls = []
+        self._message_ids = itertools.count(1000)
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        async def call(*args, **kwargs):
+            self.calls.append((method, kwargs.get("chat_id"), time.monotonic(), kwargs))
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if method == "send_media_group":
+                return [FakeMessage(next(self._message_ids), kwargs.get("chat_id")) for _ in kwargs["media"]]
+            return FakeMessage(next(self._message_ids), kwargs.get("chat_id"))
+        return call
+
+    def sends(self, chat_id=None):
+        """Calls that put a message in a chat (answers and edits excluded)"""
+        return [
+            call for call in self.calls
+            if call[0].startswith("send_") and (chat_id is None or call[1] == chat_id)
+        ]
+
+
+class FakeContext:
+    """The part of CallbackContext the handlers use"""
+
+    def __init__(self, bot, args=None):
+        self.bot = bot
+        self.args = args or []
+
+
+_update_ids = itertools.count(1)
+
+
+def _user(user_id):
+    return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+
+
+def _message(user_id, text=None, message_id=1):
+    message = {
+        "message_id": message_id,
+        "date": int(datetime.utcnow().timestamp()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": _user(user_id),
+    }
+    if text is not None:
+        message["text"] = text
+    return message
+
+
+def message_update(bot, user_id, text):
+    """Private-chat text message from ``user_id``"""
+    from telegram import Update
+    return Update.de_json({"update_id": next(_update_ids), "message": _message(user_id, text)}, bot)
+
+
+def callback_update(bot, user_id, data):
+    """Inline button press by ``user_id`` on a bot message in their chat"""
+    from telegram import Update
+    return Update.de_json({
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_update_ids)),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": _message(user_id, "menu"),
+        },
+    }, bot)
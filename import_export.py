@@ -0,0 +1,518 @@
+"""
+Bulk import / export of products (and contacts) as CSV or JSONL.
+
+Rows are streamed in both directions and written in batches, so memory stays
+flat however large the file is. Sizes go through the same parse_sizes as the
+admin chat flow and phone numbers through the same Uzbek number validation.
+
+Usage:
+  - Export every product to CSV (format from the extension):
+      ./.venv/bin/python import_export.py export products.csv
+
+  - Export contacts as JSONL to stdout:
+      ./.venv/bin/python import_export.py export - --table contacts --format jsonl
+
+  - Import a new collection:
+      ./.venv/bin/python import_export.py import collection.csv
+
+  - Re-import an edited export, updating existing products by id:
+      ./.venv/bin/python import_export.py import products.jsonl --upsert --batch-size 1000
+
+CSV columns: id, title, description, sizes ("16.5,17"), file_ids ("id1,id2"),
+is_active, created_at. JSONL may use lists for sizes and file_ids. Rows
+without an id are inserted as new records, after every row that has one;
+without --upsert, rows whose id already exists are rejected and reported like
+invalid rows; with --upsert, a soft-deleted product with that id is restored.
+Running servers pick the changes up on their next catalogue reload
+(CATALOG_CACHE_TTL).
+"""
+
+import argparse
+import csv
+import json
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from models import Base, Product, ProductSize, ProductImage, ProductCounters, Contact, split_sizes, split_file_ids
+from migrations import run_migrations
+from repository import product_totals_query, COUNTERS_ID, NOT_DELETED
+from bot.utils import parse_sizes
+from bot.handlers.contacts import parse_phone_numbers
+
+PRODUCT_FIELDS = ["id", "title", "description", "sizes", "file_ids", "is_active", "created_at"]
+CONTACT_FIELDS = ["id", "telegram_username", "phone_numbers", "instagram_username", "is_active", "created_at"]
+TRUE_VALUES = {"1", "true", "yes", "y", "ha", "on"}
+FALSE_VALUES = {"0", "false", "no", "n", "yo'q", "off"}
+
+
+class Progress:
+    """Running row count and rate, redrawn on one line"""
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def add(self, count):
+        self.count += count
+        print(f"\r   {self.label}: {self.count:,} rows ({self.rate():,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        print(file=sys.stderr)
+        print(f"✅ {self.label}: {self.count:,} rows in {elapsed:.1f}s ({self.rate():,.0f} rows/s)", file=sys.stderr)
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return "jsonl"
+    if path.endswith(".csv"):
+        return "csv"
+    raise SystemExit("❌ Can't tell the format from the file name, pass --format csv|jsonl")
+
+
+# Validation
+def _parse_bool(value, default=True):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(f"is_active must be true/false, got {value!r}")
+
+
+def _parse_id(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"id must be an integer, got {value!r}")
+    record_id = int(value)
+    if record_id < 1:
+        raise ValueError(f"id must be positive, got {value!r}")
+    return record_id
+
+
+def _parse_datetime(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _text(raw, field):
+    """A stripped string field ("" if missing); JSONL may hold any JSON type"""
+    value = raw.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string, got {value!r}")
+    return value.strip()
+
+
+def _join(value):
+    """Lists (JSONL) and comma strings (CSV) both become a comma string"""
+    if value is None:
+        return ""
+    items = value if isinstance(value, (list, tuple)) else [value]
+    for item in items:
+        if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+            raise ValueError(f"expected text or numbers, got {value!r}")
+    return ",".join(str(item) for item in items)
+
+
+def validate_product(raw):
+    """Normalize one input record into products column values (raises ValueError)"""
+    title = _text(raw, "title")
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > 255:
+        raise ValueError("title is longer than 255 characters")
+
+    sizes = parse_sizes(_join(raw.get("sizes")))
+    if sizes is None:
+        raise ValueError(f"invalid sizes: {_join(raw.get('sizes'))!r}")
+
+    return {
+        "id": _parse_id(raw.get("id")),
+        "title": title,
+        "description": _text(raw, "description") or None,
+        "sizes": sizes,
+        "file_ids": split_file_ids(_join(raw.get("file_ids"))),
+        "is_active": _parse_bool(raw.get("is_active")),
+        "created_at": _parse_datetime(raw.get("created_at")),
+    }
+
+
+def validate_contact(raw):
+    """Normalize one input record into contacts column values (raises ValueError)"""
+    phones = parse_phone_numbers(_join(raw.get("phone_numbers")))
+    return {
+        "id": _parse_id(raw.get("id")),
+        "telegram_username": _text(raw, "telegram_username").replace("@", "").strip() or None,
+        "phone_numbers": ",".join(phones) or None,
+        "instagram_username": _text(raw, "instagram_username").replace("@", "").strip() or None,
+        "is_active": _parse_bool(raw.get("is_active")),
+        "created_at": _parse_datetime(raw.get("created_at")),
+    }
+
+
+# Reading / writing files
+def read_records(stream, fmt):
+    """Yield (line number, raw record) from a CSV or JSONL stream
+
+    CSV records are dicts already; JSONL lines are yielded as text and parsed
+    by parse_record, so a malformed line is rejected like any invalid row.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def parse_record(raw):
+    """Turn a raw record from read_records into a dict (raises ValueError)"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected a JSON object, got {type(raw).__name__}")
+    return raw
+
+
+def product_record(row):
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "sizes": split_sizes(row.sizes),
+        "file_ids": split_file_ids(row.telegram_file_ids),
+        "is_active": bool(row.is_active),
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def contact_record(row):
+    return {
+        "id": row.id,
+        "telegram_username": row.telegram_username,
+        "phone_numbers": split_file_ids(row.phone_numbers),
+        "instagram_username": row.instagram_username,
+        "is_active": bool(row.is_active),
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def export_table(engine, table_name, stream, fmt, batch_size):
+    """Stream every live row of ``table_name`` to ``stream``"""
+    if table_name == "products":
+        fields, to_record = PRODUCT_FIELDS, product_record
+        query = select(
+            Product.id, Product.title, Product.description, Product.sizes,
+            Product.telegram_file_ids, Product.is_active, Product.created_at
+        ).where(NOT_DELETED).order_by(Product.id)
+    else:
+        fields, to_record = CONTACT_FIELDS, contact_record
+        query = select(
+            Contact.id, Contact.telegram_username, Contact.phone_numbers,
+            Contact.instagram_username, Contact.is_active, Contact.created_at
+        ).order_by(Contact.id)
+
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+
+    progress = Progress(f"Exported {table_name}")
+    with engine.connect() as conn:
+        # Server-side cursor on PostgreSQL, so only one batch is in memory
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for rows in result.partitions():
+            for row in rows:
+                record = to_record(row)
+                if writer:
+                    # Lists become comma strings, the same shape the importer reads
+                    writer.writerow({
+                        key: _join(value) if isinstance(value, list) else value
+                        for key, value in record.items()
+                    })
+                else:
+                    stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            progress.add(len(rows))
+    progress.finish()
+
+
+# Writing batches
+def _dialect_insert(conn):
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif conn.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f"Unsupported dialect: {conn.dialect.name}")
+    return dialect_insert
+
+
+def write_rows(conn, table, rows, upsert):
+    """Insert ``rows`` (upserting those with an id); return their ids in order"""
+    ids = [None] * len(rows)
+    new = [(i, row) for i, row in enumerate(rows) if row["id"] is None]
+    existing = [(i, row) for i, row in enumerate(rows) if row["id"] is not None]
+
+    # Explicit ids first, so an auto-assigned id can't take one of them
+    if existing:
+        values = [row for _, row in existing]
+        if upsert:
+            statement = _dialect_insert(conn)(table)
+            columns = {key: statement.excluded[key] for key in values[0] if key not in ("id", "created_at")}
+            if "deleted_at" in table.c:
+                # Upserting a soft-deleted product brings it back
+                columns["deleted_at"] = None
+            statement = statement.on_conflict_do_update(index_elements=[table.c.id], set_=columns)
+        else:
+            statement = insert(table)
+        conn.execute(statement, values)
+        for i, row in existing:
+            ids[i] = row["id"]
+
+    if new:
+        values = [{key: value for key, value in row.items() if key != "id"} for _, row in new]
+        inserted = conn.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), values
+        ).scalars().all()
+        for (i, _), record_id in zip(new, inserted):
+            ids[i] = record_id
+
+    return ids
+
+
+def write_product_batch(conn, records, upsert):
+    """Write products plus their size and image rows in one transaction"""
+    now = datetime.utcnow()
+    rows = [{
+        "id": record["id"],
+        "title": record["title"],
+        "description": record["description"],
+        "sizes": ",".join(str(s) for s in record["sizes"]),
+        "telegram_file_ids": ",".join(record["file_ids"]),
+        "is_active": record["is_active"],
+        "created_at": record["created_at"] or now,
+        "updated_at": now,
+    } for record in records]
+    ids = write_rows(conn, Product.__table__, rows, upsert)
+
+    # Upserted products get their children replaced
+    replaced = [record["id"] for record in records if record["id"] is not None]
+    if replaced:
+        conn.execute(delete(ProductSize).where(ProductSize.product_id.in_(replaced)))
+        conn.execute(delete(ProductImage).where(ProductImage.product_id.in_(replaced)))
+
+    sizes = [
+        {"product_id": product_id, "size": size}
+        for product_id, record in zip(ids, records)
+        for size in record["sizes"]
+    ]
+    images = [
+        {"product_id": product_id, "position": position, "file_id": file_id}
+        for product_id, record in zip(ids, records)
+        for position, file_id in enumerate(record["file_ids"])
+    ]
+    if sizes:
+        conn.execute(insert(ProductSize), sizes)
+    if images:
+        conn.execute(insert(ProductImage), images)
+
+
+def write_contact_batch(conn, records, upsert):
+    now = datetime.utcnow()
+    rows = [dict(record, created_at=record["created_at"] or now, updated_at=now) for record in records]
+    write_rows(conn, Contact.__table__, rows, upsert)
+
+
+def existing_ids(conn, table, ids):
+    """The subset of ``ids`` already present in ``table`` (soft-deleted rows included)"""
+    if not ids:
+        return set()
+    return set(conn.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars())
+
+
+def sync_sequence(conn, table):
+    """Move a PostgreSQL id sequence past ids inserted explicitly"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"GREATEST((SELECT COALESCE(MAX(id), 0) FROM {table.name}), 1))"
+        ))
+
+
+def refresh_counters(conn):
+    """Recompute the product counters row after a bulk change"""
+    totals = conn.execute(product_totals_query()).one()
+    conn.execute(
+        update(ProductCounters)
+        .where(ProductCounters.id == COUNTERS_ID)
+        .values(total=totals.total, active=totals.active, with_images=totals.with_images)
+    )
+
+
+def import_table(engine, table_name, stream, fmt, batch_size, upsert):
+    """Validate and write records in batches; return the number of rejected rows
+
+    ``stream`` is read twice, so it must be seekable.
+    """
+    if table_name == "products":
+        validate, write_batch, table = validate_product, write_product_batch, Product.__table__
+    else:
+        validate, write_batch, table = validate_contact, write_contact_batch, Contact.__table__
+
+    progress = Progress(f"Imported {table_name}")
+    rejected = 0
+    batch = []  # (line number, record)
+
+    def reject(line_no, message):
+        nonlocal rejected
+        rejected += 1
+        print(f"\n⚠️  Line {line_no}: {message}", file=sys.stderr)
+
+    def without_conflicts():
+        """Drop records whose id exists already or repeats within the batch"""
+        ids = [record["id"] for _, record in batch if record["id"] is not None]
+        with engine.connect() as conn:
+            taken = existing_ids(conn, table, ids)
+        kept = []
+        for line_no, record in batch:
+            if record["id"] in taken:
+                reject(line_no, f"id {record['id']} already exists (pass --upsert to update it)")
+                continue
+            if record["id"] is not None:
+                taken.add(record["id"])
+            kept.append((line_no, record))
+        return kept
+
+    def flush():
+        nonlocal rejected
+        pending = batch if upsert else without_conflicts()
+        if pending:
+            try:
+                with engine.begin() as conn:
+                    write_batch(conn, [record for _, record in pending], upsert)
+                    if any(record["id"] is not None for _, record in pending):
+                        # Later batches' new rows must not draw an id written here
+                        sync_sequence(conn, table)
+            except IntegrityError as e:
+                # Earlier batches stay committed; this one is rolled back as a whole
+                rejected += len(pending)
+                print(
+                    f"\n⚠️  Lines {pending[0][0]}-{pending[-1][0]}: batch of {len(pending)} rows not written: {e.orig}",
+                    file=sys.stderr
+                )
+            else:
+                progress.add(len(pending))
+        batch.clear()
+
+    # Rows with an id go in a first pass, the rest in a second: an id-less
+    # row written earlier would draw the next free id, which a later line
+    # may set explicitly
+    for explicit in (True, False):
+        stream.seek(0)
+        for line_no, raw in read_records(stream, fmt):
+            try:
+                record = validate(parse_record(raw))
+            except ValueError as e:
+                if explicit:
+                    reject(line_no, e)  # Reported once, in the first pass
+                continue
+            if (record["id"] is not None) != explicit:
+                continue
+
+            if upsert and explicit and any(record["id"] == queued["id"] for _, queued in batch):
+                # One upsert statement can't touch a row twice; the later line wins
+                flush()
+            batch.append((line_no, record))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    progress.finish()
+
+    if table_name == "products":
+        with engine.begin() as conn:
+            refresh_counters(conn)
+
+    return rejected
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Bulk import / export products and contacts")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="File to read or write, '-' for stdin / stdout")
+    parser.add_argument("--table", choices=["products", "contacts"], default="products")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    parser.add_argument("--upsert", action="store_true", help="Update existing rows that match an id")
+    parser.add_argument("--database-url", help="Use this database instead of the configured one")
+    args = parser.parse_args(argv)
+
+    fmt = detect_format(args.path, args.format)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from database import engine
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    if args.command == "export":
+        stream = sys.stdout if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8")
+        try:
+            export_table(engine, args.table, stream, fmt, args.batch_size)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        return
+
+    if args.path == "-":
+        # The importer reads its input twice, so stdin is spooled to disk first
+        stream = tempfile.TemporaryFile("w+", newline="", encoding="utf-8")
+        shutil.copyfileobj(sys.stdin, stream)
+    else:
+        stream = open(args.path, newline="", encoding="utf-8")
+    try:
+        rejected = import_table(engine, args.table, stream, fmt, args.batch_size, args.upsert)
+    finally:
+        stream.close()
+
+    if rejected:
+        print(f"❌ {rejected} rows rejected (see warnings above)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
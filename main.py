@@ -1,11 +1,19 @@
 import asyncio
+import hmac
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware as BaseGZipMiddleware
+from starlette.datastructures import MutableHeaders
 from contextlib import asynccontextmanager
-from database import create_tables, test_connection
+from telegram import Update
+from database import create_tables, test_connection, test_async_connection, async_engine
 from api import router as api_router
 from bot.main import setup_bot
+from catalog import catalog_cache
+from archive import archive_worker
+from broadcast import poll_changes
+from events import event_broker
 import config
 
 @asynccontextmanager
@@ -39,26 +47,80 @@ async def lifespan(app: FastAPI):
             bot_app = setup_bot()
             await bot_app.initialize()
             await bot_app.start()
-            await bot_app.updater.start_polling()
-            print("🤖 Bot started successfully")
+            if config.BOT_MODE == "webhook":
+                if not config.WEBHOOK_SECRET:
+                    raise RuntimeError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
+                if config.WEBHOOK_URL:
+                    await bot_app.bot.set_webhook(
+                        url=config.WEBHOOK_URL.rstrip("/") + config.WEBHOOK_PATH,
+                        secret_token=config.WEBHOOK_SECRET,
+                        allowed_updates=Update.ALL_TYPES
+                    )
+                print(f"🤖 Bot started (webhook at {config.WEBHOOK_PATH})")
+            else:
+                await bot_app.updater.start_polling()
+                print("🤖 Bot started successfully")
         else:
             print("⚠️  BOT_TOKEN not set — starting API without Telegram bot")
     except Exception as e:
         print(f"❌ Failed to start bot: {e}")
         raise
 
+    app.state.bot_app = bot_app
+
+    archive_task = asyncio.create_task(archive_worker()) if config.ARCHIVE_INTERVAL > 0 else None
+    # Other workers' admin edits: drop our caches, push to our event clients
+    changes_task = asyncio.create_task(poll_changes()) if config.CHANGE_POLL_INTERVAL > 0 else None
+
     yield
 
     # Shutdown
+    event_broker.close()
+
+    for task in (archive_task, changes_task):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
     try:
         if bot_app is not None:
-            await bot_app.updater.stop()
+            # The webhook stays registered: other workers may still be serving it
+            if bot_app.updater is not None:
+                await bot_app.updater.stop()
             await bot_app.stop()
             await bot_app.shutdown()
             print("🛑 Bot stopped")
     except Exception as e:
         print(f"⚠️ Error during shutdown: {e}")
 
+    await async_engine.dispose()
+
+
+class GZipMiddleware(BaseGZipMiddleware):
+    """GZipMiddleware that sends Vary: Accept-Encoding on every response
+
+    The stock middleware only adds it to bodies it compresses, but the ETags
+    from api._conditional depend on Accept-Encoding for uncompressed and 304
+    answers too.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_vary)
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -75,8 +137,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Next-Cursor"],
 )
 
+# Compress larger JSON responses (/api/products/snapshot arrives pre-compressed and is left alone)
+app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MINIMUM_SIZE, compresslevel=6)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
@@ -90,15 +156,47 @@ async def root():
     }
 
 
+@app.post(config.WEBHOOK_PATH, include_in_schema=False)
+async def telegram_webhook(request: Request):
+    """Receive one Telegram update (BOT_MODE=webhook)"""
+    bot_app = getattr(request.app.state, "bot_app", None)
+    if config.BOT_MODE != "webhook" or bot_app is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(token, config.WEBHOOK_SECRET):
+        raise HTTPException(status_code=403, detail="Invalid secret token")
+
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid update")
+    # Valid JSON can still be a list, a number or an empty object
+    if not isinstance(data, dict) or not isinstance(data.get("update_id"), int):
+        raise HTTPException(status_code=400, detail="Invalid update")
+    try:
+        update = Update.de_json(data, bot_app.bot)
+    except (TypeError, ValueError, AttributeError, KeyError):
+        # Right top level, wrong types further down
+        raise HTTPException(status_code=400, detail="Invalid update")
+
+    # Acknowledge right away; the application's update fetcher runs it through the
+    # update processor (per-chat ordering, concurrency limit). Updates still queued
+    # when a worker dies are lost - Telegram only retries unacknowledged ones.
+    await bot_app.update_queue.put(update)
+    return {"ok": True}
+
+
 @app.get("/health")
 async def health_check():
     """Enhanced health check with database status"""
     try:
-        db_status = test_connection()
+        db_status = await test_async_connection()
         return {
             "status": "healthy" if db_status else "unhealthy",
             "database": "PostgreSQL" if config.DATABASE_URL and "postgresql" in config.DATABASE_URL else "SQLite",
-            "database_connected": db_status
+            "database_connected": db_status,
+            "catalog_cache": catalog_cache.stats()
         }
     except Exception as e:
         return {
@@ -115,5 +213,7 @@ if __name__ == "__main__":
         "main:app",
         host=config.HOST,
         port=config.PORT,
-        reload=config.DEBUG
+        reload=config.DEBUG,
+        # Event streams never finish on their own
+        timeout_graceful_shutdown=config.SHUTDOWN_TIMEOUT
     )
\ No newline at end of file
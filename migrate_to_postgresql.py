@@ -7,17 +7,40 @@ Usage:
 
   - Drop and recreate all tables (DESTRUCTIVE):
       ./.venv/bin/python migrate_to_postgresql.py --reset
+
+  - Move the development SQLite data into the configured database:
+      ./.venv/bin/python migrate_to_postgresql.py --copy-from sqlite:///./ecommerce.db
+
+  - Same, replacing whatever the target already holds (DESTRUCTIVE):
+      ./.venv/bin/python migrate_to_postgresql.py --copy-from sqlite:///./ecommerce.db --replace
+
+The copy streams products (with their sizes and images), archived products
+and contacts in chunks inside one target transaction, using COPY on
+PostgreSQL. Ids are kept, sequences are moved past them, and row counts and
+checksums are compared with the source afterwards.
 """
 
+import argparse
+import hashlib
+import io
 import sys
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import text
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import make_url
 
 import config  # loads .env
 from database import engine, create_tables
-from models import Base, Contact
+from models import Base, Product, ProductSize, ProductImage, ProductArchive, Contact
+from migrations import run_migrations
 from database import get_db_session
+from import_export import refresh_counters, sync_sequence
+
+# Parents before children, so foreign keys hold while loading
+COPY_TABLES = [
+    Product.__table__, ProductSize.__table__, ProductImage.__table__, ProductArchive.__table__, Contact.__table__
+]
 
 
 def test_db_connection() -> bool:
@@ -37,10 +60,14 @@ def reset_db():
     print("✅ All tables dropped")
 
 
-def init_tables_and_seed():
+def init_tables_and_seed(seed_contact=True):
     print("📦 Creating tables...")
     create_tables()
 
+    if not seed_contact:
+        print("✅ Tables ready")
+        return
+
     # Seed default contact if none exists
     db = get_db_session()
     try:
@@ -61,9 +88,151 @@ def init_tables_and_seed():
     print("✅ Tables ready")
 
 
+def copy_value(value):
+    """One field in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def load_chunk(conn, table, columns, rows):
+    """Bulk load one chunk: COPY on PostgreSQL, multi-row INSERT elsewhere"""
+    if conn.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(copy_value(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        # Raw psycopg2 cursor on the same connection, so it joins the transaction
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+    else:
+        conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def target_row_counts(conn):
+    return {table.name: conn.execute(select(func.count()).select_from(table)).scalar() for table in COPY_TABLES}
+
+
+def clear_tables(conn):
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"TRUNCATE {', '.join(table.name for table in COPY_TABLES)} RESTART IDENTITY"))
+    else:
+        for table in reversed(COPY_TABLES):
+            conn.execute(table.delete())
+
+
+def copy_data(source_engine, chunk_size, replace=False):
+    """Stream every COPY_TABLES row from the source into the configured database"""
+    with engine.begin() as target:
+        existing = {name: count for name, count in target_row_counts(target).items() if count}
+        if existing and not replace:
+            print(f"❌ Target already has data: {existing}. Use --replace to overwrite it.")
+            return False
+        if existing:
+            print(f"⚠️ Clearing target tables: {existing}")
+            clear_tables(target)
+
+        with source_engine.connect() as source:
+            for table in COPY_TABLES:
+                columns = [column.name for column in table.columns]
+                result = source.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                    select(table).order_by(table.c.id)
+                )
+                copied = 0
+                for rows in result.partitions():
+                    load_chunk(target, table, columns, rows)
+                    copied += len(rows)
+                    print(f"\r   {table.name}: {copied:,} rows", end="", flush=True)
+                print(f"\r✅ {table.name}: {copied:,} rows")
+
+        for table in COPY_TABLES:
+            sync_sequence(target, table)
+        refresh_counters(target)
+
+    return True
+
+
+def _normalize(value):
+    """Driver-independent form of a value for checksums"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+def table_fingerprint(engine_, table, chunk_size):
+    """(row count, sha256 over every row in id order)"""
+    digest = hashlib.sha256()
+    count = 0
+    with engine_.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            select(table).order_by(table.c.id)
+        )
+        for rows in result.partitions():
+            for row in rows:
+                digest.update(repr(tuple(_normalize(value) for value in row)).encode())
+                count += 1
+    return count, digest.hexdigest()
+
+
+def verify_copy(source_engine, chunk_size):
+    """Compare counts and checksums of every copied table; True if all match"""
+    ok = True
+    for table in COPY_TABLES:
+        source_count, source_sum = table_fingerprint(source_engine, table, chunk_size)
+        target_count, target_sum = table_fingerprint(engine, table, chunk_size)
+        if (source_count, source_sum) == (target_count, target_sum):
+            print(f"✅ {table.name}: {target_count:,} rows, checksum {target_sum[:12]}")
+        else:
+            ok = False
+            print(f"❌ {table.name}: source {source_count:,} rows / {source_sum[:12]}, "
+                  f"target {target_count:,} rows / {target_sum[:12]}")
+    return ok
+
+
+def migrate_data(source_url, chunk_size, replace=False):
+    if make_url(source_url) == make_url(str(engine.url)):
+        print("❌ Source and target are the same database")
+        sys.exit(1)
+
+    source_engine = create_engine(source_url)
+    # Bring the source to the current schema first (what app startup would do)
+    Base.metadata.create_all(bind=source_engine)
+    run_migrations(source_engine)
+
+    print(f"🚚 Copying data from {source_engine.url.render_as_string(hide_password=True)}...")
+    if not copy_data(source_engine, chunk_size, replace):
+        sys.exit(1)
+
+    print("🔍 Verifying...")
+    if not verify_copy(source_engine, chunk_size):
+        print("❌ Copied data does not match the source")
+        sys.exit(1)
+    print("✅ Data migrated")
+
+
 def main(argv: Optional[list] = None):
-    argv = argv or sys.argv[1:]
-    do_reset = "--reset" in argv
+    parser = argparse.ArgumentParser(description="Initialize the database and optionally copy data into it")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables (DESTRUCTIVE)")
+    parser.add_argument("--copy-from", metavar="SOURCE_URL", help="Copy products and contacts from this database")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per streamed chunk")
+    parser.add_argument("--replace", action="store_true", help="Overwrite existing rows in the target")
+    args = parser.parse_args(argv)
 
     print("🔧 Using DATABASE:")
     print(f"   {config.DATABASE_URL}")
@@ -71,10 +240,14 @@ def main(argv: Optional[list] = None):
     if not test_db_connection():
         sys.exit(1)
 
-    if do_reset:
+    if args.reset:
         reset_db()
 
-    init_tables_and_seed()
+    # The copied contacts replace the default one
+    init_tables_and_seed(seed_contact=not args.copy_from)
+
+    if args.copy_from:
+        migrate_data(args.copy_from, args.chunk_size, args.replace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+"""
+Ordered schema/data migrations for Dunya Jewellery.
+
+Base.metadata.create_all() only creates missing tables, so anything that
+changes existing tables or data lives here. Each migration runs once and is
+recorded in the schema_migrations table. create_tables() applies pending
+migrations on startup; they are safe to run while the app is serving.
+"""
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, select, text, insert, exists, inspect
+from sqlalchemy.schema import CreateIndex
+
+from models import Product, ProductSize, ProductImage, ProductCounters, ProductArchive, Contact, split_sizes, split_file_ids
+
+BACKFILL_BATCH_SIZE = 500
+
+# Arbitrary key so only one process applies migrations at a time (PostgreSQL)
+ADVISORY_LOCK_ID = 724_193_001
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("name", String(100), primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+
+def create_indexes(engine, indexes):
+    """Create the missing ``indexes`` without blocking writes to their tables
+
+    PostgreSQL builds them with CREATE INDEX CONCURRENTLY, one per statement
+    outside a transaction; other databases get a plain CREATE INDEX.
+    """
+    if engine.dialect.name != "postgresql":
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(bind=conn, checkfirst=True)
+                print(f"   Index {index.name} ready")
+        return
+
+    # CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in indexes:
+            options = index.dialect_options["postgresql"]
+            # Only for this statement: create_all must keep plain CREATE INDEX
+            options["concurrently"] = True
+            try:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            except Exception:
+                # A failed build leaves an INVALID index that IF NOT EXISTS would skip next time
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                raise
+            finally:
+                options["concurrently"] = False
+            print(f"   Index {index.name} ready")
+
+
+def backfill_product_children(engine):
+    """Copy legacy comma-joined sizes/file IDs into product_sizes/product_images"""
+    products = Product.__table__
+    sizes = ProductSize.__table__
+    images = ProductImage.__table__
+
+    has_children = exists().where(sizes.c.product_id == products.c.id) | \
+        exists().where(images.c.product_id == products.c.id)
+
+    last_id = 0
+    copied = 0
+    while True:
+        # Small transactions keep locks short while the app keeps writing
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(products.c.id, products.c.sizes, products.c.telegram_file_ids, has_children.label("done"))
+                .where(products.c.id > last_id)
+                .order_by(products.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            size_rows = []
+            image_rows = []
+            for row in rows:
+                if row.done:
+                    continue  # Already written through the new model
+                size_rows += [{"product_id": row.id, "size": s} for s in dict.fromkeys(split_sizes(row.sizes))]
+                image_rows += [
+                    {"product_id": row.id, "position": i, "file_id": f}
+                    for i, f in enumerate(split_file_ids(row.telegram_file_ids))
+                ]
+                copied += 1
+
+            if size_rows:
+                conn.execute(insert(sizes), size_rows)
+            if image_rows:
+                conn.execute(insert(images), image_rows)
+            last_id = rows[-1].id
+
+    print(f"   Backfilled sizes/images for {copied} products")
+
+
+def add_product_search_indexes(engine):
+    """Trigram indexes so title/description ILIKE search avoids table scans (PostgreSQL)"""
+    if engine.dialect.name != "postgresql":
+        print("   Skipped: trigram indexes need PostgreSQL")
+        return
+
+    # CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception as e:
+            print(f"   ⚠️ pg_trgm unavailable, text search will scan: {e}")
+            return
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_title_trgm "
+            "ON products USING gin (title gin_trgm_ops)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_description_trgm "
+            "ON products USING gin (description gin_trgm_ops)"
+        ))
+
+
+def add_hot_query_indexes(engine):
+    """Composite indexes for the catalogue and contact access paths"""
+    indexes = [
+        index
+        for table in (Product.__table__, Contact.__table__)
+        for index in table.indexes
+        if index.name in ("ix_products_active_created", "ix_products_created_id", "ix_contacts_active_updated")
+    ]
+    create_indexes(engine, indexes)
+
+
+def create_product_counters(engine):
+    """Seed the product counters row from the current products"""
+    from repository import product_totals_query, COUNTERS_ID
+
+    with engine.begin() as conn:
+        # deleted_at doesn't exist yet on databases that predate soft delete
+        totals = conn.execute(product_totals_query(live_only=False)).one()
+        conn.execute(ProductCounters.__table__.delete())
+        conn.execute(insert(ProductCounters).values(
+            id=COUNTERS_ID, total=totals.total, active=totals.active, with_images=totals.with_images
+        ))
+    print(f"   Counted {totals.total} products")
+
+
+def add_product_soft_delete(engine):
+    """deleted_at column and index (products_archive itself comes from create_all)"""
+    columns = {column["name"] for column in inspect(engine).get_columns("products")}
+    if "deleted_at" not in columns:
+        # Nullable without a default: a catalogue-only change on PostgreSQL, no rewrite
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE products ADD COLUMN deleted_at TIMESTAMP"))
+
+    index = next(index for index in Product.__table__.indexes if index.name == "ix_products_deleted_at")
+    create_indexes(engine, [index])
+    print("   products.deleted_at ready")
+
+
+def add_product_change_indexes(engine):
+    """updated_at indexes for the /api/products/changes feed"""
+    indexes = [
+        index
+        for table in (Product.__table__, ProductArchive.__table__)
+        for index in table.indexes
+        if index.name in ("ix_products_updated_at", "ix_products_archive_updated_at")
+    ]
+    create_indexes(engine, indexes)
+
+
+# (name, function) in the order they must run - never reorder or rename
+MIGRATIONS = [
+    ("0001_backfill_product_children", backfill_product_children),
+    ("0002_product_search_indexes", add_product_search_indexes),
+    ("0003_hot_query_indexes", add_hot_query_indexes),
+    ("0004_product_counters", create_product_counters),
+    ("0005_product_soft_delete", add_product_soft_delete),
+    ("0006_product_change_indexes", add_product_change_indexes),
+]
+
+
+def run_migrations(engine):
+    """Apply all pending migrations"""
+    migration_metadata.create_all(bind=engine)
+
+    with engine.connect() as lock_conn:
+        is_postgres = engine.dialect.name == "postgresql"
+        if is_postgres:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        try:
+            with engine.connect() as conn:
+                applied = set(conn.execute(select(schema_migrations.c.name)).scalars())
+
+            for name, migrate in MIGRATIONS:
+                if name in applied:
+                    continue
+                print(f"🔄 Applying migration {name}...")
+                migrate(engine)
+                with engine.begin() as conn:
+                    conn.execute(insert(schema_migrations).values(name=name))
+                print(f"✅ Migration {name} applied")
+        finally:
+            if is_postgres:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                lock_conn.commit()
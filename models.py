@@ -1,49 +1,151 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, Float, ForeignKey, Index
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+
+def split_sizes(value):
+    """Parse a legacy comma-joined sizes column"""
+    if not value:
+        return []
+    try:
+        return [float(s.strip()) for s in value.split(",") if s.strip()]
+    except Exception:
+        return []
+
+
+def split_file_ids(value):
+    """Parse a legacy comma-joined file IDs column"""
+    if not value:
+        return []
+    return [f.strip() for f in value.split(",") if f.strip()]
+
+
 class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    sizes = Column(Text)  # "16.5,17,17.5,18"
-    telegram_file_ids = Column(Text)  # "file_id1,file_id2"
+    sizes = Column(Text)  # Legacy "16.5,17,17.5,18", kept in sync with size_rows
+    telegram_file_ids = Column(Text)  # Legacy "file_id1,file_id2", kept in sync with image_rows
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True)  # Soft delete; also sets is_active=False
+
+    # Normalized children, loaded with the product (also works on async sessions)
+    size_rows = relationship(
+        "ProductSize", order_by="ProductSize.size", cascade="all, delete-orphan", lazy="selectin"
+    )
+    image_rows = relationship(
+        "ProductImage", order_by="ProductImage.position", cascade="all, delete-orphan", lazy="selectin"
+    )
+
+    __table_args__ = (
+        # Active catalogue, newest first (API pages, cache loads, bot views)
+        Index("ix_products_active_created", "is_active", "created_at", "id"),
+        # Newest first across all products (API active_only=false, keyset pages)
+        Index("ix_products_created_id", "created_at", "id"),
+        # Archive job: soft-deleted rows old enough to move out
+        Index("ix_products_deleted_at", "deleted_at"),
+        # Change feed: rows touched since a sync token
+        Index("ix_products_updated_at", "updated_at"),
+    )
 
     def get_sizes_list(self):
         """Return sizes as list of floats"""
-        if not self.sizes:
-            return []
-        try:
-            return [float(s.strip()) for s in self.sizes.split(",") if s.strip()]
-        except Exception:
-            return []
+        if self.size_rows:
+            return [row.size for row in self.size_rows]
+        # Not backfilled yet - read the legacy column
+        return split_sizes(self.sizes)
 
     def get_file_ids_list(self):
         """Return file IDs as list"""
-        if not self.telegram_file_ids:
-            return []
-        return [f.strip() for f in self.telegram_file_ids.split(",") if f.strip()]
+        if self.image_rows:
+            return [row.file_id for row in self.image_rows]
+        # Not backfilled yet - read the legacy column
+        return split_file_ids(self.telegram_file_ids)
 
     def set_sizes(self, sizes_list):
         """Set sizes from list"""
-        if sizes_list:
-            self.sizes = ",".join([str(s) for s in sizes_list])
-        else:
-            self.sizes = ""
+        sizes_list = sizes_list or []
+        self.size_rows = [ProductSize(size=float(s)) for s in dict.fromkeys(sizes_list)]
+        self.sizes = ",".join([str(s) for s in sizes_list])
 
     def set_file_ids(self, file_ids_list):
         """Set file IDs from list"""
-        if file_ids_list:
-            self.telegram_file_ids = ",".join(file_ids_list)
-        else:
-            self.telegram_file_ids = ""
+        file_ids_list = file_ids_list or []
+        # Reuse existing rows: the flush inserts before it deletes, so fresh rows
+        # at an occupied position would hit the (product_id, position) index
+        rows = list(self.image_rows)
+        for i, file_id in enumerate(file_ids_list):
+            if i < len(rows):
+                rows[i].file_id = file_id
+            else:
+                rows.append(ProductImage(position=i, file_id=file_id))
+        self.image_rows = rows[:len(file_ids_list)]
+        self.telegram_file_ids = ",".join(file_ids_list)
+
+
+class ProductArchive(Base):
+    """Soft-deleted products moved out of the hot table (sizes/images in the legacy columns)"""
+    __tablename__ = "products_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Original product id
+    title = Column(String(255), nullable=False)
+    description = Column(Text)
+    sizes = Column(Text)
+    telegram_file_ids = Column(Text)
+    is_active = Column(Boolean, default=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+    archived_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Change feed: deletions that were archived since a sync token
+        Index("ix_products_archive_updated_at", "updated_at"),
+    )
+
+
+class ProductSize(Base):
+    __tablename__ = "product_sizes"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    size = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_product_sizes_product_id", "product_id"),
+        Index("ix_product_sizes_size_product", "size", "product_id"),  # size filters
+    )
+
+
+class ProductImage(Base):
+    __tablename__ = "product_images"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    file_id = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_product_images_product_position", "product_id", "position", unique=True),
+    )
+
+
+class ProductCounters(Base):
+    """Running product totals (single row, id=1) kept by the admin write paths"""
+    __tablename__ = "product_counters"
+
+    id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    active = Column(Integer, nullable=False, default=0)
+    with_images = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 
 class Contact(Base):
     __tablename__ = "contacts"
@@ -56,6 +158,11 @@ class Contact(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Newest active contact (API /contact)
+        Index("ix_contacts_active_updated", "is_active", "updated_at"),
+    )
+
     def get_phone_numbers_list(self):
         """Return phone numbers as list"""
         if not self.phone_numbers:
@@ -67,4 +174,29 @@ class Contact(Base):
         if phone_list:
             self.phone_numbers = ",".join([str(p) for p in phone_list])
         else:
-            self.phone_numbers = ""
\ No newline at end of file
+            self.phone_numbers = ""
+
+
+class BotUserState(Base):
+    """In-progress admin workflow state (JSON), shared across bot workers"""
+    __tablename__ = "bot_user_states"
+
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    data = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class ChangeEvent(Base):
+    """Catalogue / contact change announced to the other workers (see broadcast.py)"""
+    __tablename__ = "change_events"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String(50), nullable=False)
+    data = Column(Text, nullable=False)  # JSON event payload
+    origin = Column(String(32), nullable=False)  # Process that made the change
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Pollers read recent rows; pruning drops old ones
+        Index("ix_change_events_created_at", "created_at"),
+    )
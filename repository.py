@@ -0,0 +1,381 @@
+"""Async data access for the bot and API - keeps queries off the blocking path"""
+
+from datetime import datetime
+
+from sqlalchemy import select, or_, func, case, exists, update, delete, insert, tuple_
+
+from database import AsyncSessionLocal
+from models import Product, ProductSize, ProductImage, ProductCounters, ProductArchive, Contact, ChangeEvent
+
+COUNTERS_ID = 1
+
+# Default filter for every product read - soft-deleted rows are history only
+NOT_DELETED = Product.deleted_at.is_(None)
+
+
+def product_totals_query(live_only=True):
+    """Total, active and with-images product counts in one aggregate pass"""
+    has_images = exists().where(ProductImage.product_id == Product.id)
+    query = select(
+        func.count().label("total"),
+        func.coalesce(func.sum(case((Product.is_active == True, 1), else_=0)), 0).label("active"),
+        func.coalesce(func.sum(case((has_images, 1), else_=0)), 0).label("with_images"),
+    ).select_from(Product)
+    return query.where(NOT_DELETED) if live_only else query
+
+
+async def _bump_counters(db, total=0, active=0, with_images=0):
+    """Adjust the product counters row inside the caller's transaction"""
+    await db.execute(
+        update(ProductCounters)
+        .where(ProductCounters.id == COUNTERS_ID)
+        .values(
+            total=ProductCounters.total + total,
+            active=ProductCounters.active + active,
+            with_images=ProductCounters.with_images + with_images
+        )
+    )
+
+
+def _like_pattern(text):
+    """Substring LIKE pattern with wildcards in the input escaped"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def product_search_query(active_only=True, size=None, size_min=None, size_max=None, text=None):
+    """Build a filtered product query, newest first
+
+    Size filters go through the (size, product_id) index on product_sizes;
+    text search uses ILIKE, which the trigram indexes serve on PostgreSQL.
+    """
+    query = select(Product).where(NOT_DELETED)
+    if active_only:
+        query = query.where(Product.is_active == True)
+
+    if size is not None or size_min is not None or size_max is not None:
+        sizes = select(ProductSize.product_id)
+        if size is not None:
+            sizes = sizes.where(ProductSize.size == size)
+        if size_min is not None:
+            sizes = sizes.where(ProductSize.size >= size_min)
+        if size_max is not None:
+            sizes = sizes.where(ProductSize.size <= size_max)
+        query = query.where(Product.id.in_(sizes))
+
+    if text:
+        pattern = _like_pattern(text.strip())
+        query = query.where(or_(
+            Product.title.ilike(pattern, escape="\\"),
+            Product.description.ilike(pattern, escape="\\")
+        ))
+
+    return query.order_by(Product.created_at.desc(), Product.id.desc())
+
+
+def after_position(created_at, product_id):
+    """Keyset condition: rows after (created_at, id) in newest-first order
+
+    A row-value comparison, so the (created_at, id) indexes seek straight to
+    the position; the equivalent OR of two comparisons walks the index from
+    the top. Compares against the stored anchor row so the timestamp format
+    always matches, falling back to ``created_at`` if that row is gone.
+    """
+    anchor = select(Product.created_at).where(Product.id == product_id).scalar_subquery()
+    return tuple_(Product.created_at, Product.id) < tuple_(func.coalesce(anchor, created_at), product_id)
+
+
+# Products
+async def get_active_products():
+    """Return all active products, newest first"""
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(Product)
+            .where(Product.is_active == True, NOT_DELETED)
+            .order_by(Product.created_at.desc(), Product.id.desc())
+        )
+        result = await db.scalars(query)
+        return result.all()
+
+
+async def get_last_change():
+    """Newest updated_at over products and products_archive - the change feed high-water mark
+
+    The archive counts too, so moving the newest deleted row there never
+    makes the mark (or Last-Modified) go backwards.
+    """
+    async with AsyncSessionLocal() as db:
+        current = await db.scalar(select(func.max(Product.updated_at)))
+        archived = await db.scalar(select(func.max(ProductArchive.updated_at)))
+        return max((moment for moment in (current, archived) if moment), default=None)
+
+
+async def search_products(size=None, size_min=None, size_max=None, text=None, limit=None):
+    """Return active products matching the size/text filters"""
+    async with AsyncSessionLocal() as db:
+        query = product_search_query(size=size, size_min=size_min, size_max=size_max, text=text)
+        if limit:
+            query = query.limit(limit)
+        result = await db.scalars(query)
+        return result.all()
+
+
+async def get_available_sizes():
+    """Return the distinct sizes of active products, ascending"""
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(ProductSize.size)
+            .join(Product, Product.id == ProductSize.product_id)
+            .where(Product.is_active == True, NOT_DELETED)
+            .distinct()
+            .order_by(ProductSize.size)
+        )
+        result = await db.scalars(query)
+        return result.all()
+
+
+async def get_all_products():
+    """Return all products (admin view)"""
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(select(Product).where(NOT_DELETED))
+        return result.all()
+
+
+async def get_product(product_id):
+    """Return a single product or None (also for soft-deleted products)"""
+    async with AsyncSessionLocal() as db:
+        product = await db.get(Product, product_id)
+        return product if product and product.deleted_at is None else None
+
+
+async def create_product(title, description=None, sizes=None, file_ids=None):
+    """Create and return a new active product"""
+    async with AsyncSessionLocal() as db:
+        product = Product(
+            title=title,
+            description=description,
+            is_active=True
+        )
+        product.set_sizes(sizes or [])
+        product.set_file_ids(file_ids or [])
+
+        db.add(product)
+        await _bump_counters(db, total=1, active=1, with_images=1 if file_ids else 0)
+        await db.commit()
+        await db.refresh(product)
+        return product
+
+
+async def update_product(product_id, title, description=None, sizes=None, file_ids=None):
+    """Replace product fields, return the product or None if missing"""
+    async with AsyncSessionLocal() as db:
+        # Locked until commit, so the with_images delta is against the row we replace
+        product = await db.get(Product, product_id, with_for_update=True)
+        if not product or product.deleted_at is not None:
+            return None
+
+        had_images = bool(product.get_file_ids_list())
+        product.title = title
+        product.description = description
+        product.set_sizes(sizes or [])
+        product.set_file_ids(file_ids or [])  # COMPLETE REPLACEMENT
+
+        await _bump_counters(db, with_images=int(bool(file_ids)) - int(had_images))
+        await db.commit()
+        await db.refresh(product)
+        return product
+
+
+async def _soft_delete(db, product_ids):
+    """Soft-delete the live products among ``product_ids``, adjusting the counters
+
+    The UPDATE itself picks the live rows and returns them, so a product
+    deleted concurrently is counted by exactly one caller. is_active is
+    cleared in a second statement: RETURNING shows new values, and the
+    rows stay locked in between.
+    """
+    rows = (await db.execute(
+        update(Product)
+        .where(Product.id.in_(product_ids), NOT_DELETED)
+        .values(deleted_at=datetime.utcnow())
+        .returning(Product.id, Product.is_active, Product.telegram_file_ids)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if rows:
+        await db.execute(
+            update(Product)
+            .where(Product.id.in_([row.id for row in rows]))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        await _bump_counters(
+            db,
+            total=-len(rows),
+            active=-sum(1 for row in rows if row.is_active),
+            with_images=-sum(1 for row in rows if row.telegram_file_ids)
+        )
+    return len(rows)
+
+
+async def delete_product(product_id):
+    """Soft-delete product, return it or None if missing / already deleted"""
+    async with AsyncSessionLocal() as db:
+        deleted = await _soft_delete(db, [product_id])
+        await db.commit()
+        return await db.get(Product, product_id) if deleted else None
+
+
+async def set_products_active(product_ids, is_active):
+    """Activate / deactivate many products in one UPDATE, return how many changed"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids), Product.is_active != is_active, NOT_DELETED)
+            .values(is_active=is_active)
+            .execution_options(synchronize_session=False)
+        )
+        changed = result.rowcount
+        await _bump_counters(db, active=changed if is_active else -changed)
+        await db.commit()
+        return changed
+
+
+async def delete_products(product_ids):
+    """Soft-delete many products in one UPDATE, return how many were deleted"""
+    async with AsyncSessionLocal() as db:
+        deleted = await _soft_delete(db, product_ids)
+        await db.commit()
+        return deleted
+
+
+async def archive_deleted_products(deleted_before, batch_size=500):
+    """Move products soft-deleted before ``deleted_before`` to products_archive
+
+    One short transaction per batch; returns the number of products moved.
+    Counters are untouched - soft-deleted products are already excluded.
+    """
+    columns = [column.name for column in ProductArchive.__table__.columns if column.name != "archived_at"]
+    archived = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            # SKIP LOCKED lets several workers run the job without colliding (PostgreSQL)
+            ids = (await db.scalars(
+                select(Product.id)
+                .where(Product.deleted_at < deleted_before)
+                .order_by(Product.deleted_at)  # Oldest first, straight off ix_products_deleted_at
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not ids:
+                break
+
+            rows = select(*[Product.__table__.c[name] for name in columns]).where(Product.id.in_(ids))
+            await db.execute(insert(ProductArchive).from_select(columns, rows))
+            # Children explicitly - SQLite does not enforce ON DELETE CASCADE
+            await db.execute(delete(ProductSize).where(ProductSize.product_id.in_(ids)))
+            await db.execute(delete(ProductImage).where(ProductImage.product_id.in_(ids)))
+            await db.execute(
+                delete(Product).where(Product.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+    return archived
+
+
+async def refresh_product_counters():
+    """Recompute the counters row from the products table
+
+    Repairs drift from writes that bypass the repository (manual SQL). The
+    counters row is locked first, so a write bumping it concurrently lands
+    either fully before the recount or after it.
+    """
+    async with AsyncSessionLocal() as db:
+        await db.get(ProductCounters, COUNTERS_ID, with_for_update=True)
+        totals = (await db.execute(product_totals_query())).one()
+        await db.execute(
+            update(ProductCounters)
+            .where(ProductCounters.id == COUNTERS_ID)
+            .values(total=totals.total, active=totals.active, with_images=totals.with_images)
+        )
+        await db.commit()
+
+
+# Contact (single record)
+def current_contact_query():
+    """The contact shown by the API and the bot: the newest active row"""
+    return select(Contact).where(Contact.is_active == True).order_by(Contact.updated_at.desc()).limit(1)
+
+
+async def get_contact():
+    """Return the current contact record or None"""
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(current_contact_query())
+        return result.first()
+
+
+async def create_default_contact():
+    """Create and return the default contact record"""
+    async with AsyncSessionLocal() as db:
+        contact = Contact(
+            telegram_username="dunya_jewellery",  # Will show as https://t.me/dunya_jewellery
+            phone_numbers="+998901234567",  # Valid Uzbek number
+            instagram_username="dunya_jewellery",  # Will show as https://instagram.com/dunya_jewellery
+            is_active=True
+        )
+
+        db.add(contact)
+        await db.commit()
+        await db.refresh(contact)
+        return contact
+
+
+async def update_contact(**fields):
+    """Update the current contact's fields, return it or None if missing"""
+    async with AsyncSessionLocal() as db:
+        contact = (await db.scalars(current_contact_query())).first()
+        if not contact:
+            return None
+
+        for name, value in fields.items():
+            if name == 'phone_numbers':
+                contact.set_phone_numbers(value)
+            else:
+                setattr(contact, name, value)
+
+        await db.commit()
+        await db.refresh(contact)
+        return contact
+
+
+# Change events shared between workers
+async def add_change_event(event_type, data, origin):
+    """Record a change for the other workers' pollers"""
+    async with AsyncSessionLocal() as db:
+        db.add(ChangeEvent(type=event_type, data=data, origin=origin))
+        await db.commit()
+
+
+async def get_latest_change_event_time():
+    """created_at of the newest change event, or None"""
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.max(ChangeEvent.created_at)))
+
+
+async def get_change_events(since):
+    """Change events created at or after ``since`` (all if None), oldest first"""
+    async with AsyncSessionLocal() as db:
+        query = select(ChangeEvent).order_by(ChangeEvent.id)
+        if since is not None:
+            query = query.where(ChangeEvent.created_at >= since)
+        return (await db.scalars(query)).all()
+
+
+async def prune_change_events(created_before):
+    """Delete change events older than ``created_before``, return how many"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(delete(ChangeEvent).where(ChangeEvent.created_at < created_before))
+        await db.commit()
+        return result.rowcount